@@ -0,0 +1,135 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+
+import config
+
+
+def tables_digest(tables, version=""):
+    """Content hash of extracted tables, stable across scrapes of the same list"""
+    canonical = json.dumps([[caption, list(headers), [list(row) for row in rows]]
+                            for caption, headers, rows in tables],
+                           ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(f"{version}\n{canonical}".encode()).hexdigest()
+
+
+class ArtifactStore:
+    """Generated files named by the hash of their content
+
+    Identical tables map to one file. Files are written through a temp file
+    and renamed, so readers never see a partial one. The access time records
+    the last reuse and the modification time records creation, which is what
+    Last-Modified reports. Files unused for `max_age` seconds are evicted,
+    then the least recently used ones until the directory fits in `max_bytes`.
+    Files of every suffix in `suffixes` share those limits; the first suffix
+    is the default one.
+    """
+
+    def __init__(self, root, max_bytes=None, max_age=None, suffixes=(".pdf",)):
+        self.root = root
+        self.max_bytes = max_bytes if max_bytes is not None else config.ARTIFACT_MAX_BYTES
+        self.max_age = max_age if max_age is not None else config.ARTIFACT_MAX_AGE
+        self.suffixes = tuple(suffixes)
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def path(self, key, suffix=None):
+        if len(key) != 64 or not all(c in "0123456789abcdef" for c in key):
+            raise ValueError("Invalid artifact key")
+        suffix = suffix or self.suffixes[0]
+        if suffix not in self.suffixes:
+            raise ValueError(f"Unknown artifact suffix {suffix!r}")
+        return os.path.join(self.root, key + suffix)
+
+    def exists(self, key, suffix=None):
+        try:
+            return os.path.exists(self.path(key, suffix))
+        except ValueError:
+            return False
+
+    def touch(self, key, suffix=None):
+        """Record a reuse of the artifact, keeping its modification time; False when it isn't stored"""
+        path = self.path(key, suffix)
+        try:
+            os.utime(path, (time.time(), os.stat(path).st_mtime))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def put(self, key, write, suffix=None):
+        """Path of the artifact for `key`, calling write(tmp_path) only if it isn't stored yet"""
+        path = self.path(key, suffix)
+        with self._lock:
+            key_lock = self._locks.setdefault(path, threading.Lock())
+        try:
+            with key_lock:
+                if self.touch(key, suffix):
+                    return path
+
+                os.makedirs(self.root, exist_ok=True)
+                tmp = os.path.join(self.root, f".{key}.{uuid.uuid4().hex}.tmp")
+                try:
+                    write(tmp)
+                    os.replace(tmp, path)
+                finally:
+                    if os.path.exists(tmp):
+                        os.remove(tmp)
+        finally:
+            with self._lock:
+                self._locks.pop(path, None)
+        self.evict(keep=path)
+        return path
+
+    def evict(self, keep=None):
+        """Apply the age and size limits, never removing `keep`"""
+        now = time.time()
+        entries = []
+        try:
+            names = os.listdir(self.root)
+        except FileNotFoundError:
+            return
+        for name in names:
+            path = os.path.join(self.root, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            if name.endswith(".tmp"):
+                # left behind by a crashed write
+                if now - stat.st_mtime > 3600:
+                    self._remove(path)
+                continue
+            if not name.endswith(self.suffixes) or path == keep:
+                continue
+            last_used = max(stat.st_atime, stat.st_mtime)
+            if self.max_age and now - last_used > self.max_age:
+                self._remove(path)
+            else:
+                entries.append((last_used, stat.st_size, path))
+
+        if not self.max_bytes:
+            return
+        total = sum(size for _, size, _ in entries)
+        if keep and os.path.exists(keep):
+            total += os.path.getsize(keep)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def stats(self):
+        try:
+            files = [os.path.join(self.root, n) for n in os.listdir(self.root) if n.endswith(self.suffixes)]
+        except FileNotFoundError:
+            files = []
+        return {"files": len(files), "bytes": sum(os.path.getsize(f) for f in files if os.path.exists(f))}
@@ -0,0 +1,39 @@
+from html import escape
+
+from extraction import parse_tables
+from fixture_server import _fixture
+
+# Result pages of any size, built from the rows of the recorded fixture
+
+
+def recorded_tables():
+    return parse_tables(_fixture("cause_list_results.html"))
+
+
+def _cell(text):
+    return f'<td><span class="bt-content">{"<br>".join(escape(line) for line in text.split(chr(10)))}</span></td>'
+
+
+def results_html(rows, captions=1):
+    """Cause list results with `rows` rows spread over `captions` tables
+
+    Rows cycle through the recorded ones with fresh serial and case numbers,
+    so every row is distinct as it would be on a real list.
+    """
+    caption, headers, samples = recorded_tables()[0]
+    per_table = [rows // captions + (1 if i < rows % captions else 0) for i in range(captions)]
+    parts = ['<div class="distTableContent">']
+    serial = 0
+    for table, count in enumerate(per_table):
+        parts.append('<table class="data-table-1">')
+        parts.append(f"<caption>{escape(caption)} ({table + 1})</caption>")
+        parts.append("<thead><tr>" + "".join(f"<th>{escape(h)}</th>" for h in headers) + "</tr></thead><tbody>")
+        for _ in range(count):
+            serial += 1
+            sample = samples[serial % len(samples)]
+            case_type, _, year = sample[1].rsplit("/", 2)
+            row = [str(serial), f"{case_type}/{1000 + serial}/{year}"] + list(sample[2:])
+            parts.append("<tr>" + "".join(_cell(text) for text in row) + "</tr>")
+        parts.append("</tbody></table>")
+    parts.append("</div>")
+    return "\n".join(parts)
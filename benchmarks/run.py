@@ -0,0 +1,269 @@
+"""Offline benchmarks: extraction, PDF rendering, end-to-end scrape and API load
+
+Everything runs against fixture_server.py, no court site or CAPTCHA service needed:
+
+    python -m benchmarks.run                                      # every suite, 10 to 5000 rows
+    python -m benchmarks.run --suite extraction pdf --sizes 100,1000
+    python -m benchmarks.run --save benchmarks/baseline.json      # record a baseline
+    python -m benchmarks.run --compare benchmarks/baseline.json   # exits 1 on a regression
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date as date_cls, datetime, timedelta
+import argparse
+import json
+import os
+import platform
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+import config
+import fixture_server
+from benchmarks.fixtures import results_html
+from extraction import parse_tables
+
+SUITES = ("extraction", "pdf", "e2e", "api")
+
+
+def timed(fn, repeat):
+    """Median milliseconds of `repeat` calls"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+def captions_for(rows):
+    # big lists span several courts' tables, which is what the PDF split works on
+    return 1 + rows // 1000
+
+
+def result(value, unit, better="lower"):
+    return {"value": round(value, 3), "unit": unit, "better": better}
+
+
+def bench_extraction(sizes, repeat):
+    results = {}
+    for rows in sizes:
+        html = results_html(rows, captions_for(rows))
+        results[f"extraction.{rows}_rows"] = result(timed(lambda: parse_tables(html), repeat), "ms")
+    return results
+
+
+def bench_pdf(sizes, repeat):
+    import pdf_render
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        target = os.path.join(tmp, "bench.pdf")
+        for rows in sizes:
+            tables = parse_tables(results_html(rows, captions_for(rows)))
+            pdf_render.save_pdf(tables, target)     # warm up the worker processes
+            results[f"pdf.{rows}_rows"] = result(timed(lambda: pdf_render.save_pdf(tables, target), repeat), "ms")
+    pdf_render.shutdown()
+    return results
+
+
+def bench_e2e(sizes, repeat):
+    """Form bootstrap, court list, CAPTCHA, search, parse and PDF over the HTTP engine"""
+    import http_engine
+    import pdf_render
+
+    site = fixture_server.FixtureSite()
+    server, base = fixture_server.serve(site=site)
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            target = os.path.join(tmp, "bench.pdf")
+
+            def scrape():
+                scraper = http_engine.HttpScraper(base)
+                try:
+                    court = scraper.get_courts()[0]
+                    scraper.get_captcha()
+                    tables = scraper.search(court["est_code"], court["code"], date_cls.today().isoformat(),
+                                            "civil", fixture_server.FIXTURE_CAPTCHA)
+                finally:
+                    scraper.close()
+                pdf_render.save_pdf(tables, target)
+
+            for rows in sizes:
+                site.results_html = results_html(rows, captions_for(rows))
+                scrape()
+                results[f"e2e.{rows}_rows"] = result(timed(scrape, repeat), "ms")
+    finally:
+        server.shutdown()
+        pdf_render.shutdown()
+    return results
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def bench_api(rows, concurrency, count):
+    """Concurrent clients running full scrapes through the API, then cached reads
+
+    Each client answers the CAPTCHA itself, as a user of the web interface
+    would, so the numbers exclude any solving service.
+    """
+    import uvicorn
+
+    site = fixture_server.FixtureSite()
+    site.results_html = results_html(rows, captions_for(rows))
+    fixture, base = fixture_server.serve(site=site)
+
+    tmp = tempfile.mkdtemp()
+    config.COURT_SITE_URL = base
+    config.SCRAPER_ENGINE = "http"
+    config.CAPTCHA_PROVIDER = config.CAPTCHA_MODEL_PATH = ""
+    config.JOB_DB_PATH = os.path.join(tmp, "jobs.db")
+    config.RESULTS_DB_PATH = os.path.join(tmp, "results.db")
+    config.ARTIFACT_DIR = os.path.join(tmp, "downloads")
+    config.JOB_WORKERS = config.SCRAPE_CONCURRENCY = concurrency
+    config.JOB_QUEUE_MAX = max(config.JOB_QUEUE_MAX, count)
+    config.PREFETCH_WATCHLIST = ""
+    import main
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(main.app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    api = f"http://127.0.0.1:{port}"
+    local = threading.local()
+
+    def http():
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        return local.session
+
+    def wait_for(session_id, statuses):
+        while True:
+            status = http().get(f"{api}/api/scrape/status/{session_id}").json()
+            if status["status"] in statuses:
+                return status
+            time.sleep(0.02)
+
+    def scrape(n):
+        started = time.perf_counter()
+        day = (date_cls(2020, 1, 1) + timedelta(days=n)).isoformat()   # distinct dates, no cache hits
+        session_id = http().post(f"{api}/api/scrape/start",
+                                 json={"court_index": 0, "date": day, "case_type": "civil"}).json()["session_id"]
+        wait_for(session_id, ("captcha_required", "completed", "error"))
+        http().post(f"{api}/api/scrape/captcha-solved/{session_id}", json={"captcha": fixture_server.FIXTURE_CAPTCHA})
+        status = wait_for(session_id, ("completed", "error"))
+        if status["status"] != "completed":
+            raise Exception(status["message"])
+        return session_id, (time.perf_counter() - started) * 1000
+
+    def throughput(fn, n):
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            outcomes = list(pool.map(fn, range(n)))
+        return outcomes, n / (time.perf_counter() - started)
+
+    results = {}
+    try:
+        scrapes, rate = throughput(scrape, count)
+        latencies = [latency for _, latency in scrapes]
+        results["api.scrapes_per_s"] = result(rate, "req/s", "higher")
+        results["api.scrape_p50"] = result(percentile(latencies, 0.5), "ms")
+        results["api.scrape_p95"] = result(percentile(latencies, 0.95), "ms")
+
+        session_id = scrapes[0][0]
+        cached = {"court_index": 0, "date": date_cls(2020, 1, 1).isoformat(), "case_type": "civil"}
+        _, rate = throughput(lambda _: http().post(f"{api}/api/scrape/start", json=cached).raise_for_status(), count * 5)
+        results["api.cached_starts_per_s"] = result(rate, "req/s", "higher")
+        _, rate = throughput(lambda _: http().get(f"{api}/api/scrape/tables/{session_id}?limit=200")
+                             .raise_for_status(), count * 5)
+        results["api.table_pages_per_s"] = result(rate, "req/s", "higher")
+        _, rate = throughput(lambda _: http().get(f"{api}/api/scrape/status/{session_id}").raise_for_status(), count * 5)
+        results["api.status_per_s"] = result(rate, "req/s", "higher")
+    finally:
+        server.should_exit = True
+        thread.join(10)
+        fixture.shutdown()
+    return results
+
+
+def compare(results, baseline, threshold):
+    """[(name, value, unit, baseline value, change, regressed)]"""
+    rows = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None or not previous["value"]:
+            rows.append((name, current["value"], current["unit"], None, None, False))
+            continue
+        change = (current["value"] - previous["value"]) / previous["value"]
+        worse = change if current["better"] == "lower" else -change
+        rows.append((name, current["value"], current["unit"], previous["value"], change, worse > threshold))
+    return rows
+
+
+def report(rows):
+    print(f"{'benchmark':32} {'value':>12} {'unit':6} {'baseline':>12} {'change':>8}")
+    for name, value, unit, previous, change, regressed in rows:
+        line = f"{name:32} {value:12.2f} {unit:6}"
+        if previous is not None:
+            line += f" {previous:12.2f} {change:+8.1%}"
+        if regressed:
+            line += "  REGRESSION"
+        print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--suite", nargs="+", choices=SUITES, default=list(SUITES))
+    parser.add_argument("--sizes", default="10,100,1000,5000", help="result rows per benchmark, comma separated")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement, the median is reported")
+    parser.add_argument("--api-rows", type=int, default=100, help="rows per list in the API load test")
+    parser.add_argument("--concurrency", type=int, default=4, help="concurrent API clients")
+    parser.add_argument("--requests", type=int, default=20, help="scrapes started in the API load test")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to compare with")
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative slowdown counted as a regression")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    results = {}
+    if "extraction" in args.suite:
+        results.update(bench_extraction(sizes, args.repeat))
+    if "pdf" in args.suite:
+        results.update(bench_pdf(sizes, args.repeat))
+    if "e2e" in args.suite:
+        results.update(bench_e2e(sizes, args.repeat))
+    if "api" in args.suite:
+        results.update(bench_api(args.api_rows, args.concurrency, args.requests))
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+    rows = compare(results, baseline, args.threshold)
+    report(rows)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({
+                "created": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "machine": f"{platform.system()} {platform.machine()}, {os.cpu_count()} CPUs",
+                "results": results,
+            }, f, indent=2)
+    sys.exit(1 if any(regressed for *_, regressed in rows) else 0)
@@ -1,80 +1,265 @@
-import requests
+import asyncio
 import base64
+import threading
 import time
+
+try:
+    import httpx
+except ImportError:     # optional: only solving through a remote provider needs httpx
+    httpx = None
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+import config
+import waits
+
+CAPTCHA_IMAGE_SELECTOR = "img[src*='captcha'], img[src*='Captcha'], img[alt*='captcha'], img[alt*='Captcha']"
+
+CAPTURE_IMAGE_JS = """
+    var canvas = document.createElement('canvas');
+    var ctx = canvas.getContext('2d');
+    var img = arguments[0];
+    canvas.width = img.width;
+    canvas.height = img.height;
+    ctx.drawImage(img, 0, 0);
+    return canvas.toDataURL('image/png').substring(22);
+"""
+
+
+class CaptchaError(Exception):
+    pass
+
+
+class CaptchaProvider:
+    """A remote solving service: submit an image for an id, then poll ids for answers"""
+
+    batch_size = 1      # ids one poll request can carry
+    first_poll = 5      # seconds before an answer is worth asking for
+
+    async def submit(self, client, image):
+        raise NotImplementedError
+
+    async def poll(self, client, ids):
+        """{id: answer} for every id; answer None when not ready, a CaptchaError when failed"""
+        raise NotImplementedError
+
+
+class TwoCaptchaProvider(CaptchaProvider):
+    """2captcha's in.php / res.php API, polling many ids per request"""
+
+    batch_size = 100
+    NOT_READY = "CAPCHA_NOT_READY"
+
+    def __init__(self, api_key, base_url="http://2captcha.com"):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+
+    async def submit(self, client, image):
+        response = await client.post(f"{self.base_url}/in.php", data={
+            "key": self.api_key,
+            "method": "base64",
+            "body": base64.b64encode(image).decode("ascii"),
+        })
+        if not response.text.startswith("OK|"):
+            raise CaptchaError(f"Error submitting CAPTCHA: {response.text}")
+        return response.text.split("|", 1)[1]
+
+    async def poll(self, client, ids):
+        if len(ids) == 1:
+            response = await client.get(f"{self.base_url}/res.php",
+                                        params={"key": self.api_key, "action": "get", "id": ids[0]})
+            answers = [response.text.split("|", 1)[1] if response.text.startswith("OK|") else response.text]
+        else:
+            # batch form: one answer per id, in order, separated by |
+            response = await client.get(f"{self.base_url}/res.php",
+                                        params={"key": self.api_key, "action": "get", "ids": ",".join(ids)})
+            answers = response.text.split("|")
+            if len(answers) != len(ids):
+                raise CaptchaError(f"Unexpected batch response: {response.text}")
+
+        results = {}
+        for captcha_id, answer in zip(ids, answers):
+            if answer == self.NOT_READY:
+                results[captcha_id] = None
+            elif answer.startswith("ERROR") or not answer:
+                results[captcha_id] = CaptchaError(answer or "Empty answer")
+            else:
+                results[captcha_id] = answer
+        return results
+
+
+class AsyncCaptchaSolver:
+    """Solves CAPTCHAs on one event loop and one pooled HTTP client
+
+    Every outstanding id is polled from a single loop, batched per request
+    where the provider allows. The poll interval halves after a round that
+    resolved something and grows by half after one that did not.
+    """
+
+    def __init__(self, provider, timeout=180, min_interval=2, max_interval=15, client=None):
+        if httpx is None:
+            raise ImportError("Solving CAPTCHAs through a provider needs httpx, install the captcha extra")
+        self.provider = provider
+        self.timeout = timeout
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.client = client
+        self._pending = {}      # id -> (future, earliest poll time)
+        self._poller = None
+        self._interval = min_interval
+
+    def _client(self):
+        if self.client is None:
+            self.client = httpx.AsyncClient(timeout=30, limits=httpx.Limits(max_connections=10))
+        return self.client
+
+    async def solve(self, image):
+        """Answer text for a PNG/JPEG CAPTCHA image
+
+        Failures of any kind, the provider being unreachable included, raise
+        CaptchaError so callers can fall back to asking a person.
+        """
+        try:
+            captcha_id = await self.provider.submit(self._client(), image)
+        except httpx.HTTPError as e:
+            raise CaptchaError(f"CAPTCHA provider unreachable: {e}") from e
+        future = asyncio.get_running_loop().create_future()
+        self._pending[captcha_id] = (future, time.monotonic() + self.provider.first_poll)
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.create_task(self._poll_loop())
+        try:
+            return await asyncio.wait_for(future, self.timeout)
+        except asyncio.TimeoutError:
+            raise CaptchaError("Timeout waiting for CAPTCHA solution")
+        finally:
+            self._pending.pop(captcha_id, None)
+
+    async def _poll_loop(self):
+        while self._pending:
+            now = time.monotonic()
+            due = [captcha_id for captcha_id, (future, after) in self._pending.items()
+                   if after <= now and not future.done()]
+            if not due:
+                await asyncio.sleep(min(after for _, after in self._pending.values()) - now + 0.01)
+                continue
+
+            resolved = 0
+            for start in range(0, len(due), self.provider.batch_size):
+                batch = due[start:start + self.provider.batch_size]
+                try:
+                    results = await self.provider.poll(self._client(), batch)
+                except (httpx.HTTPError, CaptchaError) as e:
+                    print(f"CAPTCHA poll failed: {e}")
+                    continue
+                for captcha_id, answer in results.items():
+                    entry = self._pending.get(captcha_id)
+                    if entry is None or entry[0].done() or answer is None:
+                        continue
+                    if isinstance(answer, Exception):
+                        entry[0].set_exception(answer)
+                    else:
+                        entry[0].set_result(answer)
+                    resolved += 1
+
+            if resolved:
+                self._interval = max(self.min_interval, self._interval / 2)
+            else:
+                self._interval = min(self.max_interval, self._interval * 1.5)
+            await asyncio.sleep(self._interval)
+
+    async def aclose(self):
+        if self._poller is not None:
+            self._poller.cancel()
+        if self.client is not None:
+            await self.client.aclose()
+
+
+class BackgroundSolver:
+    """Runs an AsyncCaptchaSolver on its own event loop thread for synchronous callers
+
+    Waiting callers only block on a future; the polling for all of them
+    happens on the one loop.
+    """
+
+    def __init__(self, solver):
+        self.solver = solver
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, name="captcha-solver", daemon=True).start()
+
+    def solve(self, image):
+        return asyncio.run_coroutine_threadsafe(self.solver.solve(image), self.loop).result()
+
+    def close(self):
+        asyncio.run_coroutine_threadsafe(self.solver.aclose(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+PROVIDERS = {
+    "2captcha": TwoCaptchaProvider,
+}
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_solver():
+    """Process-wide solver from the CAPTCHA_* settings, None when auto-solving is off
+
+    With CAPTCHA_MODEL_PATH set, the local model answers first and the
+    remote provider (if any) only sees images it is unsure about.
+    """
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = _configured_solver()
+        return _shared
+
+
+def _configured_solver():
+    remote = None
+    if config.CAPTCHA_PROVIDER and config.CAPTCHA_API_KEY:
+        kwargs = {"base_url": config.CAPTCHA_SERVICE_URL} if config.CAPTCHA_SERVICE_URL else {}
+        provider = PROVIDERS[config.CAPTCHA_PROVIDER](config.CAPTCHA_API_KEY, **kwargs)
+        remote = BackgroundSolver(AsyncCaptchaSolver(provider, timeout=config.CAPTCHA_SOLVE_TIMEOUT))
+    if config.CAPTCHA_MODEL_PATH:
+        from local_captcha import LocalCaptchaModel, LocalSolver
+        return LocalSolver(LocalCaptchaModel.load(config.CAPTCHA_MODEL_PATH), remote,
+                           config.CAPTCHA_MIN_CONFIDENCE / 100)
+    return remote
+
+
+def close_shared_solver():
+    global _shared
+    with _shared_lock:
+        if _shared is not None:
+            _shared.close()
+            _shared = None
+
+
 class TwoCaptchaSolver:
-    def __init__(self, api_key):
+    def __init__(self, api_key, base_url="http://2captcha.com", solver=None):
         self.api_key = api_key
-        self.base_url = "http://2captcha.com"
-    
+        self.base_url = base_url
+        self.solver = solver or BackgroundSolver(AsyncCaptchaSolver(TwoCaptchaProvider(api_key, base_url)))
+
     def solve_image_captcha(self, driver):
         try:
             print("Looking for CAPTCHA image...")
             
             # Wait for CAPTCHA image to load
             captcha_img = WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "img[src*='captcha'], img[src*='Captcha'], img[alt*='captcha'], img[alt*='Captcha']"))
+                EC.presence_of_element_located((By.CSS_SELECTOR, CAPTCHA_IMAGE_SELECTOR))
             )
             
             print("CAPTCHA image found, capturing...")
+            img_base64 = driver.execute_script(CAPTURE_IMAGE_JS, captcha_img)
             
-            # Get image as base64
-            img_base64 = driver.execute_script("""
-                var canvas = document.createElement('canvas');
-                var ctx = canvas.getContext('2d');
-                var img = arguments[0];
-                canvas.width = img.width;
-                canvas.height = img.height;
-                ctx.drawImage(img, 0, 0);
-                return canvas.toDataURL('image/png').substring(22);
-            """, captcha_img)
-            
-            print("Submitting CAPTCHA to 2captcha service...")
-            
-            # Submit to 2captcha
-            submit_data = {
-                "key": self.api_key,
-                "method": "base64",
-                "body": img_base64
-            }
-            
-            response = requests.post(f"{self.base_url}/in.php", data=submit_data, timeout=30)
-            print(f"Submit response: {response.text}")
-            
-            if "OK|" in response.text:
-                captcha_id = response.text.split("|")[1]
-                print(f"CAPTCHA submitted with ID: {captcha_id}")
-                
-                # Wait for solution
-                print("Waiting for CAPTCHA solution...")
-                for attempt in range(60):  # Wait up to 10 minutes
-                    time.sleep(10)
-                    
-                    result_params = {
-                        "key": self.api_key,
-                        "action": "get",
-                        "id": captcha_id
-                    }
-                    
-                    result = requests.get(f"{self.base_url}/res.php", params=result_params, timeout=30)
-                    print(f"Attempt {attempt + 1}: {result.text}")
-                    
-                    if "OK|" in result.text:
-                        solution = result.text.split("|")[1]
-                        print(f"CAPTCHA solved! Solution: {solution}")
-                        return solution
-                    elif "CAPCHA_NOT_READY" not in result.text:
-                        print(f"Error getting solution: {result.text}")
-                        break
-                
-                print("Timeout waiting for CAPTCHA solution")
-                return None
-            else:
-                print(f"Error submitting CAPTCHA: {response.text}")
-                return None
+            print("Solving CAPTCHA...")
+            solution = self.solver.solve(base64.b64decode(img_base64))
+            print(f"CAPTCHA solved! Solution: {solution}")
+            return solution
                 
         except Exception as e:
             print(f"CAPTCHA solving error: {e}")
@@ -107,20 +292,30 @@ class TwoCaptchaSolver:
             print(f"Entering solution: {solution}")
             captcha_input.clear()
             captcha_input.send_keys(solution)
-            time.sleep(1)
+            waits.field_value(WebDriverWait(driver, 5), captcha_input, solution)
             
             return True
             
+        except TimeoutException:
+            print("CAPTCHA input did not take the solution")
+            return False
         except Exception as e:
             print(f"Error entering CAPTCHA solution: {e}")
             return False
 
 def auto_solve_captcha(driver, api_key):
-    if not api_key or api_key == "YOUR_2CAPTCHA_API_KEY":
+    has_key = api_key and api_key != "YOUR_2CAPTCHA_API_KEY"
+    if not has_key and not config.CAPTCHA_MODEL_PATH:
         print("No valid 2captcha API key provided")
         return False
     
-    solver = TwoCaptchaSolver(api_key)
+    backend = BackgroundSolver(AsyncCaptchaSolver(TwoCaptchaProvider(api_key))) if has_key else None
+    if config.CAPTCHA_MODEL_PATH:
+        # local model first, 2captcha only for images it is unsure about
+        from local_captcha import LocalCaptchaModel, LocalSolver
+        backend = LocalSolver(LocalCaptchaModel.load(config.CAPTCHA_MODEL_PATH), backend,
+                              config.CAPTCHA_MIN_CONFIDENCE / 100)
+    solver = TwoCaptchaSolver(api_key, solver=backend)
     
     try:
         solution = solver.solve_image_captcha(driver)
@@ -130,4 +325,6 @@ def auto_solve_captcha(driver, api_key):
             return False
     except Exception as e:
         print(f"Auto solve CAPTCHA failed: {e}")
-        return False
\ No newline at end of file
+        return False
+    finally:
+        solver.solver.close()
\ No newline at end of file
@@ -0,0 +1,204 @@
+from dataclasses import dataclass
+import hashlib
+import json
+import re
+import sys
+
+# Typed cause list rows. Tables keep the cells exactly as the site shows
+# them and nothing else; fields, including the case number's type, number
+# and year, are read out of the cells through the table's shared column map
+# when asked for, so a parsed list takes no more memory than its strings.
+
+# TYPE/NUMBER/YEAR as the district courts write it, or TYPE NUMBER/YEAR ("CRL.A. 123/2024")
+CASE_NUMBER = re.compile(r"^\s*(\S.*?)\s*(?:/|\s)\s*(\d+)\s*/\s*(\d{4})\s*$", re.S)
+VERSUS = re.compile(r"\s*\n\s*vs\.?\s*\n\s*", re.I)
+
+
+def _find(headers, *keywords):
+    for idx, header in enumerate(headers):
+        if any(keyword in header.lower() for keyword in keywords):
+            return idx
+    return None
+
+
+@dataclass(slots=True, frozen=True)
+class Columns:
+    """Where each field sits in a table's cells, shared by all of its rows"""
+    serial: int | None
+    case_number: int | None
+    parties: int | None
+    advocate: int | None
+    purpose: int | None
+
+    @classmethod
+    def from_headers(cls, headers):
+        serial = _find(headers, "serial", "sr.", "s.no")
+        case_number = _find(headers, "case")
+        parties = _find(headers, "part")
+        # the site's usual layout when the headers don't say
+        return cls(
+            serial=0 if serial is None else serial,
+            case_number=1 if case_number is None else case_number,
+            parties=2 if parties is None else parties,
+            advocate=_find(headers, "advocate"),
+            purpose=_find(headers, "purpose", "stage", "remark"),
+        )
+
+
+@dataclass(slots=True)
+class CauseListEntry:
+    columns: Columns
+    cells: tuple
+
+    def _cell(self, idx):
+        return self.cells[idx] if idx is not None and idx < len(self.cells) else None
+
+    @property
+    def serial(self):
+        value = self._cell(self.columns.serial)
+        return int(value) if value and value.isdigit() else None
+
+    @property
+    def case_number(self):
+        return self._cell(self.columns.case_number)
+
+    @property
+    def case(self):
+        """(case_type, case_no, case_year), all None when the case number doesn't parse"""
+        return parse_case_number(self.case_number)
+
+    @property
+    def case_type(self):
+        return self.case[0]
+
+    @property
+    def case_no(self):
+        return self.case[1]
+
+    @property
+    def case_year(self):
+        return self.case[2]
+
+    @property
+    def parties(self):
+        return self._cell(self.columns.parties)
+
+    @property
+    def petitioner(self):
+        return VERSUS.split(self.parties or "", 1)[0] or None
+
+    @property
+    def respondent(self):
+        parts = VERSUS.split(self.parties or "", 1)
+        return parts[1] if len(parts) > 1 else None
+
+    @property
+    def advocate(self):
+        return self._cell(self.columns.advocate)
+
+    @property
+    def purpose(self):
+        return self._cell(self.columns.purpose)
+
+    def to_json(self):
+        case_type, case_no, case_year = self.case
+        return {"cells": list(self.cells), "serial": self.serial,
+                "case_type": case_type, "case_no": case_no, "case_year": case_year}
+
+
+def parse_case_number(value):
+    """"CS DJ/123/2024" or "CS DJ 123/2024" to ("CS DJ", 123, 2024); (None, None, None) if it doesn't read that way"""
+    match = CASE_NUMBER.match(value) if value else None
+    if match is None:
+        return None, None, None
+    kind, number, year = match.groups()
+    return sys.intern(" ".join(kind.split())), int(number), int(year)
+
+
+def parse_case_numbers(values):
+    """Case number column to three columns: types (interned), numbers and years"""
+    types, numbers, years = [], [], []
+    for kind, number, year in map(parse_case_number, values):
+        types.append(kind)
+        numbers.append(number)
+        years.append(year)
+    return types, numbers, years
+
+
+def _column(rows, idx):
+    if idx is None:
+        return [None] * len(rows)
+    return [row[idx] if idx < len(row) else "" for row in rows]
+
+
+def _interned(values):
+    seen = {}
+    return [value if not value else seen.get(value) or seen.setdefault(value, sys.intern(value)) for value in values]
+
+
+@dataclass(slots=True)
+class CauseListTable:
+    caption: str
+    headers: tuple
+    columns: Columns
+    entries: list
+
+    @classmethod
+    def from_rows(cls, caption, headers, rows):
+        headers = tuple(sys.intern(h) for h in headers)
+        columns = Columns.from_headers(headers)
+        rows = [list(row) for row in rows]
+
+        # advocates and purposes repeat down a list; keep one copy of each
+        for idx in (columns.advocate, columns.purpose):
+            if idx is not None:
+                for row, value in zip(rows, _interned(_column(rows, idx))):
+                    if idx < len(row):
+                        row[idx] = value
+
+        entries = [CauseListEntry(columns, tuple(row)) for row in rows]
+        return cls(sys.intern(caption), headers, columns, entries)
+
+    def rows(self):
+        return [list(entry.cells) for entry in self.entries]
+
+    def as_tuple(self):
+        """(caption, headers, rows), the shape extraction and PDF rendering use"""
+        return self.caption, list(self.headers), self.rows()
+
+
+def from_tables(tables):
+    """[(caption, headers, rows)] to [CauseListTable]"""
+    return [CauseListTable.from_rows(caption, headers, rows) for caption, headers, rows in tables]
+
+
+def row_hash(cells):
+    return hashlib.sha1(json.dumps(list(cells), ensure_ascii=False, separators=(",", ":")).encode()).hexdigest()
+
+
+def row_keys(rows):
+    """Identity of each row across scrapes, from (caption, case_number, case_type, case_no, case_year, hash)
+
+    A row is the same listing when its caption and case number match; a case
+    listed twice keeps its occurrence order. Rows without a case number are
+    only ever added or removed.
+    """
+    seen = {}
+    keys = []
+    for caption, case_number, case_type, case_no, case_year, digest in rows:
+        if case_no is not None:
+            case = f"{case_type}/{case_no}/{case_year}"
+        else:
+            case = (case_number or "").strip() or f"#{digest}"
+        base = f"{caption}\x1f{case}"
+        occurrence = seen[base] = seen.get(base, -1) + 1
+        keys.append(f"{base}\x1f{occurrence}" if occurrence else base)
+    return keys
+
+
+def diff_rows(old, new):
+    """(added, removed, changed) keys between two {key: hash} maps, in the maps' order"""
+    added = [key for key in new if key not in old]
+    removed = [key for key in old if key not in new]
+    changed = [key for key, digest in new.items() if key in old and old[key] != digest]
+    return added, removed, changed
@@ -0,0 +1,82 @@
+import os
+
+# Deployment settings, overridable through environment variables
+
+
+def _int(name, default):
+    return int(os.environ.get(name, default))
+
+
+# WebDriver pool
+DRIVER_POOL_SIZE = _int("DRIVER_POOL_SIZE", 2)           # max live Chromes per pool
+DRIVER_POOL_PRESTART = _int("DRIVER_POOL_PRESTART", 1)   # drivers started at boot
+DRIVER_MAX_USES = _int("DRIVER_MAX_USES", 20)            # recycle after this many checkouts
+DRIVER_CHECKOUT_TIMEOUT = _int("DRIVER_CHECKOUT_TIMEOUT", 60)
+DRIVER_PROFILE = os.environ.get("DRIVER_PROFILE", "lean")  # driver_profiles.PROFILES: lean, balanced, visible
+DRIVER_CACHE_DIR = os.environ.get("DRIVER_CACHE_DIR", "")  # Chrome disk caches; default: <tmp>/ecourt-chrome-cache
+
+# Court list cache
+COURT_CACHE_TTL = _int("COURT_CACHE_TTL", 6 * 3600)              # seconds a list is fresh
+COURT_CACHE_STALE_TTL = _int("COURT_CACHE_STALE_TTL", 24 * 3600) # extra seconds served stale while refreshing
+COURT_CACHE_SNAPSHOT = os.environ.get("COURT_CACHE_SNAPSHOT", "")  # JSON file, empty to disable
+CATALOGUE_WORKERS = _int("CATALOGUE_WORKERS", 4)  # complexes loaded at once for /api/courts?all=true
+
+# Scraping engine: "selenium" drives Chrome, "http" talks to the site's form endpoints directly
+SCRAPER_ENGINE = os.environ.get("SCRAPER_ENGINE", "selenium")
+COURT_SITE_URL = os.environ.get("COURT_SITE_URL", "https://newdelhi.dcourts.gov.in").rstrip("/")
+CAUSE_LIST_PATH = "/cause-list-%e2%81%84-daily-board/"
+HTTP_POOL_SIZE = _int("HTTP_POOL_SIZE", 20)   # keep-alive connections shared by HTTP sessions
+HTTP_TIMEOUT = _int("HTTP_TIMEOUT", 30)
+
+# Scrape job queue
+JOB_STORE = os.environ.get("JOB_STORE", "sqlite")          # "sqlite" or "memory"
+JOB_DB_PATH = os.environ.get("JOB_DB_PATH", "jobs.db")
+JOB_WORKERS = _int("JOB_WORKERS", 4)
+JOB_QUEUE_MAX = _int("JOB_QUEUE_MAX", 50)                  # queued jobs before /api/scrape/start answers 429
+JOB_HISTORY_TTL = _int("JOB_HISTORY_TTL", 24 * 3600)       # seconds failed/cancelled jobs are kept for inspection
+SCRAPE_CONCURRENCY = _int("SCRAPE_CONCURRENCY", DRIVER_POOL_SIZE)
+BULK_MAX_ITEMS = _int("BULK_MAX_ITEMS", 100)               # court x date x case type combinations per bulk request
+
+# Results store and in-memory session eviction
+RESULTS_DB_PATH = os.environ.get("RESULTS_DB_PATH", "results.db")
+SESSION_TTL = _int("SESSION_TTL", 3600)      # seconds a finished session stays in memory
+SITE_SESSION_TTL = _int("SITE_SESSION_TTL", 15 * 60)   # idle seconds a client's court site cookies are reused
+MAX_SESSIONS = _int("MAX_SESSIONS", 500)     # sessions kept in memory before the oldest finished ones go
+TABLE_PAGE_SIZE = _int("TABLE_PAGE_SIZE", 200)    # default rows per page of /api/scrape/tables
+TABLE_PAGE_MAX = _int("TABLE_PAGE_MAX", 2000)
+SEARCH_PAGE_SIZE = _int("SEARCH_PAGE_SIZE", 20)   # default hits per page of /api/search
+SEARCH_PAGE_MAX = _int("SEARCH_PAGE_MAX", 200)
+
+# Result cache: past dates never expire, today's and future lists are re-scraped after these
+RESULT_TTL_TODAY = _int("RESULT_TTL_TODAY", 15 * 60)
+RESULT_TTL_FUTURE = _int("RESULT_TTL_FUTURE", 60 * 60)
+
+# Prefetch of a watchlist for today and the next court day (prefetch.py); off while the watchlist is empty
+PREFETCH_WATCHLIST = os.environ.get("PREFETCH_WATCHLIST", "")      # est_code:court_index:case_type,...
+PREFETCH_WINDOW = os.environ.get("PREFETCH_WINDOW", "05:00-09:30")  # local HH:MM-HH:MM, empty for all day
+PREFETCH_RATE = _int("PREFETCH_RATE", 30)                # scrapes started per hour, 0 for no limit
+PREFETCH_CONCURRENCY = _int("PREFETCH_CONCURRENCY", 1)   # prefetch scrapes queued or running at once
+PREFETCH_INTERVAL = _int("PREFETCH_INTERVAL", 60)        # seconds between scheduler runs
+PREFETCH_RECHECK = _int("PREFETCH_RECHECK", RESULT_TTL_TODAY)  # seconds before a target is requested again
+PREFETCH_PRIORITY = _int("PREFETCH_PRIORITY", -10)       # job priority, below interactive scrapes (0)
+PREFETCH_CLOSED_WEEKDAYS = [int(d) for d in os.environ.get("PREFETCH_CLOSED_WEEKDAYS", "5,6").split(",") if d.strip()]
+
+# PDF rendering in worker processes (0 renders on the calling thread)
+PDF_WORKERS = _int("PDF_WORKERS", 2)
+PDF_SPLIT_ROWS = _int("PDF_SPLIT_ROWS", 1000)   # rows before a multi-caption PDF is rendered per caption in parallel
+
+# Generated PDFs, stored by content hash
+ARTIFACT_DIR = os.environ.get("ARTIFACT_DIR", "")                      # default: downloads/ next to the code
+ARTIFACT_MAX_BYTES = _int("ARTIFACT_MAX_BYTES", 1024 * 1024 * 1024)    # 0 disables the size limit
+ARTIFACT_MAX_AGE = _int("ARTIFACT_MAX_AGE", 30 * 24 * 3600)            # seconds unused before a file is evicted
+
+# Data exports offered next to the PDF when a request names none (csv, ndjson, parquet with pyarrow)
+EXPORT_FORMATS = [f.strip().lower() for f in os.environ.get("EXPORT_FORMATS", "csv,ndjson").split(",") if f.strip()]
+
+# Automatic CAPTCHA solving on the HTTP engine (off unless a local model or a provider and key are set)
+CAPTCHA_PROVIDER = os.environ.get("CAPTCHA_PROVIDER", "")           # "2captcha"
+CAPTCHA_API_KEY = os.environ.get("CAPTCHA_API_KEY", "")
+CAPTCHA_SERVICE_URL = os.environ.get("CAPTCHA_SERVICE_URL", "")     # provider API base, e.g. the fixture server
+CAPTCHA_SOLVE_TIMEOUT = _int("CAPTCHA_SOLVE_TIMEOUT", 180)
+CAPTCHA_MODEL_PATH = os.environ.get("CAPTCHA_MODEL_PATH", "")     # local_captcha.py model; tried before the provider
+CAPTCHA_MIN_CONFIDENCE = _int("CAPTCHA_MIN_CONFIDENCE", 50)        # percent; below it the provider answers instead
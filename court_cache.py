@@ -0,0 +1,119 @@
+import contextlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+import config
+
+
+class CourtCache:
+    """TTL cache for court lists keyed by establishment (est_code)
+
+    Entries younger than `ttl` are served as is. Entries older than that but
+    within `ttl + stale_ttl` are served immediately while a background refresh
+    runs. Anything older is loaded synchronously.
+    """
+
+    def __init__(self, ttl=None, stale_ttl=None, snapshot_path=None):
+        self.ttl = config.COURT_CACHE_TTL if ttl is None else ttl
+        self.stale_ttl = config.COURT_CACHE_STALE_TTL if stale_ttl is None else stale_ttl
+        self.snapshot_path = snapshot_path if snapshot_path is not None else config.COURT_CACHE_SNAPSHOT
+
+        self._entries = {}       # est_code -> (fetched_at, courts)
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()     # one snapshot writer at a time
+        self._load_snapshot()
+
+    def get(self, est_code, loader):
+        """Return the court list for `est_code`, calling `loader()` on a miss"""
+        key = est_code or ""
+        with self._lock:
+            entry = self._entries.get(key)
+
+        if entry:
+            age = time.time() - entry[0]
+            if age < self.ttl:
+                return entry[1]
+            if age < self.ttl + self.stale_ttl:
+                self._refresh_in_background(key, loader)
+                return entry[1]
+
+        return self._load(key, loader)
+
+    def peek(self, est_code):
+        """Cached court list regardless of age, None if there is none"""
+        with self._lock:
+            entry = self._entries.get(est_code or "")
+        return entry[1] if entry else None
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "refreshing": len(self._refreshing)}
+
+    def invalidate(self, est_code=None):
+        with self._lock:
+            if est_code is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(est_code or "", None)
+
+    def _load(self, key, loader):
+        courts = loader()
+        with self._lock:
+            self._entries[key] = (time.time(), courts)
+        self._save_snapshot()
+        return courts
+
+    def _refresh_in_background(self, key, loader):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self._load(key, loader)
+            except Exception as e:
+                print(f"Court list refresh failed for {key or 'default'}: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def _load_snapshot(self):
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return
+        try:
+            with open(self.snapshot_path) as f:
+                data = json.load(f)
+            self._entries = {key: (entry["fetched_at"], entry["courts"]) for key, entry in data.items()}
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Ignoring unreadable court snapshot {self.snapshot_path}: {e}")
+
+    def _save_snapshot(self):
+        """Write the entries to the snapshot; failures are logged, the cache is kept"""
+        if not self.snapshot_path:
+            return
+        with self._save_lock:
+            # copied under the writer lock, so the last write has the newest entries
+            with self._lock:
+                data = {key: {"fetched_at": fetched_at, "courts": courts}
+                        for key, (fetched_at, courts) in self._entries.items()}
+            tmp_path = None
+            try:
+                directory = os.path.dirname(os.path.abspath(self.snapshot_path))
+                os.makedirs(directory, exist_ok=True)
+                # unique name: other processes may share the snapshot path
+                with tempfile.NamedTemporaryFile("w", dir=directory, suffix=".tmp", delete=False) as f:
+                    tmp_path = f.name
+                    json.dump(data, f)
+                os.replace(tmp_path, self.snapshot_path)
+            except OSError as e:
+                print(f"Could not write court snapshot {self.snapshot_path}: {e}")
+                if tmp_path:
+                    with contextlib.suppress(OSError):
+                        os.remove(tmp_path)
@@ -0,0 +1,57 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+import config
+
+COMPLEXES_KEY = "*complexes"    # court cache key holding the est_code option list
+
+
+class CourtCatalogue:
+    """Every court of every court complex, built on the court cache
+
+    Complexes are loaded in parallel, each one through the cache under its
+    est_code. A refresh re-reads the complex list and only reloads complexes
+    that are new, were renamed, or whose cached court list has expired.
+    """
+
+    def __init__(self, cache, load_complexes, load_courts, workers=None):
+        self.cache = cache
+        self.load_complexes = load_complexes    # () -> [{"code", "name"}]
+        self.load_courts = load_courts          # est_code -> [{"code", "name", "est_code"}]
+        self.workers = workers or config.CATALOGUE_WORKERS
+        self._lock = threading.Lock()
+
+    def complexes(self):
+        return self.cache.get(COMPLEXES_KEY, self.load_complexes)
+
+    def refresh(self):
+        """Re-read the complex list, dropping court lists of complexes that changed"""
+        with self._lock:
+            previous = {c["code"]: c["name"] for c in self.cache.peek(COMPLEXES_KEY) or []}
+            self.cache.invalidate(COMPLEXES_KEY)
+            current = self.complexes()
+        for complex_ in current:
+            if previous.get(complex_["code"]) != complex_["name"]:
+                self.cache.invalidate(complex_["code"])
+        return current
+
+    def courts(self, refresh=False):
+        """[court dict with est_code, complex and index within its complex]"""
+        complexes = self.refresh() if refresh else self.complexes()
+
+        def load(complex_):
+            try:
+                return self.cache.get(complex_["code"], lambda: self.load_courts(complex_["code"]))
+            except Exception as e:
+                # one unreachable complex shouldn't hide all the others
+                print(f"Court list for complex {complex_['code']} failed: {e}")
+                return []
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(complexes)))) as pool:
+            per_complex = list(pool.map(load, complexes))
+
+        catalogue = []
+        for complex_, courts in zip(complexes, per_complex):
+            for index, court in enumerate(courts):
+                catalogue.append(dict(court, est_code=complex_["code"], complex=complex_["name"], index=index))
+        return catalogue
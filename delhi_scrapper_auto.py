@@ -1,53 +1,39 @@
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait, Select
+from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from captcha_solver import auto_solve_captcha
-import time
+from delhi_scrappper import get_complexes, select_complex, select_court, set_case_type
+from driver_pool import DriverPool
+from selenium.common.exceptions import TimeoutException
+from extraction import extract_tables
+import config
+import waits
 
 
 CAPTCHA_API_KEY = "my-api-key-here" # Replace with your actual key if u want to try. get it from 2Captcha.com
 
-url = "https://newdelhi.dcourts.gov.in/cause-list-%e2%81%84-daily-board/"
+url = config.COURT_SITE_URL + config.CAUSE_LIST_PATH
 
 def get_courts(driver, wait):
-    """Get all available courts - same logic as your main scraper"""
-    complex_dropdown = wait.until(EC.presence_of_element_located((By.ID, "est_code")))
-    
-    # Get all complex options
-    complex_options = Select(complex_dropdown).options[1:]  # Skip first empty option
+    """Every court of every complex, each tagged with the est_code it belongs to"""
     courts = []
-    
-    for i, complex_option in enumerate(complex_options):
-        Select(complex_dropdown).select_by_index(i + 1)
-        time.sleep(1)
-        
-        # Wait for court dropdown to populate
-        wait.until(lambda d: len(Select(d.find_element(By.ID, "court")).options) > 1)
-        
-        court_dropdown = driver.find_element(By.ID, "court")
-        court_options = Select(court_dropdown).options[1:]  # Skip first empty option
-        
-        for court_option in court_options:
+    for complex_ in get_complexes(driver, wait):
+        court_select = select_complex(driver, wait, complex_["code"])
+        for court_option in court_select.options[1:]:  # Skip first empty option
             courts.append({
                 'name': court_option.text,
-                'code': court_option.get_attribute('value')
+                'code': court_option.get_attribute('value'),
+                'est_code': complex_["code"],
             })
-    
     return courts
 
 def test_captcha_solver():
-    options = webdriver.ChromeOptions()
-    options.add_argument("--start-maximized")
-    
-    driver = webdriver.Chrome(options=options)
+    # DRIVER_PROFILE decides how the browser runs
+    pool = DriverPool(size=1, name="auto")
+    driver = pool.checkout()
     wait = WebDriverWait(driver, 15)
     
     try:
-        print("Navigating to court website...")
-        driver.get(url)
-        time.sleep(3)
-        
         print("Getting all courts...")
         courts = get_courts(driver, wait)
         
@@ -63,37 +49,31 @@ def test_captcha_solver():
         selected_court = courts[8]
         print(f"Selected court (index 8): {selected_court['name']}")
         
-        # Select the court
-        court_dropdown = driver.find_element(By.ID, "court")
-        Select(court_dropdown).select_by_value(selected_court['code'])
-        time.sleep(1)
+        # The form still shows the last complex walked; switch back to the court's own
+        select_complex(driver, wait, selected_court['est_code'])
+        select_court(driver, wait, selected_court['code'])
         
         print("Setting date to 2025-10-16...")
-        driver.find_element(By.CSS_SELECTOR, ".icon[aria-label^='Choose Date']").click()
-        time.sleep(1)
+        waits.open_date_picker(wait)
         
         # Set the specific date
         try:
-            date_btn = driver.find_element(By.CSS_SELECTOR, "button.dateButton[data-date='2025-10-16']")
-            date_btn.click()
-            time.sleep(1)
+            waits.choose_date(wait, "2025-10-16")
             print("✅ Date set to 2025-10-16")
-        except:
+        except TimeoutException:
             print("❌ Date 2025-10-16 not available, using today's date")
             # Fallback to available date
             available_dates = driver.find_elements(By.CSS_SELECTOR, "button.dateButton")
             if available_dates:
-                available_dates[0].click()
-                time.sleep(1)
+                waits.choose_date(wait, available_dates[0].get_attribute("data-date"))
         
         print("Setting case type to Civil...")
-        driver.find_element(By.ID, "chkCauseTypeCivil").click()
-        time.sleep(1)
+        set_case_type(driver, "civil", wait)
         
         print("Submitting search - CAPTCHA should appear...")
         submit_btn = driver.find_element(By.CSS_SELECTOR, "input[type='submit'][value='Search']")
         submit_btn.click()
-        time.sleep(3)
+        wait.until(EC.presence_of_element_located(waits.CAPTCHA_IMAGE))
         
         print("Attempting to solve CAPTCHA automatically...")
         if auto_solve_captcha(driver, CAPTCHA_API_KEY):
@@ -101,46 +81,28 @@ def test_captcha_solver():
             
             print("Submitting form after CAPTCHA solution...")
             submit_btn.click()
-            time.sleep(5)
+            try:
+                waits.results_rendered(wait)
+            except TimeoutException:
+                pass
             
             # Check for results and extract data
             try:
-                results = driver.find_elements(By.CSS_SELECTOR, ".distTableContent")
-                if results:
-                    print(f"✅ SUCCESS! Found {len(results)} result sections")
+                all_tables = extract_tables(driver, default_caption=None)
+                if all_tables:
+                    print(f"✅ SUCCESS! Found {len(all_tables)} result tables")
                     
                     # Extract table data like your main scraper
-                    for i, content in enumerate(results):
-                        print(f"\n--- Result Section {i+1} ---")
-                        tables = content.find_elements(By.TAG_NAME, "table")
+                    for j, (caption, headers, rows) in enumerate(all_tables):
+                        print(f"Table: {caption or f'Table {j+1}'}")
+                        print(f"Headers: {headers}")
+                        
+                        # Show first few rows
+                        for k, cells in enumerate(rows[:5]):  # First 5 data rows
+                            print(f"  Row {k+1}: {cells}")
                         
-                        for j, table in enumerate(tables):
-                            # Get caption
-                            caption_elems = table.find_elements(By.TAG_NAME, "caption")
-                            caption = caption_elems[0].text if caption_elems else f"Table {j+1}"
-                            print(f"Table: {caption}")
-                            
-                            # Get headers
-                            headers = [th.text for th in table.find_elements(By.TAG_NAME, "th")]
-                            print(f"Headers: {headers}")
-                            
-                            # Get first few rows
-                            rows = table.find_elements(By.TAG_NAME, "tr")[1:6]  # First 5 data rows
-                            for k, row in enumerate(rows):
-                                cells = []
-                                for td in row.find_elements(By.TAG_NAME, "td"):
-                                    bt_content = td.find_elements(By.CLASS_NAME, "bt-content")
-                                    if bt_content:
-                                        cells.append(bt_content[0].text)
-                                    else:
-                                        cells.append(td.text)
-                                
-                                if cells:
-                                    print(f"  Row {k+1}: {cells}")
-                            
-                            total_rows = len(table.find_elements(By.TAG_NAME, "tr")) - 1  # Minus header
-                            print(f"  Total rows in this table: {total_rows}")
-                            print()
+                        print(f"  Total rows in this table: {len(rows)}")
+                        print()
                 
                 else:
                     print("❌ No results found")
@@ -153,16 +115,21 @@ def test_captcha_solver():
                 print(f"❌ Error extracting results: {e}")
         else:
             print("❌ Auto-solve failed")
-            print("The page is still open - you can solve manually to see results...")
+            if pool.headless:
+                print("Run with DRIVER_PROFILE=visible to solve it manually in the browser")
+            else:
+                print("The page is still open - you can solve manually to see results...")
         
-        input("Press ENTER to close browser...")
+        if not pool.headless:
+            input("Press ENTER to close browser...")
         
     except Exception as e:
         print(f"Error in test: {e}")
         import traceback
         traceback.print_exc()
     finally:
-        driver.quit()
+        pool.checkin(driver)
+        pool.close()
 
 if __name__ == "__main__":
     print("Testing CAPTCHA auto-solver for:")
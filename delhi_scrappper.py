@@ -1,35 +1,61 @@
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait, Select
 from selenium.webdriver.support import expected_conditions as EC
-from reportlab.lib.pagesizes import A4
-from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
+from driver_pool import DriverPool
+from extraction import extract_tables
+from metrics import span
+import config
+import pdf_render
+import waits
 import os
-import time
 
-url = "https://newdelhi.dcourts.gov.in/cause-list-%e2%81%84-daily-board/"
+url = config.COURT_SITE_URL + config.CAUSE_LIST_PATH
 
-# selcting 1st court complex 
-def get_courts(driver, wait):
+# selcting the court complex (1st one unless est_code is given)
+def get_courts(driver, wait, est_code=None):
     driver.get(url)
-    time.sleep(2)  
     
-    complex_dropdown = wait.until(EC.presence_of_element_located((By.ID, "est_code")))
-    Select(complex_dropdown).select_by_index(1)  
+    complex_select = waits.dropdown_populated(wait, "est_code")
+    if est_code:
+        complex_select.select_by_value(est_code)
+    else:
+        complex_select.select_by_index(1)  
 
    
-    wait.until(lambda d: len(Select(d.find_element(By.ID, "court")).options) > 1)
-    court_dropdown = driver.find_element(By.ID, "court")
-    select_court = Select(court_dropdown)
+    select_court = waits.dropdown_populated(wait, "court")
+    est_code = complex_select.first_selected_option.get_attribute("value")
     
     
     courts = []
     for option in select_court.options[1:]:  
-        courts.append({"code": option.get_attribute("value"), "name": option.text})
+        courts.append({"code": option.get_attribute("value"), "name": option.text, "est_code": est_code})
     return courts
 
+def get_complexes(driver, wait):
+    """Court complexes (est_code options) on the cause list form"""
+    driver.get(url)
+    complex_select = waits.dropdown_populated(wait, "est_code")
+    return [{"code": option.get_attribute("value"), "name": option.text}
+            for option in complex_select.options[1:]]
+
+def select_complex(driver, wait, est_code):
+    """Switch the form to another complex and wait for its courts to replace the old ones"""
+    previous = driver.find_elements(By.CSS_SELECTOR, "#court option")
+    Select(driver.find_element(By.ID, "est_code")).select_by_value(est_code)
+    waits.option_selected(wait, "est_code", est_code)
+    if len(previous) > 1:
+        wait.until(EC.staleness_of(previous[1]))
+    return waits.dropdown_populated(wait, "court")
+
+def open_form(driver, wait, est_code):
+    """Load the form on `est_code`'s courts without reading them, for when they are already known"""
+    driver.get(url)
+    complex_select = waits.dropdown_populated(wait, "est_code")
+    if complex_select.first_selected_option.get_attribute("value") != est_code:
+        select_complex(driver, wait, est_code)
+    else:
+        waits.dropdown_populated(wait, "court")
+
 # choosing the court by user input
 def choose_court(courts):
    
@@ -46,106 +72,46 @@ def choose_court(courts):
             return court_map[int(user_input)]
         print("Invalid index. Try again.")
 
-def pick_date(driver, date_str):
+def select_court(driver, wait, court_code):
+    Select(driver.find_element(By.ID, "court")).select_by_value(court_code)
+    waits.option_selected(wait, "court", court_code)
+
+def pick_date(driver, date_str, wait=None):
+    wait = wait or WebDriverWait(driver, 15)
    
-    driver.find_element(By.CSS_SELECTOR, ".icon[aria-label^='Choose Date']").click()
-    time.sleep(1)
-    
-    
-    date_btn = driver.find_element(By.CSS_SELECTOR, f"button.dateButton[data-date='{date_str}']")
-    date_btn.click()
-    time.sleep(1)
+    waits.open_date_picker(wait)
+    waits.choose_date(wait, date_str)
 
-# selecting case type 
-def pick_case_type(driver):
-    # Ask user what type of cases they want
-    case_type = input("Enter case type (civil/criminal, default civil): ").strip().lower()
-    
+def set_case_type(driver, case_type, wait=None):
+    wait = wait or WebDriverWait(driver, 15)
     if case_type == "criminal":
-        driver.find_element(By.ID, "chkCauseTypeCriminal").click()
+        waits.checkbox_state(wait, "chkCauseTypeCriminal")
     else:
         # Default to civil cases
-        driver.find_element(By.ID, "chkCauseTypeCivil").click()
-    time.sleep(1)
-
-def save_all_tables_to_pdf(all_tables, filename):
-   
-    styles = getSampleStyleSheet()
-    normal = styles['Normal']
-    heading = styles['Heading3']
-
-    doc = SimpleDocTemplate(
-        filename,
-        pagesize=A4,
-        leftMargin=30, rightMargin=30, topMargin=30, bottomMargin=30
-    )
-
-    elements = []
-    PAGE_WIDTH = doc.width
-
-    
-    COL_W0 = 35                   # Serial number
-    COL_W1 = 115                  # Case numbers a
-    COL_W2 = 250                  # Party names 
-    COL_W3 = PAGE_WIDTH - (COL_W0 + COL_W1 + COL_W2)  
+        waits.checkbox_state(wait, "chkCauseTypeCivil")
 
-    for caption, headers, rows in all_tables:
-       
-        if headers and headers[0].lower().startswith("serial"):
-            headers[0] = "Sr. No."
-
-        
-        elements.append(Paragraph(f"<b>{caption}</b>", heading))
-        elements.append(Spacer(1, 6))
-
-        
-        header_paragraphs = [Paragraph(f"<b>{h}</b>", normal) for h in headers]
-        data = [header_paragraphs]
-
-        
-        for row in rows:
-            data.append([Paragraph(str(cell), normal) for cell in row])
-
-        table = Table(
-            data,
-            colWidths=[COL_W0, COL_W1, COL_W2, COL_W3],
-            repeatRows=1  
-        )
-
-        
-        table.setStyle(TableStyle([
-            # Header styling
-            ('BACKGROUND', (0, 0), (-1, 0), colors.lightblue),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-
-            
-            ('LEFTPADDING', (0, 0), (-1, -1), 4),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 4),
-            ('TOPPADDING', (0, 0), (-1, -1), 3),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-
-            ('GRID', (0, 0), (-1, -1), 0.4, colors.grey),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.whitesmoke, colors.lightgrey]),
-        ]))
-
-        elements.append(table)
-        elements.append(Spacer(1, 12))  
+# selecting case type 
+def pick_case_type(driver, wait=None):
+    # Ask user what type of cases they want
+    case_type = input("Enter case type (civil/criminal, default civil): ").strip().lower()
+    set_case_type(driver, case_type, wait)
 
-    doc.build(elements)
+def save_all_tables_to_pdf(all_tables, filename):
+    pdf_render.save_pdf(all_tables, filename)
 
 def main():
    
-    options = webdriver.ChromeOptions()
-    driver = webdriver.Chrome(options=options)
+    session = {}     # span() adds up the stage timings under session["timings"]
+    # the CAPTCHA is typed into the browser window, so it has to be visible whatever the profile
+    pool = DriverPool(size=1, headless=False, name="cli")
+    with span(session, "driver_start"):
+        driver = pool.checkout()
     wait = WebDriverWait(driver, 15)
     
     try:
         
-        courts = get_courts(driver, wait)
+        with span(session, "page_load"):
+            courts = get_courts(driver, wait)
         
         
         print("Available courts:")
@@ -167,63 +133,35 @@ def main():
         judge_name = courts[court_idx]['name'].replace('/', '_').replace('\\', '_').replace(' ', '_')
         
        
-        Select(driver.find_element(By.ID, "court")).select_by_value(court_code)
-        time.sleep(1)
+        select_court(driver, wait, court_code)
         
         
         date_str = input("Enter cause list date (YYYY-MM-DD): ").strip()
-        pick_date(driver, date_str)
+        pick_date(driver, date_str, wait)
         
         
-        pick_case_type(driver)
+        pick_case_type(driver, wait)
         
         
         print("\nSolve the CAPTCHA in the browser if prompted.")
         input("Press ENTER after solving CAPTCHA to continue...")
         
         
-        driver.find_element(By.CSS_SELECTOR, "input[type='submit'][value='Search']").click()
-        
         try:
           
-            wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, ".distTableContent")))
-            time.sleep(2)
+            with span(session, "search"):
+                driver.find_element(By.CSS_SELECTOR, "input[type='submit'][value='Search']").click()
+                waits.results_rendered(wait)
 
-            dist_contents = driver.find_elements(By.CSS_SELECTOR, ".distTableContent")
-            all_tables = []
+            with span(session, "extraction"):
+                all_tables = extract_tables(driver)
             
-            for content in dist_contents:
-                tables = content.find_elements(By.TAG_NAME, "table")
-                for table in tables:
-                    
-                    caption_elems = table.find_elements(By.TAG_NAME, "caption")
-                    caption = caption_elems[0].text if caption_elems else "Cause List"
-                    
-                    
-                    headers = [th.text for th in table.find_elements(By.TAG_NAME, "th")]
-                    
-                    
-                    rows = []
-                    for row in table.find_elements(By.TAG_NAME, "tr")[1:]:  
-                        cells = []
-                        for td in row.find_elements(By.TAG_NAME, "td"):
-                           
-                            bt_content = td.find_elements(By.CLASS_NAME, "bt-content")
-                            if bt_content:
-                                cells.append(bt_content[0].text)
-                            else:
-                                cells.append(td.text)
-                        if cells: 
-                            rows.append(cells)
-                    
-                    
-                    print(f"\n=== {caption} ===")
-                    if headers:
-                        print(" | ".join(headers))
-                    for row in rows:
-                        print(" | ".join(row))
-                    
-                    all_tables.append((caption, headers, rows))
+            for caption, headers, rows in all_tables:
+                print(f"\n=== {caption} ===")
+                if headers:
+                    print(" | ".join(headers))
+                for row in rows:
+                    print(" | ".join(row))
             
            
             if all_tables:
@@ -233,7 +171,8 @@ def main():
                     downloads_dir,
                     f"cause_list_{judge_name}_{date_str}.pdf"
                 )
-                save_all_tables_to_pdf(all_tables, pdf_filename)
+                with span(session, "pdf_render"):
+                    save_all_tables_to_pdf(all_tables, pdf_filename)
                 print(f"Saved all cause lists to {pdf_filename}")
             else:
                 print("No tables found in .distTableContent.")
@@ -241,11 +180,13 @@ def main():
         except Exception as e:
             print("Error fetching cause list:", e)
             
+        print("Timings (s):", ", ".join(f"{stage} {seconds}" for stage, seconds in session["timings"].items()))
         input("\nPress ENTER to close browser...")
         
     finally:
         # Always close the browser
-        driver.quit()
+        pool.checkin(driver)
+        pool.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,154 @@
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from contextlib import contextmanager
+import os
+import threading
+import queue
+
+from driver_profiles import cache_root, get_profile
+import config
+
+
+class PoolExhausted(Exception):
+    pass
+
+
+class DriverPool:
+    """Bounded pool of pre-started Chrome drivers, configured by a driver profile
+
+    Each live driver gets one of `size` disk cache directories under the
+    pool's name, so the site's scripts stay cached when drivers are recycled
+    without two Chromes writing one cache.
+    """
+
+    def __init__(self, size=None, max_uses=None, headless=None, profile=None, name="drivers"):
+        self.size = size or config.DRIVER_POOL_SIZE
+        self.max_uses = max_uses or config.DRIVER_MAX_USES
+        self.profile = profile or get_profile()
+        self.headless = self.profile.headless if headless is None else headless
+        self.name = name
+
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._uses = {}
+        self._cache_slots = {}      # id(driver) -> disk cache slot
+        self._busy_slots = set()
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _create(self):
+        with self._lock:
+            free = set(range(self.size)) - self._busy_slots
+            slot = min(free) if free else max(self._busy_slots) + 1
+            self._busy_slots.add(slot)
+        cache_dir = os.path.join(cache_root(), self.name, str(slot)) if self.profile.disk_cache_mb else None
+        try:
+            driver = webdriver.Chrome(options=self.profile.options(self.headless, cache_dir))
+        except Exception:
+            with self._lock:
+                self._busy_slots.discard(slot)
+            raise
+        self.profile.apply(driver)
+        with self._lock:
+            self._uses[id(driver)] = 0
+            self._cache_slots[id(driver)] = slot
+        return driver
+
+    def _discard(self, driver):
+        with self._lock:
+            self._uses.pop(id(driver), None)
+            self._busy_slots.discard(self._cache_slots.pop(id(driver), None))
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def _healthy(self, driver):
+        try:
+            driver.current_url
+            return True
+        except WebDriverException:
+            return False
+
+    def _reset(self, driver):
+        # drop state left behind by the previous user
+        driver.delete_all_cookies()
+        driver.get("about:blank")
+
+    def prestart(self, count=None):
+        """Start idle drivers up front so the first requests skip Chrome startup"""
+        count = min(count if count is not None else config.DRIVER_POOL_PRESTART, self.size)
+        for _ in range(count - self._idle.qsize()):
+            if len(self._uses) >= self.size or not self._slots.acquire(blocking=False):
+                break
+            try:
+                self._idle.put(self._create())
+            except Exception as e:
+                print(f"Driver prestart failed: {e}")
+                break
+            finally:
+                self._slots.release()
+
+    def checkout(self, timeout=None):
+        """Take a healthy driver from the pool, starting one if none are idle"""
+        if self._closed:
+            raise PoolExhausted("Driver pool is closed")
+        timeout = config.DRIVER_CHECKOUT_TIMEOUT if timeout is None else timeout
+        if not self._slots.acquire(timeout=timeout):
+            raise PoolExhausted("No browser available, try again shortly")
+
+        try:
+            while True:
+                try:
+                    driver = self._idle.get_nowait()
+                except queue.Empty:
+                    return self._create()
+                if self._healthy(driver):
+                    return driver
+                self._discard(driver)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def checkin(self, driver):
+        """Return a driver; crashed or worn-out drivers are quit instead of reused"""
+        try:
+            with self._lock:
+                uses = self._uses.get(id(driver), 0) + 1
+                self._uses[id(driver)] = uses
+
+            if self._closed or uses >= self.max_uses or not self._healthy(driver):
+                self._discard(driver)
+                return
+
+            try:
+                self._reset(driver)
+            except WebDriverException:
+                self._discard(driver)
+                return
+            self._idle.put(driver)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def driver(self, timeout=None):
+        driver = self.checkout(timeout)
+        try:
+            yield driver
+        finally:
+            self.checkin(driver)
+
+    def stats(self):
+        return {
+            "size": self.size,
+            "idle": self._idle.qsize(),
+            "live": len(self._uses),
+        }
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                break
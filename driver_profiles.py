@@ -0,0 +1,93 @@
+from dataclasses import dataclass
+import os
+import tempfile
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+
+import config
+
+# Chrome settings per deployment, picked with DRIVER_PROFILE. The cause list
+# form only needs its HTML, scripts and the CAPTCHA image; the rest of what
+# the site loads is blocked on lean profiles.
+
+# Images, fonts and trackers, matched by extension or host. The site's CAPTCHA
+# comes from a query URL (?_siwp_captcha...) that none of these match.
+BLOCKED_URLS = (
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*.bmp",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*facebook.net*",
+    "*hotjar.com*", "*clarity.ms*",
+)
+
+
+@dataclass(slots=True, frozen=True)
+class DriverProfile:
+    name: str
+    headless: bool
+    window_size: tuple | None       # None: maximized
+    page_load_strategy: str         # "normal", "eager" or "none"
+    block_resources: bool
+    disk_cache_mb: int | None       # None: Chrome's own cache in a throwaway profile
+    js_heap_mb: int | None          # V8 old space cap per renderer
+    renderer_processes: int | None
+
+    def options(self, headless=None, cache_dir=None):
+        """ChromeOptions for this profile; `headless` overrides the profile's"""
+        options = webdriver.ChromeOptions()
+        options.page_load_strategy = self.page_load_strategy
+        if self.headless if headless is None else headless:
+            options.add_argument("--headless=new")
+        if self.window_size:
+            options.add_argument(f"--window-size={self.window_size[0]},{self.window_size[1]}")
+        else:
+            options.add_argument("--start-maximized")
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-dev-shm-usage")
+        if self.block_resources:
+            for flag in ("--disable-extensions", "--disable-gpu", "--mute-audio", "--no-first-run",
+                         "--disable-background-networking", "--disable-default-apps", "--disable-sync"):
+                options.add_argument(flag)
+        if self.disk_cache_mb and cache_dir:
+            options.add_argument(f"--disk-cache-dir={cache_dir}")
+            options.add_argument(f"--disk-cache-size={self.disk_cache_mb * 1024 * 1024}")
+        if self.js_heap_mb:
+            options.add_argument(f"--js-flags=--max-old-space-size={self.js_heap_mb}")
+        if self.renderer_processes:
+            options.add_argument(f"--renderer-process-limit={self.renderer_processes}")
+        return options
+
+    def apply(self, driver):
+        """Settings that need a running driver"""
+        if not self.block_resources:
+            return
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(BLOCKED_URLS)})
+        except WebDriverException as e:
+            # not fatal: pages just load everything
+            print(f"Request blocking unavailable: {e}")
+
+
+PROFILES = {
+    # lean: headless, nothing but the form; the default for servers
+    "lean": DriverProfile("lean", headless=True, window_size=(1280, 800), page_load_strategy="eager",
+                          block_resources=True, disk_cache_mb=64, js_heap_mb=256, renderer_processes=2),
+    # balanced: lean without request blocking, for when the site's layout depends on what's blocked
+    "balanced": DriverProfile("balanced", headless=True, window_size=(1280, 800), page_load_strategy="eager",
+                              block_resources=False, disk_cache_mb=64, js_heap_mb=512, renderer_processes=None),
+    # visible: a full desktop browser, as before profiles existed; for debugging the site by eye
+    "visible": DriverProfile("visible", headless=False, window_size=None, page_load_strategy="normal",
+                             block_resources=False, disk_cache_mb=None, js_heap_mb=None, renderer_processes=None),
+}
+
+
+def get_profile(name=None):
+    name = (name or config.DRIVER_PROFILE).lower()
+    if name not in PROFILES:
+        raise ValueError(f"Unknown DRIVER_PROFILE {name!r}, expected one of {', '.join(PROFILES)}")
+    return PROFILES[name]
+
+
+def cache_root():
+    return config.DRIVER_CACHE_DIR or os.path.join(tempfile.gettempdir(), "ecourt-chrome-cache")
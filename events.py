@@ -0,0 +1,71 @@
+import asyncio
+import threading
+
+# Push channel for session progress. Worker threads publish, and each
+# SSE/stream request gets an asyncio queue fed on its own event loop.
+
+
+class EventBus:
+    def __init__(self):
+        self._subscribers = {}   # topic -> [(loop, queue)]
+        self._lock = threading.Lock()
+
+    def subscribe(self, *topics):
+        """Queue receiving (kind, payload) for every topic; call from the event loop"""
+        queue = asyncio.Queue()
+        subscriber = (asyncio.get_running_loop(), queue)
+        with self._lock:
+            for topic in topics:
+                self._subscribers.setdefault(topic, []).append(subscriber)
+        return queue
+
+    def unsubscribe(self, queue, *topics):
+        with self._lock:
+            for topic in topics:
+                subscribers = [s for s in self._subscribers.get(topic, []) if s[1] is not queue]
+                if subscribers:
+                    self._subscribers[topic] = subscribers
+                else:
+                    self._subscribers.pop(topic, None)
+
+    def publish(self, topic, kind, payload):
+        with self._lock:
+            subscribers = list(self._subscribers.get(topic, []))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, (kind, payload))
+            except RuntimeError:
+                # the subscriber's loop has shut down
+                pass
+
+
+bus = EventBus()
+
+
+class Session(dict):
+    """Scrape session state that pushes a status event when a public field changes"""
+
+    WATCHED = ("status", "message", "captcha_url", "pdf_url")
+
+    def __init__(self, session_id, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.id = session_id
+
+    def snapshot(self):
+        return {"session_id": self.id, **{key: self.get(key) for key in self.WATCHED}}
+
+    def __setitem__(self, key, value):
+        changed = key in self.WATCHED and self.get(key) != value
+        super().__setitem__(key, value)
+        if changed:
+            bus.publish(self.id, "status", self.snapshot())
+
+    def update(self, *args, **kwargs):
+        fields = dict(*args, **kwargs)
+        changed = any(key in self.WATCHED and self.get(key) != value for key, value in fields.items())
+        super().update(fields)
+        if changed:
+            bus.publish(self.id, "status", self.snapshot())
+
+    def emit(self, kind, payload):
+        bus.publish(self.id, kind, payload)
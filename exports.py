@@ -0,0 +1,153 @@
+from io import BytesIO, TextIOWrapper
+import csv
+import hashlib
+import json
+import re
+import zipfile
+
+from scrape_flow import artifact_store
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:     # optional: Parquet export needs pyarrow
+    pa = pq = None
+
+# Stored cause lists as data files. Rows are read from the results store a
+# page at a time and written straight to the file, so exporting a big list
+# never holds it in memory; files are content-addressed like the PDFs and
+# only written the first time they are downloaded.
+
+# bump when the columns change, so stored exports of unchanged lists are rewritten
+EXPORT_VERSION = "1"
+PAGE_ROWS = 2000
+
+FIELDS = ("est_code", "court_code", "court_name", "date", "list_type", "caption", "table", "row", "serial",
+          "case_number", "case_type", "case_no", "case_year", "petitioner", "respondent", "advocate", "purpose")
+
+FORMATS = {     # format -> (file suffix, media type)
+    "csv": (".csv", "text/csv; charset=utf-8"),
+    "ndjson": (".ndjson", "application/x-ndjson"),
+    "parquet": (".parquet", "application/vnd.apache.parquet"),
+}
+
+
+def available_formats():
+    return [fmt for fmt in FORMATS if fmt != "parquet" or pq is not None]
+
+
+def check_formats(formats):
+    """The formats, lower-cased; raises ValueError for unknown or unavailable ones"""
+    formats = list(dict.fromkeys(fmt.lower() for fmt in formats))
+    for fmt in formats:
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown export format {fmt!r}, expected one of {', '.join(FORMATS)}")
+        if fmt not in available_formats():
+            raise ValueError(f"{fmt} export needs pyarrow installed")
+    return formats
+
+
+def records(results_store, result):
+    """One dict per row of a stored cause list, FIELDS plus the raw cells"""
+    captions = [caption for caption, _ in results_store.table_headers(result["id"])]
+    start = (0, 0)
+    while True:
+        rows = results_store.rows(result["id"], start, PAGE_ROWS + 1)
+        for t, r, entry in rows[:PAGE_ROWS]:
+            case_type, case_no, case_year = entry.case
+            yield {
+                "est_code": result["est_code"], "court_code": result["court_code"],
+                "court_name": result["court_name"], "date": result["date"], "list_type": result["case_type"],
+                "caption": captions[t], "table": t, "row": r, "serial": entry.serial,
+                "case_number": entry.case_number, "case_type": case_type, "case_no": case_no,
+                "case_year": case_year, "petitioner": entry.petitioner, "respondent": entry.respondent,
+                "advocate": entry.advocate, "purpose": entry.purpose, "cells": list(entry.cells),
+            }
+        if len(rows) <= PAGE_ROWS:
+            return
+        start = rows[PAGE_ROWS][:2]
+
+
+def write_csv(rows, f):
+    text = TextIOWrapper(f, encoding="utf-8", newline="")
+    writer = csv.DictWriter(text, FIELDS, extrasaction="ignore")
+    writer.writeheader()
+    writer.writerows(rows)
+    text.flush()
+    text.detach()
+
+
+def write_ndjson(rows, f):
+    for row in rows:
+        f.write((json.dumps(row, ensure_ascii=False) + "\n").encode())
+
+
+PARQUET_SCHEMA = None if pa is None else pa.schema(
+    [(name, pa.int32() if name in ("table", "row", "serial", "case_no", "case_year") else pa.string())
+     for name in FIELDS] + [("cells", pa.list_(pa.string()))])
+
+
+def write_parquet(rows, f):
+    def batches():
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == PAGE_ROWS:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    with pq.ParquetWriter(f, PARQUET_SCHEMA, compression="zstd") as writer:
+        for batch in batches():
+            writer.write_table(pa.Table.from_pylist(batch, schema=PARQUET_SCHEMA))
+
+
+WRITERS = {"csv": write_csv, "ndjson": write_ndjson, "parquet": write_parquet}
+
+
+def export_key(fmt, result, content_digest):
+    meta = json.dumps([result[k] for k in ("est_code", "court_code", "court_name", "date", "case_type")])
+    return hashlib.sha256(f"{EXPORT_VERSION}\n{fmt}\n{meta}\n{content_digest}".encode()).hexdigest()
+
+
+def filename(result, fmt):
+    label = re.sub(r"[^\w.-]+", "_", f"{result['court_name']}_{result['case_type']}_{result['date']}")
+    return f"cause_list_{label}{FORMATS[fmt][0]}"
+
+
+def export_list(results_store, result, fmt):
+    """Path of the stored cause list as `fmt`, written on first use"""
+    def write(tmp):
+        with open(tmp, "wb") as f:
+            WRITERS[fmt](records(results_store, result), f)
+
+    key = export_key(fmt, result, results_store.content_digest(result["id"]))
+    return artifact_store.put(key, write, FORMATS[fmt][0])
+
+
+def export_bundle(results_store, results, fmt):
+    """Path of a ZIP with one `fmt` file per stored cause list, written on first use
+
+    `results` are (folder, result metadata) pairs; the folder names the
+    entry's directory in the archive.
+    """
+    members = [(f"{re.sub(r'[^\w.-]+', '_', folder)}/{filename(result, fmt)}",
+                export_key(fmt, result, results_store.content_digest(result["id"])), result)
+               for folder, result in results]
+    key = hashlib.sha256(json.dumps([EXPORT_VERSION, fmt, [(name, k) for name, k, _ in members]]).encode()).hexdigest()
+
+    def write(tmp):
+        with zipfile.ZipFile(tmp, "w", compression=zipfile.ZIP_DEFLATED) as bundle:
+            for name, _, result in members:
+                if fmt == "parquet":
+                    # the Parquet writer wants a seekable file, zip entries aren't
+                    buffer = BytesIO()
+                    write_parquet(records(results_store, result), buffer)
+                    bundle.writestr(name, buffer.getvalue())
+                else:
+                    with bundle.open(name, "w") as f:
+                        WRITERS[fmt](records(results_store, result), f)
+
+    return artifact_store.put(key, write, ".zip")
+
@@ -0,0 +1,125 @@
+from html.parser import HTMLParser
+
+# Pulls every cause list table out of the page in a single WebDriver round trip
+
+EXTRACT_TABLES_JS = """
+var text = function (el) { return (el.innerText || el.textContent || '').trim(); };
+var out = [];
+document.querySelectorAll(arguments[0]).forEach(function (content) {
+    content.querySelectorAll('table').forEach(function (table) {
+        var caption = table.querySelector('caption');
+        var headers = Array.prototype.map.call(table.querySelectorAll('th'), text);
+        var rows = [];
+        Array.prototype.slice.call(table.querySelectorAll('tr'), 1).forEach(function (tr) {
+            var cells = Array.prototype.map.call(tr.querySelectorAll('td'), function (td) {
+                var bt = td.querySelector('.bt-content');
+                return text(bt || td);
+            });
+            if (cells.length) rows.push(cells);
+        });
+        out.push([caption ? text(caption) : null, headers, rows]);
+    });
+});
+return out;
+"""
+
+
+def extract_tables(driver, selector=".distTableContent", default_caption="Cause List"):
+    """Return [(caption, headers, rows)] for every table under `selector`"""
+    tables = driver.execute_script(EXTRACT_TABLES_JS, selector)
+    return [(default_caption if caption is None else caption, headers, rows) for caption, headers, rows in tables]
+
+
+
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+
+class _TableParser(HTMLParser):
+    """Collects (caption, headers, rows) from tables nested under a class"""
+
+    def __init__(self, container_class):
+        super().__init__(convert_charrefs=True)
+        self.container_class = container_class
+        self.tables = []
+        self._depth = 0         # open elements inside the current container
+        self._table = None      # [caption, headers, rows, rows seen]
+        self._row = None
+        self._cell = None       # text parts of the open caption/th/td
+        self._cell_tag = None
+        self._bt = None         # text parts of the cell's first .bt-content
+        self._bt_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        classes = (dict(attrs).get("class") or "").split()
+        if not self._depth:
+            if self.container_class in classes and tag not in VOID_TAGS:
+                self._depth = 1
+            return
+        if tag in VOID_TAGS:
+            if tag == "br":
+                self.handle_data("\n")
+            return
+        self._depth += 1
+
+        if tag == "table":
+            self._table = [None, [], [], 0]
+        elif self._table is None:
+            return
+        elif tag == "tr":
+            self._row = []
+            self._table[3] += 1
+        elif tag in ("th", "td", "caption"):
+            self._cell, self._cell_tag, self._bt, self._bt_depth = [], tag, None, 0
+        elif self._cell is not None:
+            if self._bt_depth:
+                self._bt_depth += 1
+            elif self._bt is None and "bt-content" in classes:
+                self._bt, self._bt_depth = [], 1
+
+    def handle_endtag(self, tag):
+        if not self._depth or tag in VOID_TAGS:
+            return
+        self._depth -= 1
+        if self._table is None:
+            return
+
+        if self._bt_depth:
+            self._bt_depth -= 1
+        elif tag == self._cell_tag:
+            text = _clean("".join(self._cell if self._bt is None else self._bt))
+            if tag == "caption":
+                self._table[0] = text
+            elif tag == "th":
+                self._table[1].append(text)
+            elif self._row is not None:
+                self._row.append(text)
+            self._cell = self._cell_tag = self._bt = None
+        elif tag == "tr" and self._row is not None:
+            # the first row holds the headers, as in the browser extraction
+            if self._row and self._table[3] > 1:
+                self._table[2].append(self._row)
+            self._row = None
+        elif tag == "table":
+            self.tables.append(tuple(self._table[:3]))
+            self._table = None
+
+    def handle_data(self, data):
+        if self._cell is None:
+            return
+        self._cell.append(data)
+        if self._bt_depth:
+            self._bt.append(data)
+
+
+def _clean(text):
+    lines = (" ".join(line.split()) for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def parse_tables(html, container_class="distTableContent", default_caption="Cause List"):
+    """Same result as extract_tables, but from raw HTML without a browser"""
+    parser = _TableParser(container_class)
+    parser.feed(html)
+    parser.close()
+    return [(default_caption if caption is None else caption, headers, rows)
+            for caption, headers, rows in parser.tables]
@@ -0,0 +1,166 @@
+"""Local stand-in for the court site, serving recorded fixtures to the HTTP engine
+
+    python fixture_server.py --port 8765
+    COURT_SITE_URL=http://127.0.0.1:8765 SCRAPER_ENGINE=http uv run main.py
+
+It also answers 2captcha's in.php / res.php, solving with the site's CAPTCHA:
+
+    CAPTCHA_PROVIDER=2captcha CAPTCHA_API_KEY=test CAPTCHA_SERVICE_URL=http://127.0.0.1:8765
+"""
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import parse_qs, unquote
+import argparse
+import json
+import os
+import struct
+import threading
+import uuid
+import zlib
+
+import config
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+FIXTURE_CAPTCHA = "ABCD"
+
+
+def _fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def captcha_png(width=120, height=40):
+    """Plain striped grayscale PNG, enough for clients that only pass the bytes on"""
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    raw = b"".join(b"\x00" + bytes((200 if (x // 6 + y // 6) % 2 else 60) for x in range(width))
+                   for y in range(height))
+    return (b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 0, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(raw))
+            + chunk(b"IEND", b""))
+
+
+class FixtureSite:
+    """Fixture content plus the per-cookie state the real site keeps"""
+
+    def __init__(self, results_html=None, captcha=FIXTURE_CAPTCHA):
+        self.form_html = _fixture("cause_list_form.html")
+        self.courts = json.loads(_fixture("courts.json"))
+        self.results_html = results_html if results_html is not None else _fixture("cause_list_results.html")
+        self.captcha = captcha     # None accepts any non-empty answer
+        self.sessions = set()
+        self.lock = threading.Lock()
+        self.solver_polls = 1       # "not ready" answers before a solving job is done
+        self.solver_jobs = {}       # id -> polls left
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    site = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _cookie(self):
+        for part in (self.headers.get("Cookie") or "").split(";"):
+            name, _, value = part.strip().partition("=")
+            if name == "PHPSESSID":
+                return value
+        return None
+
+    def _send(self, status, body, content_type, cookie=None):
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if cookie:
+            self.send_header("Set-Cookie", f"PHPSESSID={cookie}; Path=/")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _json(self, payload):
+        self._send(200, json.dumps(payload), "application/json")
+
+    def do_GET(self):
+        path, _, query = self.path.partition("?")
+        if unquote(path) == unquote(config.CAUSE_LIST_PATH):
+            cookie = self._cookie()
+            if not cookie:
+                cookie = uuid.uuid4().hex
+                with self.site.lock:
+                    self.site.sessions.add(cookie)
+            self._send(200, self.site.form_html, "text/html; charset=utf-8", cookie)
+        elif "_siwp_captcha" in query:
+            self._send(200, captcha_png(), "image/png")
+        elif path == "/res.php":
+            self._solver_result({k: v[0] for k, v in parse_qs(query).items()})
+        else:
+            self._send(404, "Not found", "text/plain")
+
+    def _solver_result(self, params):
+        if params.get("action") != "get":
+            return self._send(200, "ERROR_WRONG_ACTION", "text/plain")
+        ids = params["ids"].split(",") if "ids" in params else [params.get("id", "")]
+        answers = []
+        with self.site.lock:
+            for job_id in ids:
+                if job_id not in self.site.solver_jobs:
+                    answers.append("ERROR_WRONG_CAPTCHA_ID")
+                elif self.site.solver_jobs[job_id] > 0:
+                    self.site.solver_jobs[job_id] -= 1
+                    answers.append("CAPCHA_NOT_READY")
+                else:
+                    answers.append(self.site.captcha or "ANY")
+        if "ids" not in params and answers[0] not in ("CAPCHA_NOT_READY",) and not answers[0].startswith("ERROR"):
+            answers[0] = "OK|" + answers[0]
+        self._send(200, "|".join(answers), "text/plain")
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        form = {k: v[0] for k, v in parse_qs(self.rfile.read(length).decode("utf-8")).items()}
+        path = self.path.split("?")[0]
+        if path == "/in.php":
+            job_id = uuid.uuid4().hex[:12]
+            with self.site.lock:
+                self.site.solver_jobs[job_id] = self.site.solver_polls
+            return self._send(200, f"OK|{job_id}", "text/plain")
+        if path != "/wp-admin/admin-ajax.php":
+            return self._send(404, "Not found", "text/plain")
+        action = form.get("action")
+
+        if action == "get_courts":
+            options = "<option value=''>Select Court</option>" + "".join(
+                f"<option value='{code}'>{name}</option>" for code, name in self.site.courts.get(form.get("est_code"), []))
+            return self._json({"success": True, "data": options})
+
+        if action == "get_cause_lists":
+            if self._cookie() not in self.site.sessions:
+                return self._json({"success": False, "data": {"message": "Session expired"}})
+            answer = form.get("siwp_captcha_value", "")
+            if not answer or (self.site.captcha and answer.upper() != self.site.captcha):
+                return self._json({"success": False, "data": {"message": "Invalid Captcha"}})
+            return self._json({"success": True, "data": self.site.results_html})
+
+        self._json({"success": False, "data": {"message": f"Unknown action {action}"}})
+
+
+def serve(port=0, site=None):
+    """Start the stand-in in a background thread, returns (server, base_url)"""
+    handler = type("Handler", (FixtureHandler,), {"site": site or FixtureSite()})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--any-captcha", action="store_true", help="accept any non-empty CAPTCHA answer")
+    args = parser.parse_args()
+
+    site = FixtureSite(captcha=None if args.any_captcha else FIXTURE_CAPTCHA)
+    handler = type("Handler", (FixtureHandler,), {"site": site})
+    print(f"Serving fixtures on http://127.0.0.1:{args.port} (CAPTCHA answer: {site.captcha or 'any'})")
+    ThreadingHTTPServer(("127.0.0.1", args.port), handler).serve_forever()
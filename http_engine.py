@@ -0,0 +1,225 @@
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+import threading
+import json
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from extraction import parse_tables
+import config
+
+# Browser-free engine: replays the cause list form's AJAX calls with requests.
+# The site is a WordPress (S3WaaS) page whose form posts to admin-ajax.php.
+
+AJAX_PATH = "/wp-admin/admin-ajax.php"
+COURTS_ACTION = "get_courts"
+CAUSE_LIST_ACTION = "get_cause_lists"
+CAUSE_TYPES = {"civil": "civ", "criminal": "cri"}
+
+_adapter = None
+_adapter_lock = threading.Lock()
+
+
+class CaptchaRejected(Exception):
+    pass
+
+
+class SessionExpired(Exception):
+    pass
+
+
+def _shared_adapter():
+    # one keep-alive connection pool shared by every session
+    global _adapter
+    with _adapter_lock:
+        if _adapter is None:
+            _adapter = HTTPAdapter(pool_connections=4, pool_maxsize=config.HTTP_POOL_SIZE)
+        return _adapter
+
+
+def new_session():
+    session = requests.Session()
+    adapter = _shared_adapter()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["User-Agent"] = "Mozilla/5.0 (X11; Linux x86_64) ecourt-scraper"
+    return session
+
+
+class _FormParser(HTMLParser):
+    """Picks the <select> options, inputs and CAPTCHA image out of the form page"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.selects = {}
+        self.inputs = {}
+        self.captcha_src = None
+        self._select = None
+        self._option = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "select":
+            self._select = attrs.get("id") or attrs.get("name")
+            self.selects[self._select] = []
+        elif tag == "option" and self._select:
+            self._option = [attrs.get("value") or "", ""]
+        elif tag == "input" and attrs.get("name"):
+            if attrs.get("type") in ("checkbox", "radio") and "checked" not in attrs:
+                return
+            self.inputs[attrs["name"]] = attrs.get("value") or ""
+        elif tag == "img" and "captcha" in (attrs.get("id", "") + attrs.get("src", "")).lower():
+            self.captcha_src = self.captcha_src or attrs.get("src")
+
+    def handle_endtag(self, tag):
+        if tag == "option" and self._option is not None:
+            self.selects[self._select].append((self._option[0], " ".join(self._option[1].split())))
+            self._option = None
+        elif tag == "select":
+            self._select = None
+
+    def handle_data(self, data):
+        if self._option is not None:
+            self._option[1] += data
+
+
+def parse_form(html):
+    parser = _FormParser()
+    parser.feed(html)
+    parser.close()
+    return parser
+
+
+def _ajax_html(response):
+    """admin-ajax answers either raw HTML or {"success": .., "data": html}"""
+    response.raise_for_status()
+    try:
+        payload = response.json()
+    except ValueError:
+        return response.text
+    if isinstance(payload, dict):
+        if payload.get("success") is False:
+            message = payload.get("data")
+            if isinstance(message, dict):
+                message = message.get("message") or json.dumps(message)
+            message = message or "Request rejected"
+            if "captcha" in str(message).lower():
+                raise CaptchaRejected(message)
+            if "expired" in str(message).lower() or "nonce" in str(message).lower():
+                raise SessionExpired(message)
+            raise Exception(message)
+        return payload.get("data") or ""
+    return str(payload)
+
+
+class HttpScraper:
+    """One search on the cause list form, holding its own cookies and CAPTCHA"""
+
+    def __init__(self, base_url=None, session=None):
+        self.base_url = (base_url or config.COURT_SITE_URL).rstrip("/")
+        self.session = session or new_session()
+        self.form = None
+
+    def _get(self, path_or_url, **kwargs):
+        return self.session.get(urljoin(self.base_url + "/", path_or_url), timeout=config.HTTP_TIMEOUT, **kwargs)
+
+    def _ajax(self, data):
+        return _ajax_html(self.session.post(self.base_url + AJAX_PATH, data=data, timeout=config.HTTP_TIMEOUT))
+
+    def load_form(self):
+        response = self._get(config.CAUSE_LIST_PATH)
+        response.raise_for_status()
+        self.form = parse_form(response.text)
+        return self.form
+
+    def get_complexes(self):
+        form = self.form or self.load_form()
+        return [{"code": code, "name": name} for code, name in form.selects.get("est_code", []) if code]
+
+    def get_courts(self, est_code=None):
+        if not est_code:
+            complexes = self.get_complexes()
+            if not complexes:
+                raise Exception("No court complexes found")
+            est_code = complexes[0]["code"]
+        html = self._ajax({"action": COURTS_ACTION, "est_code": est_code})
+        options = parse_form(f"<select id='court'>{html}</select>").selects["court"]
+        return [{"code": code, "name": name, "est_code": est_code} for code, name in options if code]
+
+    def get_captcha(self):
+        """Fetch a fresh CAPTCHA image for this session, returns PNG bytes
+
+        Reuses the loaded or restored form; it is only reloaded when none is
+        held, e.g. after the site rejected the last answer.
+        """
+        form = self.form or self.load_form()
+        if not form.captcha_src:
+            raise Exception("CAPTCHA image not found on the form")
+        response = self._get(form.captcha_src)
+        response.raise_for_status()
+        return response.content
+
+    def search(self, est_code, court_code, date, case_type, captcha):
+        """Submit the form and return [(caption, headers, rows)]"""
+        if self.form is None:
+            raise Exception("Fetch the CAPTCHA before searching")
+        data = dict(self.form.inputs)
+        data.update({
+            "action": CAUSE_LIST_ACTION,
+            "es_ajax_request": "1",
+            "est_code": est_code,
+            "court": court_code,
+            "date": date,
+            "cause_type": CAUSE_TYPES.get(case_type.lower(), "civ"),
+            "siwp_captcha_value": captcha,
+        })
+        try:
+            html = self._ajax(data)
+            if "invalid captcha" in html.lower():
+                raise CaptchaRejected("Invalid CAPTCHA")
+        except CaptchaRejected:
+            # the retry gets a freshly loaded form, in case its tokens went stale
+            self.form = None
+            raise
+        return parse_tables(html)
+
+    def export_state(self):
+        """Cookies and parsed form, enough to continue this site session elsewhere"""
+        return {
+            "cookies": [{"name": c.name, "value": c.value, "domain": c.domain, "path": c.path}
+                        for c in self.session.cookies],
+            "form": self.form,
+        }
+
+    def restore_state(self, state):
+        for cookie in state["cookies"]:
+            self.session.cookies.set(cookie["name"], cookie["value"], domain=cookie["domain"], path=cookie["path"])
+        self.form = state["form"]
+
+    def reset(self):
+        """Forget the site session, the next request starts a new one"""
+        self.session.cookies.clear()
+        self.form = None
+
+    def close(self):
+        # Session.close() would also close the shared adapter's pool
+        self.session.cookies.clear()
+
+
+def get_complexes():
+    """Court complexes, same shape as delhi_scrappper.get_complexes"""
+    scraper = HttpScraper()
+    try:
+        return scraper.get_complexes()
+    finally:
+        scraper.close()
+
+
+def get_courts(est_code=None):
+    """Court list for one complex, same shape as delhi_scrappper.get_courts"""
+    scraper = HttpScraper()
+    try:
+        return scraper.get_courts(est_code)
+    finally:
+        scraper.close()
@@ -0,0 +1,247 @@
+import heapq
+import itertools
+import json
+import sqlite3
+import threading
+import time
+
+import config
+
+
+class QueueFull(Exception):
+    pass
+
+
+class MemoryJobStore:
+    """In-process job store, lost on restart"""
+
+    def __init__(self):
+        self._heap = []
+        self._jobs = {}
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def put(self, job_id, kind, payload, priority=0):
+        with self._lock:
+            self._jobs[job_id] = {"id": job_id, "kind": kind, "payload": payload,
+                                  "priority": priority, "status": "queued"}
+            heapq.heappush(self._heap, (-priority, next(self._counter), job_id))
+
+    def claim(self, skip_kinds=()):
+        with self._lock:
+            skipped = []
+            job = None
+            while self._heap:
+                item = heapq.heappop(self._heap)
+                candidate = self._jobs.get(item[2])
+                if not candidate or candidate["status"] != "queued":
+                    continue
+                if candidate["kind"] in skip_kinds:
+                    skipped.append(item)
+                    continue
+                candidate["status"] = "running"
+                job = candidate
+                break
+            for item in skipped:
+                heapq.heappush(self._heap, item)
+            return job
+
+    def finish(self, job_id, status, error=None):
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def cancel(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job and job["status"] == "queued":
+                del self._jobs[job_id]
+                return True
+            return False
+
+    def depth(self):
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if job["status"] == "queued")
+
+    def recover(self):
+        return []
+
+
+class SqliteJobStore:
+    """Job store persisted in SQLite so queued work survives a restart
+
+    Done jobs are deleted at once; failed and cancelled ones are kept for
+    `history_ttl` seconds for inspection, then deleted.
+    """
+
+    def __init__(self, path, history_ttl=None):
+        self.history_ttl = config.JOB_HISTORY_TTL if history_ttl is None else history_ttl
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        self._db.executescript("""
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                priority INTEGER NOT NULL DEFAULT 0,
+                status TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                error TEXT
+            );
+            CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (status, priority DESC, created_at);
+        """)
+
+    def put(self, job_id, kind, payload, priority=0):
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO jobs (id, kind, payload, priority, status, created_at) VALUES (?, ?, ?, ?, 'queued', ?)",
+                (job_id, kind, json.dumps(payload), priority, time.time()))
+
+    def claim(self, skip_kinds=()):
+        skip_kinds = tuple(skip_kinds)
+        query = "SELECT id, kind, payload, priority FROM jobs WHERE status = 'queued'"
+        if skip_kinds:
+            query += f" AND kind NOT IN ({','.join('?' * len(skip_kinds))})"
+        query += " ORDER BY priority DESC, created_at LIMIT 1"
+
+        with self._lock:
+            row = self._db.execute(query, skip_kinds).fetchone()
+            if not row:
+                return None
+            self._db.execute("UPDATE jobs SET status = 'running', started_at = ? WHERE id = ?", (time.time(), row[0]))
+        return {"id": row[0], "kind": row[1], "payload": json.loads(row[2]), "priority": row[3], "status": "running"}
+
+    def finish(self, job_id, status, error=None):
+        with self._lock:
+            if status == "done":
+                self._db.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+            else:
+                # failed jobs are kept with their error for inspection
+                self._db.execute("UPDATE jobs SET status = ?, finished_at = ?, error = ? WHERE id = ?",
+                                 (status, time.time(), error, job_id))
+            self._prune()
+
+    def cancel(self, job_id):
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE jobs SET status = 'cancelled', finished_at = ? WHERE id = ? AND status = 'queued'",
+                (time.time(), job_id))
+            self._prune()
+        return cursor.rowcount > 0
+
+    def _prune(self):
+        self._db.execute("DELETE FROM jobs WHERE status IN ('failed', 'cancelled') AND finished_at < ?",
+                         (time.time() - self.history_ttl,))
+
+    def depth(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+
+    def recover(self):
+        """Requeue jobs interrupted by a restart and return everything still queued"""
+        with self._lock:
+            self._prune()
+            self._db.execute("UPDATE jobs SET status = 'queued', started_at = NULL WHERE status = 'running'")
+            rows = self._db.execute(
+                "SELECT id, kind, payload, priority FROM jobs WHERE status = 'queued' ORDER BY priority DESC, created_at"
+            ).fetchall()
+        return [{"id": r[0], "kind": r[1], "payload": json.loads(r[2]), "priority": r[3], "status": "queued"}
+                for r in rows]
+
+
+def make_store():
+    if config.JOB_STORE == "memory":
+        return MemoryJobStore()
+    return SqliteJobStore(config.JOB_DB_PATH)
+
+
+class JobQueue:
+    """Bounded queue drained by a fixed pool of worker threads
+
+    `handlers` maps a job kind to a callable taking (job_id, payload).
+    `limits` caps how many jobs of one kind may run at once; a tuple of kinds
+    as the key puts them under one shared cap.
+    """
+
+    def __init__(self, store, handlers, workers=None, max_queued=None, limits=None):
+        self.store = store
+        self.handlers = handlers
+        self.workers = workers or config.JOB_WORKERS
+        self.max_queued = max_queued or config.JOB_QUEUE_MAX
+        self.limits = limits or {}
+
+        self._running = {}
+        self._cond = threading.Condition()
+        self._threads = []
+        self._stopping = False
+
+    def submit(self, job_id, kind, payload, priority=0):
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        with self._cond:
+            if self.store.depth() >= self.max_queued:
+                raise QueueFull("Scrape queue is full, try again shortly")
+            self.store.put(job_id, kind, payload, priority)
+            self._cond.notify()
+
+    def cancel(self, job_id):
+        return self.store.cancel(job_id)
+
+    def recover(self):
+        return self.store.recover()
+
+    def start(self):
+        self._stopping = False
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=5):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def stats(self):
+        with self._cond:
+            return {"queued": self.store.depth(), "running": dict(self._running), "workers": self.workers}
+
+    def _claim(self):
+        with self._cond:
+            while not self._stopping:
+                full = [kind for kinds, limit in self.limits.items()
+                        for kind in (kinds if isinstance(kinds, tuple) else (kinds,))
+                        if self._group_running(kinds) >= limit]
+                job = self.store.claim(full)
+                if job:
+                    self._running[job["kind"]] = self._running.get(job["kind"], 0) + 1
+                    return job
+                self._cond.wait(timeout=1)
+        return None
+
+    def _group_running(self, kinds):
+        if isinstance(kinds, tuple):
+            return sum(self._running.get(kind, 0) for kind in kinds)
+        return self._running.get(kinds, 0)
+
+    def _work(self):
+        while True:
+            job = self._claim()
+            if job is None:
+                return
+            status, error = "done", None
+            try:
+                self.handlers[job["kind"]](job["id"], job["payload"])
+            except Exception as e:
+                status, error = "failed", str(e)
+                print(f"Job {job['id']} failed: {e}")
+            finally:
+                self.store.finish(job["id"], status, error)
+                with self._cond:
+                    self._running[job["kind"]] -= 1
+                    self._cond.notify_all()
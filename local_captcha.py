@@ -0,0 +1,254 @@
+"""Offline CAPTCHA recognition: binarise, segment into glyphs, match glyph templates
+
+Templates are learnt from labelled samples, images named `<ANSWER>_<anything>.png`:
+
+    python local_captcha.py train samples/ captcha_model.json
+    python local_captcha.py eval samples/ captcha_model.json     # accuracy and latency
+"""
+from io import BytesIO
+import argparse
+import json
+import os
+import statistics
+import time
+
+try:
+    from PIL import Image, ImageFilter
+except ImportError:     # optional: only the local model needs Pillow
+    Image = ImageFilter = None
+
+from captcha_solver import CaptchaError
+
+GLYPH_SIZE = (12, 16)       # width, height every glyph is scaled to
+MAX_TEMPLATES = 25          # kept per character
+
+
+def binarise(image):
+    """Grayscale image to an ink mask (255 ink, 0 background) using Otsu's threshold
+
+    A median filter first removes the speckle noise CAPTCHAs are sprinkled with.
+    """
+    gray = image.convert("L").filter(ImageFilter.MedianFilter(3))
+    histogram = gray.histogram()
+    total = sum(histogram)
+    weighted_total = sum(i * count for i, count in enumerate(histogram))
+
+    best, threshold = -1.0, 127
+    background = background_sum = 0
+    for level, count in enumerate(histogram):
+        background += count
+        if background == 0:
+            continue
+        foreground = total - background
+        if foreground == 0:
+            break
+        background_sum += level * count
+        mean_b = background_sum / background
+        mean_f = (weighted_total - background_sum) / foreground
+        between = background * foreground * (mean_b - mean_f) ** 2
+        if between > best:
+            best, threshold = between, level
+
+    mask = gray.point(lambda p: 255 if p <= threshold else 0)
+    # ink is the minority class; flip light-on-dark images
+    if mask.histogram()[255] > total / 2:
+        mask = gray.point(lambda p: 255 if p > threshold else 0)
+    return mask
+
+
+def segment(mask, expected=None, min_width=2, min_ink=2):
+    """Glyph column ranges from the vertical ink projection
+
+    Touching glyphs are split evenly and stray marks merged so the count
+    matches `expected` when it is known.
+    """
+    width, height = mask.size
+    data = mask.tobytes()
+    columns = [sum(1 for y in range(height) if data[y * width + x]) >= min_ink for x in range(width)]
+
+    spans, start = [], None
+    for x, ink in enumerate(columns + [0]):
+        if ink and start is None:
+            start = x
+        elif not ink and start is not None:
+            if x - start >= min_width:
+                spans.append([start, x])
+            start = None
+
+    if expected:
+        while spans and len(spans) > expected:
+            # merge across the narrowest gap
+            gap = min(range(len(spans) - 1), key=lambda i: spans[i + 1][0] - spans[i][1])
+            spans[gap:gap + 2] = [[spans[gap][0], spans[gap + 1][1]]]
+        while spans and len(spans) < expected:
+            widest = max(range(len(spans)), key=lambda i: spans[i][1] - spans[i][0])
+            left, right = spans[widest]
+            if right - left < 2 * min_width:
+                break
+            middle = (left + right) // 2
+            spans[widest:widest + 1] = [[left, middle], [middle, right]]
+    return [tuple(span) for span in spans]
+
+
+def glyph_bits(mask, span):
+    """Fixed-size bit string of one glyph, cropped to its ink"""
+    left, right = span
+    glyph = mask.crop((left, 0, right, mask.size[1]))
+    box = glyph.getbbox()
+    if box:
+        glyph = glyph.crop(box)
+    glyph = glyph.resize(GLYPH_SIZE, Image.BILINEAR)
+    return "".join("1" if p > 96 else "0" for p in glyph.tobytes())
+
+
+class LocalCaptchaModel:
+    """Nearest-template glyph classifier"""
+
+    def __init__(self, templates=None, length=None):
+        if Image is None:
+            raise ImportError("The local CAPTCHA model needs Pillow, install the captcha extra")
+        self.templates = templates or {}    # char -> [bit strings]
+        self.length = length                # usual answer length, guides segmentation
+        self._packed = None                 # char -> [ints], for popcount distances
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["templates"], data.get("length"))
+
+    def save(self, path):
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"length": self.length, "glyph_size": GLYPH_SIZE, "templates": self.templates}, f)
+        os.replace(tmp, path)
+
+    def train(self, samples):
+        """Learn from (png bytes, answer) pairs; returns how many samples segmented cleanly"""
+        lengths, used = [], 0
+        for image, answer in samples:
+            mask = binarise(Image.open(BytesIO(image)))
+            spans = segment(mask, len(answer))
+            lengths.append(len(answer))
+            if len(spans) != len(answer):
+                continue
+            used += 1
+            for char, span in zip(answer, spans):
+                bucket = self.templates.setdefault(char, [])
+                if len(bucket) < MAX_TEMPLATES:
+                    bucket.append(glyph_bits(mask, span))
+        self._packed = None
+        if lengths:
+            self.length = statistics.mode(lengths)
+        return used
+
+    def classify(self, bits):
+        """(char, confidence); confidence compares the best match with the best other character"""
+        if self._packed is None:
+            self._packed = {char: [int(t, 2) for t in bucket] for char, bucket in self.templates.items()}
+        value = int(bits, 2)
+        best = {char: min((value ^ template).bit_count() for template in bucket)
+                for char, bucket in self._packed.items()}
+        ranked = sorted(best.items(), key=lambda item: item[1])
+        char, distance = ranked[0]
+        if len(ranked) == 1:
+            return char, 1 - distance / len(bits)
+        runner_up = ranked[1][1]
+        return char, 1 - distance / runner_up if runner_up else 0.0
+
+    def predict(self, image):
+        """(answer, confidence) for PNG bytes, confidence being that of the weakest glyph"""
+        if not self.templates:
+            raise CaptchaError("CAPTCHA model has no templates")
+        mask = binarise(Image.open(BytesIO(image)))
+        spans = segment(mask, self.length)
+        if not spans:
+            return "", 0.0
+        answer, confidence = "", 1.0
+        for span in spans:
+            char, char_confidence = self.classify(glyph_bits(mask, span))
+            answer += char
+            confidence = min(confidence, char_confidence)
+        if self.length and len(spans) != self.length:
+            confidence = 0.0
+        return answer, confidence
+
+
+class LocalSolver:
+    """Solves with the local model, handing low-confidence images to a remote solver
+
+    Same `solve(image)` interface as captcha_solver.BackgroundSolver.
+    """
+
+    def __init__(self, model, fallback=None, min_confidence=0.5):
+        self.model = model
+        self.fallback = fallback
+        self.min_confidence = min_confidence
+
+    def solve(self, image):
+        answer, confidence = self.model.predict(image)
+        if answer and confidence >= self.min_confidence:
+            return answer
+        if self.fallback is None:
+            raise CaptchaError(f"Low confidence local answer ({confidence:.2f})")
+        return self.fallback.solve(image)
+
+    def close(self):
+        if self.fallback is not None:
+            self.fallback.close()
+
+
+def load_samples(directory):
+    samples = []
+    for name in sorted(os.listdir(directory)):
+        stem, ext = os.path.splitext(name)
+        if ext.lower() not in (".png", ".jpg", ".jpeg", ".gif"):
+            continue
+        with open(os.path.join(directory, name), "rb") as f:
+            samples.append((f.read(), stem.split("_")[0]))
+    return samples
+
+
+def evaluate(model, samples, min_confidence=0.0):
+    """Accuracy and latency of the model over labelled samples"""
+    correct = chars = chars_correct = confident = confident_correct = 0
+    timings = []
+    for image, answer in samples:
+        started = time.perf_counter()
+        guess, confidence = model.predict(image)
+        timings.append((time.perf_counter() - started) * 1000)
+        correct += guess == answer
+        chars += len(answer)
+        chars_correct += sum(a == b for a, b in zip(guess, answer))
+        if confidence >= min_confidence:
+            confident += 1
+            confident_correct += guess == answer
+    timings.sort()
+    return {
+        "samples": len(samples),
+        "accuracy": correct / len(samples) if samples else 0.0,
+        "char_accuracy": chars_correct / chars if chars else 0.0,
+        "answered": confident,
+        "answered_accuracy": confident_correct / confident if confident else 0.0,
+        "latency_ms_p50": timings[len(timings) // 2] if timings else 0.0,
+        "latency_ms_p95": timings[int(len(timings) * 0.95)] if timings else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=("train", "eval"))
+    parser.add_argument("samples", help="directory of <ANSWER>_<n>.png files")
+    parser.add_argument("model", help="model JSON file")
+    parser.add_argument("--min-confidence", type=float, default=0.5,
+                        help="eval: confidence below which the remote provider would be used")
+    args = parser.parse_args()
+
+    samples = load_samples(args.samples)
+    if args.command == "train":
+        model = LocalCaptchaModel()
+        used = model.train(samples)
+        model.save(args.model)
+        print(f"Trained on {used} of {len(samples)} samples, {len(model.templates)} characters")
+    else:
+        print(json.dumps(evaluate(LocalCaptchaModel.load(args.model), samples, args.min_confidence), indent=2))
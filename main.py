@@ -1,22 +1,71 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Header, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional
+from contextlib import asynccontextmanager
 import asyncio
+import json
 import threading
+import time
 import uuid
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
+from email.utils import formatdate, parsedate_to_datetime
 
 #  scraper functions
-from delhi_scrappper import get_courts, save_all_tables_to_pdf
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait, Select
-from selenium.webdriver.support import expected_conditions as EC
-import time
+from delhi_scrappper import get_complexes, get_courts
+from driver_pool import DriverPool, PoolExhausted
+from court_cache import CourtCache
+from court_catalogue import CourtCatalogue
+from jobs import JobQueue, QueueFull, make_store
+from results_store import ResultsStore, search_expression
+from result_cache import ResultCache, result_key
+from scrape_flow import (scrape_pool, open_court_search, write_pdf, artifact_store, artifact_key, DOWNLOADS_DIR,
+                         site_sessions)
+from events import bus, Session
+from captcha_solver import close_shared_solver, shared_solver
+from prefetch import Prefetcher, parse_watchlist
+from metrics import registry, SCRAPE_SECONDS
+from cause_list import CauseListTable
+import exports
+import http_engine
+import pdf_render
+import config
+from selenium.webdriver.support.ui import WebDriverWait
+
+# Shared browser pools, configured by DRIVER_PROFILE
+courts_pool = DriverPool(name="courts")
+court_cache = CourtCache()
+results_store = ResultsStore()
+result_cache = ResultCache(results_store)
 
-app = FastAPI(title="ecourt-scraper")
+@asynccontextmanager
+async def lifespan(app):
+    if config.SCRAPER_ENGINE != "http":
+        threading.Thread(target=courts_pool.prestart, daemon=True).start()
+        threading.Thread(target=scrape_pool.prestart, daemon=True).start()
+    for job in job_queue.recover():
+        # sessions live in memory, so jobs requeued after a restart get a fresh one
+        if job["kind"] == "scrape":
+            active_sessions[job["id"]] = new_session(job["id"], ScrapeRequest(**job["payload"]))
+        else:
+            # bulk runs can't be resumed without their parent
+            job_queue.cancel(job["id"])
+    job_queue.start()
+    if prefetcher.watchlist:
+        if config.SCRAPER_ENGINE != "http" or shared_solver() is None:
+            print("Prefetch needs the HTTP engine and automatic CAPTCHA solving, its scrapes will fail")
+        prefetcher.start()
+    yield
+    prefetcher.stop()
+    job_queue.stop()
+    pdf_render.shutdown()
+    close_shared_solver()
+    courts_pool.close()
+    scrape_pool.close()
+
+app = FastAPI(title="ecourt-scraper", lifespan=lifespan)
 
 #  CORS middleware for React frontend
 app.add_middleware(
@@ -27,18 +76,39 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Store active scraping sessions
+# Store active scraping sessions; finished ones are evicted, their results live in results_store
 active_sessions = {}
 
+FINISHED = ("completed", "error")
+
+def evict_sessions():
+    """Drop finished sessions past SESSION_TTL, and the oldest finished ones beyond MAX_SESSIONS"""
+    now = time.time()
+    for sessions in (active_sessions, bulk_sessions):
+        finished = sorted((s.get("finished_at", now), key) for key, s in list(sessions.items())
+                          if s["status"] in FINISHED)
+        overflow = max(0, len(sessions) - config.MAX_SESSIONS)
+        for idx, (finished_at, key) in enumerate(finished):
+            if idx < overflow or now - finished_at > config.SESSION_TTL:
+                sessions.pop(key, None)
+
 class Court(BaseModel):
-    index: int
+    index: int  # within its complex, what court_index refers to
     name: str
     code: str
+    est_code: Optional[str] = None
+    complex: Optional[str] = None
 
 class ScrapeRequest(BaseModel):
     court_index: int
     date: str  # YYYY-MM-DD format
     case_type: str  # "civil" or "criminal"
+    priority: int = 0  # higher runs first
+    refresh: bool = False  # skip the result cache and scrape again
+    client_id: Optional[str] = None  # reuse this client's court site session across searches
+    est_code: Optional[str] = None  # court complex; the first one when omitted
+    unattended: bool = False  # fail instead of waiting for a typed CAPTCHA (prefetch)
+    formats: Optional[List[str]] = None  # data exports to offer: csv, ndjson, parquet (default EXPORT_FORMATS)
 
 class ScrapeResponse(BaseModel):
     session_id: str
@@ -51,7 +121,14 @@ class SessionStatus(BaseModel):
     status: str  # "pending", "captcha_required", "processing", "completed", "error"
     message: str
     pdf_url: Optional[str] = None
-    tables: Optional[List] = None
+    captcha_url: Optional[str] = None  # set when the CAPTCHA must be typed into the frontend
+    tables_url: Optional[str] = None  # paginated rows, once the result is stored
+    tables: Optional[List] = None  # only with ?include_tables=true
+    timings: Optional[dict] = None  # seconds spent per stage, while the session is in memory
+    exports: Optional[dict] = None  # format -> download URL, written on first download
+
+class CaptchaAnswer(BaseModel):
+    captcha: Optional[str] = None
 
 @app.get("/")
 def root():
@@ -61,53 +138,144 @@ def root():
 def health():
     return {"status": "ok"}
 
+def load_courts(est_code=None):
+    if config.SCRAPER_ENGINE == "http":
+        return http_engine.get_courts(est_code)
+    with courts_pool.driver() as driver:
+        return get_courts(driver, WebDriverWait(driver, 15), est_code)
+
+def load_complexes():
+    if config.SCRAPER_ENGINE == "http":
+        return http_engine.get_complexes()
+    with courts_pool.driver() as driver:
+        return get_complexes(driver, WebDriverWait(driver, 15))
+
+court_catalogue = CourtCatalogue(
+    court_cache, load_complexes, load_courts,
+    # every Selenium load holds a pooled driver
+    workers=config.CATALOGUE_WORKERS if config.SCRAPER_ENGINE == "http"
+    else min(config.CATALOGUE_WORKERS, config.DRIVER_POOL_SIZE),
+)
+
 @app.get("/api/courts", response_model=List[Court])
-async def get_available_courts():
-    """Get list of available courts"""
+def get_available_courts(est_code: Optional[str] = None, refresh: bool = False, all: bool = False):
+    """Get list of available courts, of one complex or (all=true) of every complex"""
     try:
-        
-        options = webdriver.ChromeOptions()
-        options.add_argument("--headless")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        
-        driver = webdriver.Chrome(options=options)
-        wait = WebDriverWait(driver, 15)
-        
-        try:
-            courts = get_courts(driver, wait)
-            court_list = []
-            for idx, court in enumerate(courts):
-                court_list.append(Court(
-                    index=idx,
-                    name=court['name'],
-                    code=court['code']
-                ))
-            return court_list
-        finally:
-            driver.quit()
-            
+        if all:
+            return [Court(**court) for court in court_catalogue.courts(refresh)]
+
+        if refresh:
+            court_cache.invalidate(est_code)
+        courts = court_cache.get(est_code, lambda: load_courts(est_code))
+        court_list = []
+        for idx, court in enumerate(courts):
+            court_list.append(Court(
+                index=idx,
+                name=court['name'],
+                code=court['code'],
+                est_code=court.get('est_code'),
+            ))
+        return court_list
+
+    except PoolExhausted as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching courts: {str(e)}")
 
-@app.post("/api/scrape/start", response_model=ScrapeResponse)
-async def start_scraping(request: ScrapeRequest, background_tasks: BackgroundTasks):
-    """Start the scraping process"""
-    session_id = str(uuid.uuid4())
-    
-    # Store session info
-    active_sessions[session_id] = {
+def new_session(session_id, request: ScrapeRequest):
+    evict_sessions()
+    return Session(session_id, {
         "status": "pending",
-        "message": "Initializing scraper...",
+        "message": "Waiting for a free worker...",
         "court_index": request.court_index,
         "date": request.date,
         "case_type": request.case_type,
         "driver": None,
-        "pdf_url": None
-    }
+        "pdf_url": None,
+        "captcha_url": None,
+        "captcha_event": threading.Event(),
+        "unattended": request.unattended,
+        "formats": request.formats,
+    })
+
+def export_formats(formats):
+    """Requested export formats, or the configured ones that are available"""
+    if formats is None:
+        return [fmt for fmt in config.EXPORT_FORMATS if fmt in exports.available_formats()]
+    try:
+        return exports.check_formats(formats)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def export_urls(path, formats):
+    return {fmt: f"{path}/{fmt}" for fmt in formats} or None
+
+def requested_court(court_index, est_code=None):
+    """Court for an index in the (cached) court list of a complex, None if unknown"""
+    try:
+        courts = court_cache.get(est_code, lambda: load_courts(est_code))
+    except Exception:
+        return None
+    return courts[court_index] if 0 <= court_index < len(courts) else None
+
+def current_pdf_url(result):
+    """The stored result's PDF URL, re-rendered if its file has been evicted"""
+    url = result["pdf_url"]
+    if not url:
+        return url
+    key = artifact_key(url)
+    if key is not None and artifact_store.exists(key):
+        return url
+    if key is None and os.path.exists(os.path.join(DOWNLOADS_DIR, os.path.basename(url))):
+        return url
+    url = write_pdf(results_store.tables(result["id"]), f"{result['court_name']}_{result['case_type']}", result["date"])
+    results_store.set_pdf_url(result["id"], url)
+    return url
+
+def leader_of(session):
+    """The session actually scraping for a session coalesced onto it"""
+    if session.get("follow") and session["status"] not in FINISHED:
+        return active_sessions.get(session["follow"]) or session
+    return session
+
+@app.post("/api/scrape/start", response_model=ScrapeResponse)
+def start_scraping(request: ScrapeRequest):
+    """Start the scraping process"""
+    session_id = str(uuid.uuid4())
+    request.formats = export_formats(request.formats)
+    
+    # Store session info
+    session = new_session(session_id, request)
+    active_sessions[session_id] = session
     
+    court = requested_court(request.court_index, request.est_code)
+    if court:
+        cached = None if request.refresh else result_cache.lookup(court, request.date, request.case_type)
+        if cached:
+            results_store.link_session(session_id, cached["id"], request.formats)
+            session.update(status="completed", result_id=cached["id"], pdf_url=current_pdf_url(cached),
+                           finished_at=time.time(),
+                           message="Cause list extracted successfully!" if cached["row_count"]
+                           else "No cause list found for the selected parameters")
+            return ScrapeResponse(session_id=session_id, status="completed", message="Served from cache.")
+        
+        session["cache_key"] = result_key(court, request.date, request.case_type)
+        leader_id = result_cache.join(session["cache_key"], session_id)
+        if leader_id:
+            session["follow"] = leader_id
+            return ScrapeResponse(
+                session_id=session_id,
+                status="pending",
+                message="An identical scrape is already running, following it."
+            )
     
-    background_tasks.add_task(run_scraper, session_id, request)
+    try:
+        job_queue.submit(session_id, "scrape", request.model_dump(), request.priority)
+    except QueueFull as e:
+        if session.get("cache_key"):
+            result_cache.release(session["cache_key"])
+        del active_sessions[session_id]
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "30"})
     
     return ScrapeResponse(
         session_id=session_id,
@@ -116,31 +284,342 @@ async def start_scraping(request: ScrapeRequest, background_tasks: BackgroundTas
     )
 
 @app.get("/api/scrape/status/{session_id}", response_model=SessionStatus)
-async def get_scrape_status(session_id: str):
+async def get_scrape_status(session_id: str, include_tables: bool = False):
     """Get status of scraping session"""
-    if session_id not in active_sessions:
-        raise HTTPException(status_code=404, detail="Session not found")
+    session = active_sessions.get(session_id)
+    if session is None:
+        # evicted sessions are still answered from the results store
+        result_id = results_store.session_result(session_id)
+        if result_id is None:
+            raise HTTPException(status_code=404, detail="Session not found")
+        result = results_store.get(result_id, with_tables=include_tables)
+        # sessions linked before formats were stored get the default ones
+        formats = results_store.session_formats(session_id)
+        if formats is None:
+            formats = export_formats(None)
+        return SessionStatus(
+            session_id=session_id,
+            status="completed",
+            message="Cause list extracted successfully!" if result["row_count"] else "No cause list found for the selected parameters",
+            pdf_url=result["pdf_url"],
+            tables_url=f"/api/scrape/tables/{session_id}",
+            tables=(result["tables"] or None) if include_tables else None,
+            exports=export_urls(f"/api/scrape/export/{session_id}", formats)
+        )
     
-    session = active_sessions[session_id]
+    formats = session.get("formats") or []
+    session = leader_of(session)
+    
+    tables = None
+    if include_tables and session.get("result_id") is not None:
+        tables = results_store.get(session["result_id"])["tables"] or None
     return SessionStatus(
         session_id=session_id,
         status=session["status"],
         message=session["message"],
         pdf_url=session.get("pdf_url"),
-        tables=session.get("tables")
+        captcha_url=session.get("captcha_url"),
+        tables_url=f"/api/scrape/tables/{session_id}" if session.get("result_id") is not None else None,
+        tables=tables,
+        timings=dict(session["timings"]) if session.get("timings") else None,
+        exports=export_urls(f"/api/scrape/export/{session_id}", formats) if session.get("result_id") is not None else None
+    )
+
+class TableHeader(BaseModel):
+    caption: str
+    headers: List[str]
+
+class TableRow(BaseModel):
+    table: int
+    row: int
+    cells: List[str]
+    serial: Optional[int] = None
+    case_type: Optional[str] = None  # parsed from the case number column
+    case_no: Optional[int] = None
+    case_year: Optional[int] = None
+
+class TablePage(BaseModel):
+    session_id: str
+    tables: List[TableHeader]
+    rows: List[TableRow]
+    next_cursor: Optional[str] = None  # None on the last page
+
+def session_result_id(session_id):
+    """Stored result behind a session, following coalesced and evicted sessions"""
+    session = active_sessions.get(session_id)
+    if session is not None:
+        return leader_of(session).get("result_id")
+    return results_store.session_result(session_id)
+
+def parse_cursor(cursor):
+    try:
+        table_idx, row_idx = (int(part) for part in cursor.split("."))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return table_idx, row_idx
+
+@app.get("/api/scrape/tables/{session_id}", response_model=TablePage)
+def get_scrape_tables(session_id: str, cursor: Optional[str] = None, limit: Optional[int] = None,
+                      if_none_match: Optional[str] = Header(None)):
+    """One page of result rows; `next_cursor` fetches the following page"""
+    result_id = session_result_id(session_id)
+    if result_id is None:
+        if session_id in active_sessions:
+            raise HTTPException(status_code=409, detail="Result not ready yet")
+        raise HTTPException(status_code=404, detail="Session not found")
+    result = results_store.get(result_id, with_tables=False)
+    start = parse_cursor(cursor) if cursor else (0, 0)
+    limit = min(max(limit or config.TABLE_PAGE_SIZE, 1), config.TABLE_PAGE_MAX)
+    
+    # a re-scrape rewrites the result in place, so its time versions every page
+    etag = f'"{result_id}-{int(result["scraped_at"] * 1000)}-{start[0]}.{start[1]}-{limit}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if if_none_match and etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    
+    rows = results_store.rows(result_id, start, limit + 1)
+    next_cursor = f"{rows[limit][0]}.{rows[limit][1]}" if len(rows) > limit else None
+    page = TablePage(
+        session_id=session_id,
+        tables=[TableHeader(caption=caption, headers=table_headers)
+                for caption, table_headers in results_store.table_headers(result_id)],
+        rows=[TableRow(table=t, row=r, **entry.to_json()) for t, r, entry in rows[:limit]],
+        next_cursor=next_cursor,
+    )
+    return Response(content=page.model_dump_json(), media_type="application/json", headers=headers)
+
+def not_modified(request_headers, etag, mtime):
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag in (tag.strip() for tag in if_none_match.split(",")) or if_none_match.strip() == "*"
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+def export_response(path, key, filename, media_type, request_headers):
+    """A generated export, revalidated by its content hash"""
+    stat = os.stat(path)
+    headers = {"ETag": f'"{key}"', "Last-Modified": formatdate(stat.st_mtime, usegmt=True), "Cache-Control": "no-cache"}
+    if not_modified(request_headers, headers["ETag"], stat.st_mtime):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type=media_type, filename=filename, headers=headers, stat_result=stat)
+
+@app.get("/api/scrape/export/{session_id}/{fmt}")
+def export_scrape(session_id: str, fmt: str, request: Request):
+    """The session's cause list as CSV, NDJSON or Parquet, written on the first download"""
+    (fmt,) = export_formats([fmt])
+    result_id = session_result_id(session_id)
+    if result_id is None:
+        if session_id in active_sessions:
+            raise HTTPException(status_code=409, detail="Result not ready yet")
+        raise HTTPException(status_code=404, detail="Session not found")
+    result = results_store.get(result_id, with_tables=False)
+    path = exports.export_list(results_store, result, fmt)
+    key = os.path.basename(path).split(".")[0]
+    return export_response(path, key, exports.filename(result, fmt), exports.FORMATS[fmt][1], request.headers)
+
+class SearchHit(BaseModel):
+    cause_list_id: int
+    est_code: str
+    court_code: str
+    court_name: str
+    date: str
+    case_type: str  # "civil" or "criminal"
+    caption: str
+    pdf_url: Optional[str] = None
+    score: float
+    row: TableRow
+
+class SearchPage(BaseModel):
+    total: int
+    hits: List[SearchHit]
+    next_offset: Optional[int] = None  # None on the last page
+
+@app.get("/api/search", response_model=SearchPage)
+def search_cause_lists(q: Optional[str] = None, party: Optional[str] = None, advocate: Optional[str] = None,
+                       case_number: Optional[str] = None, court_code: Optional[str] = None,
+                       est_code: Optional[str] = None, date_from: Optional[str] = None, date_to: Optional[str] = None,
+                       case_type: Optional[str] = None, limit: Optional[int] = None, offset: int = 0):
+    """Ranked rows of every stored cause list matching the text and filters"""
+    match = search_expression(q, party, advocate, case_number)
+    if match is None:
+        raise HTTPException(status_code=400, detail="Give q, party, advocate or case_number to search for")
+    limit = min(max(limit or config.SEARCH_PAGE_SIZE, 1), config.SEARCH_PAGE_MAX)
+    offset = max(offset, 0)
+    try:
+        total, hits = results_store.search(match, court_code, est_code, date_from, date_to, case_type, limit, offset)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return SearchPage(
+        total=total,
+        hits=[SearchHit(cause_list_id=hit["id"], est_code=hit["est_code"], court_code=hit["court_code"],
+                        court_name=hit["court_name"], date=hit["date"], case_type=hit["case_type"],
+                        caption=hit["caption"], pdf_url=hit["pdf_url"], score=hit["score"],
+                        row=TableRow(table=hit["table"], row=hit["row"], **hit["entry"].to_json()))
+              for hit in hits],
+        next_offset=offset + limit if offset + limit < total else None,
     )
 
+class ChangedRow(BaseModel):
+    table: int
+    row: int  # position in the new list; in the previous one for removed rows
+    caption: str
+    cells: List[str]
+    before: Optional[List[str]] = None  # previous cells of a changed row
+
+class CauseListChange(BaseModel):
+    cause_list_id: int
+    est_code: str
+    court_name: str
+    case_type: str
+    scraped_at: float
+    initial: bool  # first scrape of this list, every row is new and none are listed
+    counts: dict  # number of added, removed and changed rows
+    added: List[ChangedRow]
+    removed: List[ChangedRow]
+    changed: List[ChangedRow]
+
+class CauseListChanges(BaseModel):
+    court_code: str
+    date: str
+    changes: List[CauseListChange]
+    latest: Optional[float] = None  # pass as `since` to get only later changes
+
+@app.get("/api/causelist/{court}/{date}/changes", response_model=CauseListChanges)
+def get_cause_list_changes(court: str, date: str, est_code: Optional[str] = None, case_type: Optional[str] = None,
+                           since: Optional[float] = None, limit: int = 100):
+    """Rows added, removed and changed by each scrape of a court's lists for a date, oldest first
+
+    Re-scrapes that found the list unchanged aren't listed.
+    """
+    changes = results_store.changes(court, date, est_code, case_type, since, min(max(limit, 1), 1000))
+    return CauseListChanges(
+        court_code=court,
+        date=date,
+        changes=[CauseListChange(cause_list_id=change["id"], est_code=change["est_code"],
+                                 court_name=change["court_name"], case_type=change["case_type"],
+                                 scraped_at=change["changed_at"], initial=change["initial"], counts=change["counts"],
+                                 added=change["added"], removed=change["removed"], changed=change["changed"])
+                 for change in changes],
+        latest=changes[-1]["changed_at"] if changes else since,
+    )
+
+def table_lines(index, caption, headers, rows):
+    yield json.dumps({"table": index, "caption": caption, "headers": headers}) + "\n"
+    for row_idx, entry in enumerate(CauseListTable.from_rows(caption, headers, rows).entries):
+        yield json.dumps({"table": index, "row": row_idx, **entry.to_json()}) + "\n"
+
+@app.get("/api/scrape/tables/{session_id}/stream")
+async def stream_scrape_tables(session_id: str):
+    """NDJSON of each table's header line and rows, sent as the scrape extracts them"""
+    session = active_sessions.get(session_id)
+    if session is None and results_store.session_result(session_id) is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    topics = [session_id] + ([session["follow"]] if session and session.get("follow") else [])
+    
+    async def lines():
+        queue = bus.subscribe(*topics)
+        sent = set()
+        try:
+            # live rows while the scrape runs
+            while session is not None and session_id in active_sessions \
+                    and leader_of(session)["status"] not in FINISHED:
+                try:
+                    kind, payload = await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_INTERVAL)
+                except asyncio.TimeoutError:
+                    continue
+                if kind == "rows" and payload["index"] not in sent:
+                    sent.add(payload["index"])
+                    for line in table_lines(payload["index"], payload["caption"], payload["headers"], payload["rows"]):
+                        yield line
+        finally:
+            bus.unsubscribe(queue, *topics)
+        
+        # then whatever was extracted before we subscribed, from the store
+        result_id = session_result_id(session_id)
+        if result_id is not None:
+            for index, (caption, headers, rows) in enumerate(results_store.tables(result_id)):
+                if index not in sent:
+                    for line in table_lines(index, caption, headers, rows):
+                        yield line
+        
+        state = leader_of(session) if session is not None else {"status": "completed", "message": "Stored result"}
+        yield json.dumps({"status": state["status"], "message": state["message"]}) + "\n"
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+HEARTBEAT_INTERVAL = 15
+
+def sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.get("/api/scrape/events/{session_id}")
+async def stream_scrape_events(session_id: str):
+    """Server-Sent Events for one session: `status` on every change, `table` per extracted table"""
+    session = active_sessions.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    topics = [session_id] + ([session["follow"]] if session.get("follow") else [])
+    
+    async def events():
+        queue = bus.subscribe(*topics)
+        try:
+            current, sent = leader_of(session).snapshot(), None
+            while True:
+                if current != sent:
+                    yield sse("status", dict(current, session_id=session_id))
+                    sent = current
+                if current["status"] in FINISHED:
+                    return
+                try:
+                    kind, payload = await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                # only the latest status of a burst matters, tables are all sent
+                batch = [(kind, payload)]
+                while not queue.empty():
+                    batch.append(queue.get_nowait())
+                for kind, payload in batch:
+                    if kind == "status":
+                        current = payload
+                    elif kind == "table":
+                        yield sse(kind, payload)
+        finally:
+            bus.unsubscribe(queue, *topics)
+    
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.get("/api/scrape/captcha/{session_id}")
+async def get_captcha_image(session_id: str):
+    """CAPTCHA image for sessions on the HTTP engine or a headless browser"""
+    session = active_sessions.get(session_id)
+    if not session or not session.get("captcha_image"):
+        raise HTTPException(status_code=404, detail="No CAPTCHA pending for this session")
+    return Response(content=session["captcha_image"], media_type="image/png",
+                    headers={"Cache-Control": "no-store"})
+
 @app.post("/api/scrape/captcha-solved/{session_id}")
-async def captcha_solved(session_id: str):
+async def captcha_solved(session_id: str, answer: Optional[CaptchaAnswer] = None):
     """Notify that CAPTCHA has been solved"""
     if session_id not in active_sessions:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    session = active_sessions[session_id]
+    session = leader_of(active_sessions[session_id])
     if session["status"] != "captcha_required":
         raise HTTPException(status_code=400, detail="Session not waiting for CAPTCHA")
     
+    if session.get("captcha_url"):
+        if not answer or not answer.captcha:
+            raise HTTPException(status_code=400, detail="CAPTCHA text is required")
+        session["captcha_text"] = answer.captcha.strip()
     session["captcha_solved"] = True
+    session["captcha_event"].set()
     return {"message": "CAPTCHA confirmation received"}
 
 @app.delete("/api/scrape/{session_id}")
@@ -149,148 +628,452 @@ async def cancel_scraping(session_id: str):
     if session_id not in active_sessions:
         raise HTTPException(status_code=404, detail="Session not found")
     
+    job_queue.cancel(session_id)
     session = active_sessions[session_id]
-    if session.get("driver"):
-        session["driver"].quit()
+    if not session.get("follow"):
+        session["cancelled"] = True
+        session["captcha_event"].set()
+        if session.get("driver"):
+            session["driver"].quit()
+        finish_followers(session, status="error", message="Error: the scrape being followed was cancelled")
     
     del active_sessions[session_id]
     return {"message": "Session cancelled"}
 
-async def run_scraper(session_id: str, request: ScrapeRequest):
-    """Background task to run the scraper"""
-    session = active_sessions[session_id]
+def finish_followers(session, **fields):
+    """Give sessions coalesced onto this one the same outcome"""
+    if not session.get("cache_key"):
+        return
+    for follower_id in result_cache.release(session["cache_key"]):
+        follower = active_sessions.get(follower_id)
+        if follower is not None:
+            follower.update(fields, finished_at=time.time())
+            if follower.get("result_id") is not None:
+                results_store.link_session(follower_id, follower["result_id"], follower.get("formats"))
+
+def run_scraper(session_id: str, request: ScrapeRequest):
+    """Run one scrape on a job worker thread"""
+    session = active_sessions.get(session_id)
+    if session is None:
+        return
     
+    search = None
+    started = time.perf_counter()
     try:
         
         session["status"] = "initializing"
-        session["message"] = "Setting up browser..."
-        
-        options = webdriver.ChromeOptions()
-        
-        options.add_argument("--start-maximized")
-        
-        driver = webdriver.Chrome(options=options)
-        wait = WebDriverWait(driver, 15)
-        session["driver"] = driver
-        
-        
-        session["message"] = "Loading courts..."
-        courts = get_courts(driver, wait)
-        
-        if request.court_index >= len(courts):
-            raise Exception("Invalid court index")
-        
-        selected_court = courts[request.court_index]
-        
-       
-        session["message"] = "Selecting court..."
-        Select(driver.find_element(By.ID, "court")).select_by_value(selected_court['code'])
-        time.sleep(1)
-        
-        
-        session["message"] = "Setting date..."
-        driver.find_element(By.CSS_SELECTOR, ".icon[aria-label^='Choose Date']").click()
-        time.sleep(1)
-        date_btn = driver.find_element(By.CSS_SELECTOR, f"button.dateButton[data-date='{request.date}']")
-        date_btn.click()
-        time.sleep(1)
-        
-        
-        session["message"] = "Setting case type..."
-        if request.case_type.lower() == "criminal":
-            driver.find_element(By.ID, "chkCauseTypeCriminal").click()
-        else:
-            driver.find_element(By.ID, "chkCauseTypeCivil").click()
-        time.sleep(1)
-        
-        
-        session["status"] = "captcha_required"
-        session["message"] = "Please solve CAPTCHA in the browser window"
-        session["captcha_solved"] = False
-        
-        
-        timeout = 300  
-        elapsed = 0
-        while not session.get("captcha_solved", False) and elapsed < timeout:
-            await asyncio.sleep(2)
-            elapsed += 2
-        
-        if not session.get("captcha_solved", False):
-            raise Exception("CAPTCHA timeout - please try again")
-        
-        
-        session["status"] = "processing"
-        session["message"] = "Searching for cause list..."
-        driver.find_element(By.CSS_SELECTOR, "input[type='submit'][value='Search']").click()
-        
-        
-        wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, ".distTableContent")))
-        time.sleep(2)
+        search = open_court_search(session_id, session, request.court_index, request.client_id, request.est_code)
+        all_tables = search.search(request.date, request.case_type)
+        search.close()
         
+        # Generate PDF, unless the list is the same as last time
+        pdf_url = None
+        previous = results_store.find(search.court, request.date, request.case_type)
+        if all_tables and previous and previous["pdf_url"] and results_store.unchanged(previous["id"], all_tables):
+            pdf_url = current_pdf_url(previous)
+        elif all_tables:
+            session["message"] = "Generating PDF..."
+            pdf_url = write_pdf(all_tables, f"{search.court['name']}_{request.case_type.lower()}", request.date, session)
         
-        session["message"] = "Extracting cause list data..."
-        dist_contents = driver.find_elements(By.CSS_SELECTOR, ".distTableContent")
-        all_tables = []
+        result_id = results_store.save(search.court, request.date, request.case_type, all_tables, pdf_url)
+        results_store.link_session(session_id, result_id, request.formats)
+        # one update so the pushed "completed" event carries its final message
+        session.update(result_id=result_id, pdf_url=pdf_url, status="completed",
+                       message="Cause list extracted successfully!" if all_tables
+                       else "No cause list found for the selected parameters")
         
-        for content in dist_contents:
-            tables = content.find_elements(By.TAG_NAME, "table")
-            for table in tables:
-                caption_elems = table.find_elements(By.TAG_NAME, "caption")
-                caption = caption_elems[0].text if caption_elems else "Cause List"
-                
-                headers = [th.text for th in table.find_elements(By.TAG_NAME, "th")]
-                
-                rows = []
-                for row in table.find_elements(By.TAG_NAME, "tr")[1:]:
-                    cells = []
-                    for td in row.find_elements(By.TAG_NAME, "td"):
-                        bt_content = td.find_elements(By.CLASS_NAME, "bt-content")
-                        if bt_content:
-                            cells.append(bt_content[0].text)
-                        else:
-                            cells.append(td.text)
-                    if cells:
-                        rows.append(cells)
-                
-                all_tables.append((caption, headers, rows))
+    except Exception as e:
+        session.update(status="error", message=f"Error: {str(e)}")
+    
+    finally:
+        session["finished_at"] = time.time()
+        if search:
+            search.close()
+        SCRAPE_SECONDS.observe(time.perf_counter() - started, outcome=session["status"])
+        finish_followers(session, status=session["status"], message=session["message"],
+                         result_id=session.get("result_id"), pdf_url=session.get("pdf_url"))
+
+def run_scrape_job(session_id, payload):
+    run_scraper(session_id, ScrapeRequest(**payload))
+
+# Watchlist prefetch: the same scrapes users start, queued below their priority
+def prefetch_scrape(est_code, court_index, date, case_type):
+    try:
+        response = start_scraping(ScrapeRequest(court_index=court_index, est_code=est_code, date=date,
+                                                case_type=case_type, priority=config.PREFETCH_PRIORITY,
+                                                unattended=True))
+    except HTTPException as e:
+        if e.status_code == 429:
+            return None
+        raise
+    return response.session_id, response.status == "completed"
+
+def prefetch_finished(session_id):
+    session = active_sessions.get(session_id)
+    if session is None:
+        return results_store.session_result(session_id) is not None
+    if session["status"] not in FINISHED:
+        return None
+    return session["status"] == "completed"
+
+prefetcher = Prefetcher(prefetch_scrape, prefetch_finished, parse_watchlist(config.PREFETCH_WATCHLIST))
+
+@app.get("/api/prefetch")
+def prefetch_status():
+    """Watchlist prefetch counters"""
+    return prefetcher.stats()
+
+# Bulk scrapes: one job per court, each running all of that court's
+# (date, case type) items on a single browser/HTTP session
+bulk_sessions = {}
+
+class BulkScrapeRequest(BaseModel):
+    court_indices: List[int]
+    date_from: str  # YYYY-MM-DD format
+    date_to: str
+    case_types: List[str] = ["civil"]
+    priority: int = 0
+    est_code: Optional[str] = None  # court complex the indices refer to
+    formats: Optional[List[str]] = None  # data exports to offer, each as a ZIP of every list
+
+class BulkItem(BaseModel):
+    court_index: int
+    court_name: Optional[str] = None
+    date: str
+    case_type: str
+    status: str  # "pending", "running", "completed", "empty", "error"
+    rows: int = 0
+    message: Optional[str] = None
+
+class BulkStatus(BaseModel):
+    bulk_id: str
+    status: str
+    message: str
+    sessions: List[str]
+    items: List[BulkItem]
+    pdf_url: Optional[str] = None
+    exports: Optional[dict] = None  # format -> ZIP download URL, written on first download
+    tables: Optional[List] = None
+
+def bulk_key(court_index, date, case_type):
+    return f"{court_index}|{date}|{case_type}"
+
+def update_bulk_item(bulk, key, **fields):
+    with bulk["lock"]:
+        item = bulk["items"][key]
+        item.update(fields)
+        bulk["events"].append(dict(item))
+    bus.publish(bulk["id"], "item", None)
+
+def merged_bulk_tables(bulk):
+    merged = []
+    for key, item in bulk["items"].items():
+        result = bulk["results"].get(key)
+        if result is None:
+            continue
+        court_name, result_id = result
+        for caption, headers, rows in results_store.tables(result_id):
+            merged.append((f"{court_name} | {item['date']} | {item['case_type']} - {caption}", headers, rows))
+    return merged
+
+def finish_bulk_court(bulk):
+    with bulk["lock"]:
+        bulk["courts_left"] -= 1
+        if bulk["courts_left"]:
+            return
+    
+    try:
+        merged = merged_bulk_tables(bulk)
+        if merged:
+            bulk["message"] = "Generating PDF..."
+            bulk["pdf_url"] = write_pdf(merged, f"bulk_{bulk['id'][:8]}", f"{bulk['date_from']}_{bulk['date_to']}")
+        failed = sum(1 for item in bulk["items"].values() if item["status"] == "error")
+        bulk["status"] = "completed"
+        bulk["message"] = f"{len(bulk['items']) - failed} of {len(bulk['items'])} items scraped"
+    except Exception as e:
+        bulk["status"] = "error"
+        bulk["message"] = f"Error: {str(e)}"
+    bulk["finished_at"] = time.time()
+    with bulk["lock"]:
+        bulk["events"].append({"status": bulk["status"], "message": bulk["message"], "pdf_url": bulk.get("pdf_url")})
+    bus.publish(bulk["id"], "done", None)
+
+def run_bulk_job(session_id, payload):
+    bulk = bulk_sessions.get(payload["bulk_id"])
+    session = active_sessions.get(session_id)
+    if bulk is None or session is None:
+        return
+    
+    court_index = payload["court_index"]
+    search = None
+    started = time.perf_counter()
+    remaining = [bulk_key(court_index, date, case_type) for date, case_type in payload["items"]]
+    try:
+        session["status"] = "initializing"
+        search = open_court_search(session_id, session, court_index, est_code=payload.get("est_code"))
         
-        # Generate PDF
-        if all_tables:
-            session["message"] = "Generating PDF..."
-            downloads_dir = os.path.join(os.path.dirname(__file__), "downloads")
-            os.makedirs(downloads_dir, exist_ok=True)
+        for date, case_type in payload["items"]:
+            key = remaining.pop(0)
+            update_bulk_item(bulk, key, status="running", court_name=search.court['name'])
+            cached = result_cache.lookup(search.court, date, case_type)
+            if cached:
+                with bulk["lock"]:
+                    bulk["results"][key] = (search.court['name'], cached["id"])
+                update_bulk_item(bulk, key, status="completed" if cached["row_count"] else "empty",
+                                 rows=cached["row_count"], message="Served from cache")
+                continue
+            try:
+                tables = search.search(date, case_type)
+            except Exception as e:
+                if session.get("cancelled"):
+                    remaining.insert(0, key)
+                    raise
+                update_bulk_item(bulk, key, status="error", message=str(e))
+                continue
             
-            judge_name = selected_court['name'].replace('/', '_').replace('\\', '_').replace(' ', '_')
-            pdf_filename = f"cause_list_{judge_name}_{request.date}.pdf"
-            pdf_path = os.path.join(downloads_dir, pdf_filename)
-            
-            save_all_tables_to_pdf(all_tables, pdf_path)
-            
-            session["status"] = "completed"
-            session["message"] = "Cause list extracted successfully!"
-            session["pdf_url"] = f"/downloads/{pdf_filename}"
-            session["tables"] = [{"caption": cap, "headers": headers, "rows": rows} 
-                              for cap, headers, rows in all_tables]
-        else:
-            session["status"] = "completed"
-            session["message"] = "No cause list found for the selected parameters"
+            result_id = results_store.save(search.court, date, case_type, tables)
+            with bulk["lock"]:
+                bulk["results"][key] = (search.court['name'], result_id)
+            update_bulk_item(bulk, key, status="completed" if tables else "empty",
+                             rows=sum(len(rows) for _, _, rows in tables))
         
+        session.update(status="completed", message="All items for this court processed")
+    
     except Exception as e:
-        session["status"] = "error"
-        session["message"] = f"Error: {str(e)}"
+        session.update(status="error", message=f"Error: {str(e)}")
+        for key in remaining:
+            update_bulk_item(bulk, key, status="error", message=str(e))
     
     finally:
-        if session.get("driver"):
-            session["driver"].quit()
+        session["finished_at"] = time.time()
+        if search:
+            search.close()
+        SCRAPE_SECONDS.observe(time.perf_counter() - started, outcome=session["status"])
+        finish_followers(session, status=session["status"], message=session["message"],
+                         result_id=session.get("result_id"), pdf_url=session.get("pdf_url"))
+        finish_bulk_court(bulk)
+
+# scrapes and bulk runs both take their browsers from scrape_pool, so they share
+# one cap that never exceeds the drivers it holds
+browser_jobs = (config.SCRAPE_CONCURRENCY if config.SCRAPER_ENGINE == "http"
+                else min(config.SCRAPE_CONCURRENCY, scrape_pool.size))
+job_queue = JobQueue(make_store(), {"scrape": run_scrape_job, "bulk": run_bulk_job},
+                     limits={("scrape", "bulk"): browser_jobs})
+
+@app.post("/api/scrape/bulk", response_model=BulkStatus)
+async def start_bulk_scraping(request: BulkScrapeRequest):
+    """Fan a set of courts x dates x case types out over the job workers"""
+    try:
+        date_from = datetime.strptime(request.date_from, "%Y-%m-%d").date()
+        date_to = datetime.strptime(request.date_to, "%Y-%m-%d").date()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Dates must be in YYYY-MM-DD format")
+    if date_to < date_from:
+        raise HTTPException(status_code=400, detail="date_to is before date_from")
+    
+    courts = list(dict.fromkeys(request.court_indices))
+    case_types = list(dict.fromkeys(ct.lower() for ct in request.case_types))
+    dates = [(date_from + timedelta(days=n)).isoformat() for n in range((date_to - date_from).days + 1)]
+    if not courts or not case_types:
+        raise HTTPException(status_code=400, detail="At least one court and case type is required")
+    if len(courts) * len(dates) * len(case_types) > config.BULK_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Bulk requests are limited to {config.BULK_MAX_ITEMS} items")
+    
+    evict_sessions()
+    bulk_id = str(uuid.uuid4())
+    bulk = {
+        "id": bulk_id,
+        "status": "pending",
+        "message": "Waiting for free workers...",
+        "date_from": request.date_from,
+        "date_to": request.date_to,
+        "sessions": [],
+        "items": {},
+        "results": {},
+        "events": [],
+        "courts_left": len(courts),
+        "formats": export_formats(request.formats),
+        "lock": threading.Lock(),
+    }
+    for court_index in courts:
+        for date in dates:
+            for case_type in case_types:
+                bulk["items"][bulk_key(court_index, date, case_type)] = {
+                    "court_index": court_index, "date": date, "case_type": case_type, "status": "pending"}
+    bulk_sessions[bulk_id] = bulk
+    
+    for court_index in courts:
+        session_id = str(uuid.uuid4())
+        active_sessions[session_id] = new_session(session_id, ScrapeRequest(
+            court_index=court_index, date=dates[0], case_type=case_types[0]))
+        active_sessions[session_id]["bulk_id"] = bulk_id
+        try:
+            job_queue.submit(session_id, "bulk", {
+                "bulk_id": bulk_id,
+                "court_index": court_index,
+                "est_code": request.est_code,
+                "items": [[date, case_type] for date in dates for case_type in case_types],
+            }, request.priority)
+        except QueueFull as e:
+            del active_sessions[session_id]
+            cancel_bulk(bulk)
+            raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "30"})
+        bulk["sessions"].append(session_id)
+    
+    bulk["status"] = "running"
+    return bulk_status(bulk)
+
+def bulk_status(bulk, include_tables=False):
+    return BulkStatus(
+        bulk_id=bulk["id"],
+        status=bulk["status"],
+        message=bulk["message"],
+        sessions=bulk["sessions"],
+        items=[BulkItem(**item) for item in bulk["items"].values()],
+        pdf_url=bulk.get("pdf_url"),
+        exports=export_urls(f"/api/scrape/bulk/{bulk['id']}/export", bulk["formats"])
+        if bulk["status"] == "completed" and bulk["results"] else None,
+        tables=[{"caption": cap, "headers": headers, "rows": rows}
+                for cap, headers, rows in merged_bulk_tables(bulk)] if include_tables else None,
+    )
+
+@app.get("/api/scrape/bulk/{bulk_id}/export/{fmt}")
+def export_bulk(bulk_id: str, fmt: str, request: Request):
+    """ZIP of every list of a bulk scrape as CSV, NDJSON or Parquet, written on the first download"""
+    (fmt,) = export_formats([fmt])
+    bulk = bulk_sessions.get(bulk_id)
+    if bulk is None:
+        raise HTTPException(status_code=404, detail="Bulk session not found")
+    if bulk["status"] != "completed":
+        raise HTTPException(status_code=409, detail="Bulk scrape not finished yet")
+    with bulk["lock"]:
+        results = list(bulk["results"].values())
+    if not results:
+        raise HTTPException(status_code=404, detail="Nothing was scraped")
+    path = exports.export_bundle(results_store, [(court_name, results_store.get(result_id, with_tables=False))
+                                                 for court_name, result_id in results], fmt)
+    key = os.path.basename(path).split(".")[0]
+    return export_response(path, key, f"bulk_{bulk_id[:8]}_{bulk['date_from']}_{bulk['date_to']}_{fmt}.zip",
+                           "application/zip", request.headers)
+
+def cancel_bulk(bulk):
+    for session_id in bulk["sessions"]:
+        job_queue.cancel(session_id)
+        session = active_sessions.pop(session_id, None)
+        if session:
+            session["cancelled"] = True
+            session["captcha_event"].set()
+            if session.get("driver"):
+                session["driver"].quit()
+    bulk_sessions.pop(bulk["id"], None)
+
+@app.get("/api/scrape/bulk/{bulk_id}", response_model=BulkStatus)
+async def get_bulk_status(bulk_id: str, include_tables: bool = False):
+    """Per-item progress of a bulk scrape, plus the merged result once done"""
+    if bulk_id not in bulk_sessions:
+        raise HTTPException(status_code=404, detail="Bulk session not found")
+    return bulk_status(bulk_sessions[bulk_id], include_tables)
+
+@app.get("/api/scrape/bulk/{bulk_id}/stream")
+async def stream_bulk_progress(bulk_id: str):
+    """Newline-delimited JSON stream of item updates until the bulk run finishes"""
+    if bulk_id not in bulk_sessions:
+        raise HTTPException(status_code=404, detail="Bulk session not found")
+    bulk = bulk_sessions[bulk_id]
+    
+    async def events():
+        # subscribe before replaying so no update lands between the two
+        queue = bus.subscribe(bulk_id)
+        try:
+            sent = 0
+            while True:
+                pending = bulk["events"][sent:]
+                for event in pending:
+                    yield json.dumps(event) + "\n"
+                sent += len(pending)
+                if bulk["status"] in FINISHED and sent == len(bulk["events"]):
+                    return
+                if bulk_id not in bulk_sessions:
+                    return
+                try:
+                    await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            bus.unsubscribe(queue, bulk_id)
+    
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+@app.delete("/api/scrape/bulk/{bulk_id}")
+async def cancel_bulk_scraping(bulk_id: str):
+    """Cancel every court job of a bulk scrape"""
+    if bulk_id not in bulk_sessions:
+        raise HTTPException(status_code=404, detail="Bulk session not found")
+    cancel_bulk(bulk_sessions[bulk_id])
+    return {"message": "Bulk session cancelled"}
+
+# Prometheus gauges, read when /metrics is scraped
+def session_counts():
+    counts = {}
+    for session in list(active_sessions.values()):
+        counts[session["status"]] = counts.get(session["status"], 0) + 1
+    return counts
+
+def pool_drivers():
+    values = {}
+    for name, pool in (("courts", courts_pool), ("scrape", scrape_pool)):
+        for state, count in pool.stats().items():
+            values[(name, state)] = count
+    return values
+
+registry.gauge("ecourt_driver_pool_drivers", "Chrome drivers per pool: size (max), idle, live",
+               pool_drivers, ("pool", "state"))
+registry.gauge("ecourt_job_queue_depth", "Jobs waiting for a worker", lambda: job_queue.stats()["queued"])
+registry.gauge("ecourt_jobs_running", "Jobs running per kind", lambda: job_queue.stats()["running"], ("kind",))
+registry.gauge("ecourt_sessions", "Sessions in memory per status", session_counts, ("status",))
+registry.counter_callback("ecourt_result_cache_lookups_total", "Result cache lookups",
+                          lambda: {"hit": result_cache.hits, "miss": result_cache.misses}, ("result",))
+registry.gauge("ecourt_court_cache_entries", "Court lists cached", lambda: court_cache.stats()["entries"])
+registry.gauge("ecourt_artifact_files", "PDFs and exports in the artifact store", lambda: artifact_store.stats()["files"])
+registry.gauge("ecourt_artifact_bytes", "Size of the artifact store", lambda: artifact_store.stats()["bytes"])
+registry.gauge("ecourt_site_sessions", "Court site sessions kept for clients", lambda: site_sessions.stats()["clients"])
+registry.counter_callback("ecourt_site_session_reuses_total", "Searches that continued a client's site session",
+                          lambda: site_sessions.stats()["reused"])
+registry.counter_callback("ecourt_prefetch_scrapes_total", "Watchlist prefetch requests by outcome",
+                          lambda: {k: prefetcher.counts[k] for k in ("scraped", "cached", "failed")}, ("outcome",))
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus text exposition of stage timings, pools, queue and caches"""
+    return Response(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
 # Serve PDF files
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+@app.get("/downloads/{key}/{filename}")
+async def download_artifact(key: str, filename: str, request: Request):
+    """Download a generated PDF; content-addressed, so it never changes under its URL"""
+    try:
+        path = artifact_store.path(key)
+        stat = os.stat(path)
+    except (ValueError, FileNotFoundError):
+        raise HTTPException(status_code=404, detail="File not found")
+    
+    etag = f'"{key}"'
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+        "Cache-Control": "public, max-age=31536000, immutable",
+    }
+    if not_modified(request.headers, etag, stat.st_mtime):
+        return Response(status_code=304, headers=headers)
+    # downloads count as use, so eviction keeps popular PDFs
+    artifact_store.touch(key)
+    # FileResponse answers Range / If-Range requests itself
+    return FileResponse(path, media_type="application/pdf", filename=filename, headers=headers, stat_result=stat)
 
 @app.get("/downloads/{filename}")
 async def download_file(filename: str):
-    """Download generated PDF files"""
-    file_path = os.path.join("downloads", filename)
+    """Download PDFs generated before the artifact store"""
+    file_path = os.path.join(DOWNLOADS_DIR, os.path.basename(filename))
     if os.path.exists(file_path):
         return FileResponse(file_path, media_type="application/pdf", filename=filename)
     raise HTTPException(status_code=404, detail="File not found")
@@ -0,0 +1,162 @@
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from xml.sax.saxutils import escape
+import multiprocessing
+import os
+import threading
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib import colors
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.platypus import SimpleDocTemplate, LongTable, TableStyle, Paragraph, Spacer
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.utils import simpleSplit
+
+import config
+
+try:
+    from pypdf import PdfWriter
+except ImportError:     # optional: without it every document renders in one part
+    PdfWriter = None
+
+# Cause list PDF rendering. Rendering is CPU-bound, so documents are built
+# in worker processes; big documents are split per caption and the parts
+# concatenated when pypdf is installed.
+
+# bump when the layout changes, so stored PDFs of unchanged tables are re-rendered
+RENDER_VERSION = "1"
+
+STYLES = getSampleStyleSheet()
+NORMAL = STYLES['Normal']
+HEADING = STYLES['Heading3']
+
+MARGIN = 30
+PAGE_WIDTH = A4[0] - 2 * MARGIN
+COL_WIDTHS = [
+    35,                           # Serial number
+    115,                          # Case numbers
+    250,                          # Party names
+    PAGE_WIDTH - (35 + 115 + 250),
+]
+CELL_PADDING = 8    # left + right padding below
+
+TABLE_STYLE = TableStyle([
+    # Header styling
+    ('BACKGROUND', (0, 0), (-1, 0), colors.lightblue),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('FONTNAME', (0, 1), (-1, -1), NORMAL.fontName),
+    ('FONTSIZE', (0, 1), (-1, -1), NORMAL.fontSize),
+    ('LEADING', (0, 0), (-1, -1), NORMAL.leading),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+
+    ('LEFTPADDING', (0, 0), (-1, -1), 4),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 4),
+    ('TOPPADDING', (0, 0), (-1, -1), 3),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+
+    ('GRID', (0, 0), (-1, -1), 0.4, colors.grey),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.whitesmoke, colors.lightgrey]),
+])
+
+
+def cell(text, width, bold=False):
+    """Plain string cell, wrapped to the column width up front
+
+    Pre-split lines are far cheaper for the table to lay out than a
+    Paragraph per cell; the text carries no markup that would need one.
+    """
+    text = " ".join(str(text).split())
+    font = 'Helvetica-Bold' if bold else NORMAL.fontName
+    if stringWidth(text, font, NORMAL.fontSize) <= width - CELL_PADDING:
+        return text
+    return "\n".join(simpleSplit(text, font, NORMAL.fontSize, width - CELL_PADDING))
+
+
+def table_flowables(caption, headers, rows):
+    if headers and headers[0].lower().startswith("serial"):
+        headers = ["Sr. No."] + list(headers[1:])
+    columns = max([len(headers)] + [len(row) for row in rows])
+    widths = (COL_WIDTHS + [COL_WIDTHS[-1]] * columns)[:columns]
+
+    data = [[cell(h, w, bold=True) for h, w in zip(list(headers) + [""] * columns, widths)]]
+    for row in rows:
+        data.append([cell(c, w) for c, w in zip(list(row) + [""] * columns, widths)])
+
+    table = LongTable(data, colWidths=widths, repeatRows=1)
+    table.setStyle(TABLE_STYLE)
+    return [Paragraph(f"<b>{escape(caption)}</b>", HEADING), Spacer(1, 6), table, Spacer(1, 12)]
+
+
+def render(all_tables, target):
+    """Build one PDF of the tables into a filename or file object"""
+    doc = SimpleDocTemplate(target, pagesize=A4,
+                            leftMargin=MARGIN, rightMargin=MARGIN, topMargin=MARGIN, bottomMargin=MARGIN)
+    elements = []
+    for caption, headers, rows in all_tables:
+        elements.extend(table_flowables(caption, headers, rows))
+    doc.build(elements)
+
+
+def render_bytes(all_tables):
+    buffer = BytesIO()
+    render(all_tables, buffer)
+    return buffer.getvalue()
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def executor():
+    """Shared process pool, started on first use"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn: the API process runs threads (and browsers), which don't survive a fork
+            _executor = ProcessPoolExecutor(max_workers=config.PDF_WORKERS,
+                                            mp_context=multiprocessing.get_context("spawn"))
+        return _executor
+
+
+def shutdown():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(cancel_futures=True)
+            _executor = None
+
+
+def save_pdf(all_tables, filename):
+    """Render the tables to `filename` without holding the calling process's GIL
+
+    Documents with at least PDF_SPLIT_ROWS rows and more than one caption
+    are rendered one caption per process and concatenated, each caption then
+    starting on a new page.
+    """
+    all_tables = [(caption, list(headers), [list(row) for row in rows]) for caption, headers, rows in all_tables]
+    if config.PDF_WORKERS <= 0:
+        render(all_tables, filename)
+        return
+
+    row_count = sum(len(rows) for _, _, rows in all_tables)
+    if PdfWriter is None or len(all_tables) < 2 or row_count < config.PDF_SPLIT_ROWS:
+        parts = [executor().submit(render_bytes, all_tables).result()]
+    else:
+        futures = [executor().submit(render_bytes, [table]) for table in all_tables]
+        parts = [future.result() for future in futures]
+
+    tmp = filename + ".tmp"
+    if len(parts) == 1:
+        with open(tmp, "wb") as f:
+            f.write(parts[0])
+    else:
+        writer = PdfWriter()
+        for part in parts:
+            writer.append(BytesIO(part))
+        with open(tmp, "wb") as f:
+            writer.write(f)
+    # readers never see a half-written file
+    os.replace(tmp, filename)
@@ -0,0 +1,215 @@
+"""Pre-scrapes a watchlist of courts so the morning's requests are cache hits
+
+Inside the API it starts with the server when PREFETCH_WATCHLIST is set. It
+can also run as a sidecar that queues the same scrapes through a running API:
+
+    python prefetch.py --api http://localhost:8000 --watchlist DLND01:0:civil,DLND01:2:criminal
+
+Scrapes are queued at a low priority and run unattended: the CAPTCHA has to
+be solved automatically (HTTP engine with CAPTCHA_PROVIDER or
+CAPTCHA_MODEL_PATH), a scrape that would need a person fails instead.
+"""
+from collections import deque
+from datetime import date as date_cls, datetime, timedelta
+import argparse
+import threading
+import time
+
+import requests
+
+import config
+
+
+def parse_watchlist(spec):
+    """"est_code:court_index:case_type,..." (est_code may be empty) to [(est_code, index, case_type)]"""
+    watchlist = []
+    for entry in (spec or "").split(","):
+        if not entry.strip():
+            continue
+        try:
+            est_code, index, case_type = (part.strip() for part in entry.split(":"))
+            watchlist.append((est_code or None, int(index), case_type.lower()))
+        except ValueError:
+            raise ValueError(f"Invalid watchlist entry {entry!r}, expected est_code:court_index:case_type")
+    return watchlist
+
+
+def in_window(window, now):
+    """Whether `now` falls in "HH:MM-HH:MM" (may wrap past midnight); an empty window is always open"""
+    if not window:
+        return True
+    start, end = (datetime.strptime(part.strip(), "%H:%M").time() for part in window.split("-"))
+    current = now.time()
+    if start <= end:
+        return start <= current < end
+    return current >= start or current < end
+
+
+def next_court_day(day, closed_weekdays):
+    day += timedelta(days=1)
+    while day.weekday() in closed_weekdays:
+        day += timedelta(days=1)
+    return day
+
+
+def prefetch_dates(today, closed_weekdays):
+    """Today (when the courts sit) and the next day they do"""
+    dates = [] if today.weekday() in closed_weekdays else [today]
+    return dates + [next_court_day(today, closed_weekdays)]
+
+
+class Prefetcher:
+    """Queues scrapes of the watchlist within a time window and a rate budget
+
+    `start(est_code, court_index, date, case_type)` queues one unattended scrape
+    and returns (id, done), done being true when it was served from the result
+    cache; it returns None when the queue is full. `finished(id)` is None while
+    a queued scrape runs, then whether it succeeded; that is when it counts as
+    scraped or failed. Each (court, date, case type) is requested at most once
+    every `recheck` seconds; stored results that are still fresh come back as
+    cache hits without scraping.
+    """
+
+    def __init__(self, start, finished, watchlist, window=None, rate=None, concurrency=None,
+                 interval=None, recheck=None, closed_weekdays=None):
+        self.start_scrape = start
+        self.finished = finished
+        self.watchlist = watchlist
+        self.window = window if window is not None else config.PREFETCH_WINDOW
+        self.rate = rate if rate is not None else config.PREFETCH_RATE
+        self.concurrency = concurrency or config.PREFETCH_CONCURRENCY
+        self.interval = interval or config.PREFETCH_INTERVAL
+        self.recheck = recheck if recheck is not None else config.PREFETCH_RECHECK
+        self.closed_weekdays = closed_weekdays if closed_weekdays is not None else config.PREFETCH_CLOSED_WEEKDAYS
+
+        self._inflight = {}             # target -> scrape id
+        self._requested = {}            # target -> time it was last requested
+        self._started = deque()         # times of scrapes started in the last hour, for the rate budget
+        self._stop = threading.Event()
+        self._thread = None
+        self.counts = {"scraped": 0, "cached": 0, "failed": 0}
+        self.last_run = None
+
+    def targets(self, today=None):
+        dates = prefetch_dates(today or date_cls.today(), self.closed_weekdays)
+        return [(est_code, index, day.isoformat(), case_type)
+                for day in dates for est_code, index, case_type in self.watchlist]
+
+    def run_once(self, now=None):
+        """Queue what is due and allowed; returns the number of scrapes started"""
+        now = now or datetime.now()
+        clock = time.time()
+        self.last_run = clock
+        for target, scrape_id in list(self._inflight.items()):
+            succeeded = self.finished(scrape_id)
+            if succeeded is not None:
+                del self._inflight[target]
+                self.counts["scraped" if succeeded else "failed"] += 1
+        while self._started and clock - self._started[0] > 3600:
+            self._started.popleft()
+        if not in_window(self.window, now):
+            return 0
+
+        started = 0
+        for target in self.targets(now.date()):
+            if len(self._inflight) >= self.concurrency or (self.rate and len(self._started) >= self.rate):
+                break
+            if target in self._inflight or clock - self._requested.get(target, 0) < self.recheck:
+                continue
+            try:
+                queued = self.start_scrape(*target)
+            except Exception as e:
+                print(f"Prefetch of {target} failed: {e}")
+                self.counts["failed"] += 1
+                self._requested[target] = clock
+                continue
+            if queued is None:
+                break   # queue full, the next run tries again
+            scrape_id, done = queued
+            self._requested[target] = clock
+            if done:
+                self.counts["cached"] += 1
+                continue
+            self._inflight[target] = scrape_id
+            self._started.append(clock)
+            started += 1
+        return started
+
+    def run(self):
+        """Run every `interval` seconds until stopped"""
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Prefetch run failed: {e}")
+            self._stop.wait(self.interval)
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, name="prefetch", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def stats(self):
+        return {
+            "watchlist": len(self.watchlist),
+            "window": self.window,
+            "in_flight": len(self._inflight),
+            "started_last_hour": len(self._started),
+            "rate_per_hour": self.rate,
+            "last_run": self.last_run,
+            **self.counts,
+        }
+
+
+class ApiClient:
+    """start/finished over a running API's HTTP endpoints, for the sidecar"""
+
+    def __init__(self, base_url, priority=None):
+        self.base_url = base_url.rstrip("/")
+        self.priority = priority if priority is not None else config.PREFETCH_PRIORITY
+        self.http = requests.Session()
+
+    def start(self, est_code, court_index, date, case_type):
+        response = self.http.post(f"{self.base_url}/api/scrape/start", timeout=30, json={
+            "est_code": est_code, "court_index": court_index, "date": date, "case_type": case_type,
+            "priority": self.priority, "unattended": True,
+        })
+        if response.status_code == 429:
+            return None
+        response.raise_for_status()
+        body = response.json()
+        return body["session_id"], body["status"] == "completed"
+
+    def finished(self, session_id):
+        response = self.http.get(f"{self.base_url}/api/scrape/status/{session_id}", timeout=30)
+        if response.status_code == 404:
+            return False
+        response.raise_for_status()
+        status = response.json()["status"]
+        if status not in ("completed", "error"):
+            return None
+        return status == "completed"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--api", default="http://localhost:8000", help="base URL of the running API")
+    parser.add_argument("--watchlist", default=config.PREFETCH_WATCHLIST,
+                        help="est_code:court_index:case_type,... (default PREFETCH_WATCHLIST)")
+    parser.add_argument("--once", action="store_true", help="queue what is due now and exit")
+    args = parser.parse_args()
+
+    client = ApiClient(args.api)
+    prefetcher = Prefetcher(client.start, client.finished, parse_watchlist(args.watchlist))
+    if not prefetcher.watchlist:
+        parser.error("empty watchlist")
+    if args.once:
+        print(f"Queued {prefetcher.run_once()} scrapes")
+    else:
+        prefetcher.run()
@@ -0,0 +1,68 @@
+from datetime import date as date_cls
+import threading
+import time
+
+import config
+
+
+def result_ttl(date, row_count=1, today=None):
+    """Seconds a stored cause list stays valid, None when it never expires
+
+    Lists for past dates no longer change. Today's list is still being
+    updated by the court, so it is refreshed often; future lists less so.
+    Empty lists may simply not be published yet and never count as final.
+    """
+    today = today or date_cls.today()
+    listed = date_cls.fromisoformat(date)
+    if listed < today and row_count:
+        return None
+    if listed > today:
+        return config.RESULT_TTL_FUTURE
+    return config.RESULT_TTL_TODAY
+
+
+def result_key(court, date, case_type):
+    return (court.get("est_code") or "", court["code"], date, case_type.lower())
+
+
+class ResultCache:
+    """Serves repeat (court, date, case type) requests from the results store
+    and coalesces identical scrapes that are already running"""
+
+    def __init__(self, store):
+        self.store = store
+        self._inflight = {}     # key -> [leader session id, follower ids...]
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, court, date, case_type):
+        """Stored result metadata if it is still fresh, else None"""
+        result = self.store.find(court, date, case_type)
+        if result is not None:
+            try:
+                ttl = result_ttl(date, result["row_count"])
+            except ValueError:
+                ttl = 0
+            if ttl is None or time.time() - result["scraped_at"] < ttl:
+                self.hits += 1
+                return result
+        self.misses += 1
+        return None
+
+    def join(self, key, session_id):
+        """Register a scrape for `key`; returns the leader's session id if one is
+        already running (the caller then just follows it), else None"""
+        with self._lock:
+            sessions = self._inflight.get(key)
+            if sessions:
+                sessions.append(session_id)
+                return sessions[0]
+            self._inflight[key] = [session_id]
+            return None
+
+    def release(self, key):
+        """Scrape for `key` finished; returns the follower session ids"""
+        with self._lock:
+            sessions = self._inflight.pop(key, [])
+        return sessions[1:]
@@ -0,0 +1,450 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+
+from cause_list import (CauseListEntry, Columns, diff_rows, from_tables, parse_case_numbers, row_hash,
+                        row_keys)
+import config
+
+WORD = re.compile(r"\w+")
+
+
+def _phrase(text, prefix=False):
+    return '"' + text.replace('"', '""') + '"' + ("*" if prefix else "")
+
+
+def search_expression(text=None, party=None, advocate=None, case_number=None):
+    """FTS5 match expression from user input, None when there is nothing to search for
+
+    Free text must match every word, the last one as a prefix; field
+    filters are limited to their column and case numbers match as a phrase.
+    """
+    parts = []
+    words = WORD.findall(text or "")
+    if words:
+        parts.append(" ".join(_phrase(w, prefix=i == len(words) - 1) for i, w in enumerate(words)))
+    for column, value in (("parties", party), ("advocate", advocate)):
+        words = WORD.findall(value or "")
+        if words:
+            parts.append(f"{column} : (" + " ".join(_phrase(w) for w in words) + ")")
+    words = WORD.findall(case_number or "")
+    if words:
+        parts.append(f"case_number : {_phrase(' '.join(words))}")
+    return " AND ".join(parts) or None
+
+
+class ResultsStore:
+    """Scraped cause lists in SQLite, one current copy per (court, date, case type)"""
+
+    def __init__(self, path=None):
+        self._db = sqlite3.connect(path or config.RESULTS_DB_PATH, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        self._db.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA foreign_keys=ON;
+            CREATE TABLE IF NOT EXISTS cause_lists (
+                id INTEGER PRIMARY KEY,
+                est_code TEXT NOT NULL DEFAULT '',
+                court_code TEXT NOT NULL,
+                court_name TEXT NOT NULL,
+                date TEXT NOT NULL,
+                case_type TEXT NOT NULL,
+                pdf_url TEXT,
+                table_count INTEGER NOT NULL,
+                row_count INTEGER NOT NULL,
+                scraped_at REAL NOT NULL,
+                UNIQUE (est_code, court_code, date, case_type)
+            );
+            CREATE INDEX IF NOT EXISTS cause_lists_court ON cause_lists (court_code, date);
+            CREATE INDEX IF NOT EXISTS cause_lists_date ON cause_lists (date, case_type);
+            CREATE TABLE IF NOT EXISTS cause_list_tables (
+                cause_list_id INTEGER NOT NULL REFERENCES cause_lists (id) ON DELETE CASCADE,
+                table_idx INTEGER NOT NULL,
+                caption TEXT NOT NULL,
+                headers TEXT NOT NULL,
+                PRIMARY KEY (cause_list_id, table_idx)
+            );
+            CREATE TABLE IF NOT EXISTS cause_list_rows (
+                cause_list_id INTEGER NOT NULL REFERENCES cause_lists (id) ON DELETE CASCADE,
+                table_idx INTEGER NOT NULL,
+                row_idx INTEGER NOT NULL,
+                case_number TEXT,
+                cells TEXT NOT NULL,
+                PRIMARY KEY (cause_list_id, table_idx, row_idx)
+            );
+            CREATE INDEX IF NOT EXISTS cause_list_rows_case ON cause_list_rows (case_number);
+            CREATE TABLE IF NOT EXISTS session_results (
+                session_id TEXT PRIMARY KEY,
+                cause_list_id INTEGER NOT NULL REFERENCES cause_lists (id) ON DELETE CASCADE,
+                created_at REAL NOT NULL,
+                formats TEXT  -- JSON list of the export formats the session asked for
+            );
+        """)
+        # export formats of sessions, added after the first release
+        if "formats" not in {row[1] for row in self._db.execute("PRAGMA table_info(session_results)")}:
+            self._db.execute("ALTER TABLE session_results ADD COLUMN formats TEXT")
+        # parsed case number columns, added after the first release
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(cause_list_rows)")}
+        if "case_no" not in columns:
+            for column, kind in (("case_type", "TEXT"), ("case_no", "INTEGER"), ("case_year", "INTEGER")):
+                self._db.execute(f"ALTER TABLE cause_list_rows ADD COLUMN {column} {kind}")
+            stored = self._db.execute("SELECT rowid, case_number FROM cause_list_rows WHERE case_number IS NOT NULL").fetchall()
+            types, numbers, years = parse_case_numbers([case_number for _, case_number in stored])
+            self._db.executemany("UPDATE cause_list_rows SET case_type = ?, case_no = ?, case_year = ? WHERE rowid = ?",
+                                 [(kind, number, year, rowid) for (rowid, _), kind, number, year
+                                  in zip(stored, types, numbers, years)])
+        self._db.execute("CREATE INDEX IF NOT EXISTS cause_list_rows_case_parts ON cause_list_rows (case_no, case_year)")
+        if "row_hash" not in columns:
+            self._db.execute("ALTER TABLE cause_list_rows ADD COLUMN row_hash TEXT")
+            self._db.executemany("UPDATE cause_list_rows SET row_hash = ? WHERE rowid = ?",
+                                 [(row_hash(json.loads(cells)), rowid) for rowid, cells
+                                  in self._db.execute("SELECT rowid, cells FROM cause_list_rows").fetchall()])
+
+        # what each re-scrape changed: only the rows that differ are kept, the
+        # current copy above is always the full list
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS cause_list_changes (
+                id INTEGER PRIMARY KEY,
+                cause_list_id INTEGER NOT NULL REFERENCES cause_lists (id) ON DELETE CASCADE,
+                scraped_at REAL NOT NULL,
+                initial INTEGER NOT NULL,
+                added INTEGER NOT NULL,
+                removed INTEGER NOT NULL,
+                changed INTEGER NOT NULL,
+                delta TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS cause_list_changes_list ON cause_list_changes (cause_list_id, scraped_at);
+        """)
+
+        # full-text index over every row, keyed by the row's rowid
+        indexed = self._db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'row_search'").fetchone()
+        self._db.executescript("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS row_search USING fts5(
+                parties, advocate, case_number, court, tokenize = 'unicode61 remove_diacritics 2'
+            );
+            CREATE TRIGGER IF NOT EXISTS cause_list_rows_unindex AFTER DELETE ON cause_list_rows BEGIN
+                DELETE FROM row_search WHERE rowid = old.rowid;
+            END;
+        """)
+        if not indexed:
+            self._index_all()
+
+    def save(self, court, date, case_type, tables, pdf_url=None):
+        """Store the tables as the current cause list for this court/date/case type, returns its id
+
+        A re-scrape that changed nothing only refreshes `scraped_at`; one that
+        did rewrites the list and records the added, removed and changed rows.
+        """
+        row_count = sum(len(rows) for _, _, rows in tables)
+        parsed = from_tables(tables)
+        hashes = [[row_hash(entry.cells) for entry in table.entries] for table in parsed]
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                previous = self._db.execute("""
+                    SELECT id, pdf_url FROM cause_lists WHERE est_code = ? AND court_code = ? AND date = ? AND case_type = ?
+                """, (court.get("est_code") or "", court["code"], date, case_type.lower())).fetchone()
+                cursor = self._db.execute("""
+                    INSERT INTO cause_lists (est_code, court_code, court_name, date, case_type, pdf_url,
+                                             table_count, row_count, scraped_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (est_code, court_code, date, case_type) DO UPDATE SET
+                        court_name = excluded.court_name, pdf_url = excluded.pdf_url,
+                        table_count = excluded.table_count, row_count = excluded.row_count,
+                        scraped_at = excluded.scraped_at
+                    RETURNING id
+                """, (court.get("est_code") or "", court["code"], court["name"], date, case_type.lower(),
+                      pdf_url, len(tables), row_count, now))
+                cause_list_id = cursor.fetchone()[0]
+
+                if previous is None:
+                    self._record_change(cause_list_id, now, initial=True, added=row_count)
+                elif not self._same_content(cause_list_id, parsed, hashes):
+                    self._record_diff(cause_list_id, now, parsed, hashes)
+                else:
+                    if pdf_url is None and previous[1]:
+                        # the stored PDF still shows exactly these rows
+                        self._db.execute("UPDATE cause_lists SET pdf_url = ? WHERE id = ?", (previous[1], cause_list_id))
+                    self._db.execute("COMMIT")
+                    return cause_list_id
+
+                self._db.execute("DELETE FROM cause_list_tables WHERE cause_list_id = ?", (cause_list_id,))
+                self._db.execute("DELETE FROM cause_list_rows WHERE cause_list_id = ?", (cause_list_id,))
+                for table_idx, (table, table_hashes) in enumerate(zip(parsed, hashes)):
+                    self._db.execute("INSERT INTO cause_list_tables VALUES (?, ?, ?, ?)",
+                                     (cause_list_id, table_idx, table.caption, json.dumps(table.headers)))
+                    self._db.executemany("""
+                        INSERT INTO cause_list_rows (cause_list_id, table_idx, row_idx, case_number, cells,
+                                                     case_type, case_no, case_year, row_hash)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """, [(cause_list_id, table_idx, row_idx, (entry.case_number or "").strip() or None,
+                           json.dumps(entry.cells), *entry.case, digest)
+                          for row_idx, (entry, digest) in enumerate(zip(table.entries, table_hashes))])
+                    self._index(cause_list_id, table_idx, f"{court['name']} {table.caption}", table.entries)
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        return cause_list_id
+
+    def _stored_layout(self, cause_list_id):
+        return [(caption, json.loads(headers)) for caption, headers in self._db.execute(
+            "SELECT caption, headers FROM cause_list_tables WHERE cause_list_id = ? ORDER BY table_idx",
+            (cause_list_id,))]
+
+    def _same_content(self, cause_list_id, parsed, hashes):
+        if self._stored_layout(cause_list_id) != [(table.caption, list(table.headers)) for table in parsed]:
+            return False
+        stored = [digest for (digest,) in self._db.execute(
+            "SELECT row_hash FROM cause_list_rows WHERE cause_list_id = ? ORDER BY table_idx, row_idx",
+            (cause_list_id,))]
+        return stored == [digest for table_hashes in hashes for digest in table_hashes]
+
+    def _record_diff(self, cause_list_id, now, parsed, hashes):
+        """Diff the stored rows against the new ones by row key and hash, cells of the stored rows read only as needed"""
+        captions = [caption for caption, _ in self._stored_layout(cause_list_id)]
+        stored = self._db.execute("""
+            SELECT table_idx, row_idx, case_number, case_type, case_no, case_year, row_hash FROM cause_list_rows
+            WHERE cause_list_id = ? ORDER BY table_idx, row_idx
+        """, (cause_list_id,)).fetchall()
+        old_keys = row_keys((captions[t], number, kind, no, year, digest) for t, _, number, kind, no, year, digest in stored)
+        old = {key: (row[-1], row[0], row[1]) for key, row in zip(old_keys, stored)}
+
+        new_rows = [(table_idx, row_idx, table.caption, entry, digest)
+                    for table_idx, (table, table_hashes) in enumerate(zip(parsed, hashes))
+                    for row_idx, (entry, digest) in enumerate(zip(table.entries, table_hashes))]
+        new_keys = row_keys((caption, (entry.case_number or "").strip() or None, *entry.case, digest)
+                            for _, _, caption, entry, digest in new_rows)
+        new = dict(zip(new_keys, new_rows))
+
+        added, removed, changed = diff_rows({key: value[0] for key, value in old.items()},
+                                            {key: value[4] for key, value in new.items()})
+
+        def old_cells(key):
+            _, table_idx, row_idx = old[key]
+            (cells,) = self._db.execute(
+                "SELECT cells FROM cause_list_rows WHERE cause_list_id = ? AND table_idx = ? AND row_idx = ?",
+                (cause_list_id, table_idx, row_idx)).fetchone()
+            return json.loads(cells)
+
+        def new_row(key):
+            table_idx, row_idx, caption, entry, _ = new[key]
+            return {"table": table_idx, "row": row_idx, "caption": caption, "cells": list(entry.cells)}
+
+        delta = {
+            "added": [new_row(key) for key in added],
+            "removed": [{"table": old[key][1], "row": old[key][2], "caption": captions[old[key][1]],
+                         "cells": old_cells(key)} for key in removed],
+            "changed": [dict(new_row(key), before=old_cells(key)) for key in changed],
+        }
+        self._record_change(cause_list_id, now, added=len(added), removed=len(removed), changed=len(changed),
+                            delta=delta)
+
+    def _record_change(self, cause_list_id, now, initial=False, added=0, removed=0, changed=0, delta=None):
+        self._db.execute("""
+            INSERT INTO cause_list_changes (cause_list_id, scraped_at, initial, added, removed, changed, delta)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (cause_list_id, now, int(initial), added, removed, changed,
+              json.dumps(delta or {"added": [], "removed": [], "changed": []})))
+
+    def unchanged(self, cause_list_id, tables):
+        """Whether the stored cause list holds exactly these tables, compared by row hash"""
+        parsed = from_tables(tables)
+        with self._lock:
+            return self._same_content(cause_list_id, parsed,
+                                      [[row_hash(entry.cells) for entry in table.entries] for table in parsed])
+
+    def content_digest(self, cause_list_id):
+        """Hash of the stored tables' layout and row hashes, without reading any cells"""
+        digest = hashlib.sha256()
+        with self._lock:
+            digest.update(json.dumps(self._stored_layout(cause_list_id)).encode())
+            for table_idx, row_hash_ in self._db.execute(
+                    "SELECT table_idx, row_hash FROM cause_list_rows WHERE cause_list_id = ? ORDER BY table_idx, row_idx",
+                    (cause_list_id,)):
+                digest.update(f"\n{table_idx}:{row_hash_}".encode())
+        return digest.hexdigest()
+
+    def changes(self, court_code, date, est_code=None, case_type=None, since=None, limit=100):
+        """Recorded scrapes of a court's lists for a date that changed something, oldest first
+
+        The first scrape of a list is marked `initial` and carries no rows;
+        later ones carry the added, removed and changed rows.
+        """
+        where, params = ["l.court_code = ?", "l.date = ?"], [court_code, date]
+        for clause, value in (("l.est_code = ?", est_code), ("l.case_type = ?", case_type.lower() if case_type else None),
+                              ("c.scraped_at > ?", since)):
+            if value is not None:
+                where.append(clause)
+                params.append(value)
+        with self._lock:
+            rows = self._db.execute(f"""
+                SELECT l.id, l.est_code, l.court_code, l.court_name, l.date, l.case_type, l.pdf_url,
+                       l.table_count, l.row_count, l.scraped_at,
+                       c.scraped_at, c.initial, c.added, c.removed, c.changed, c.delta
+                FROM cause_list_changes c JOIN cause_lists l ON l.id = c.cause_list_id
+                WHERE {" AND ".join(where)} ORDER BY c.scraped_at, c.id LIMIT ?
+            """, params + [limit]).fetchall()
+        return [dict(self._meta(row[:10]), changed_at=row[10], initial=bool(row[11]),
+                     counts={"added": row[12], "removed": row[13], "changed": row[14]}, **json.loads(row[15]))
+                for row in rows]
+
+    def _index(self, cause_list_id, table_idx, court, entries):
+        rowids = [rowid for (rowid,) in self._db.execute(
+            "SELECT rowid FROM cause_list_rows WHERE cause_list_id = ? AND table_idx = ? ORDER BY row_idx",
+            (cause_list_id, table_idx))]
+        self._db.executemany(
+            "INSERT INTO row_search (rowid, parties, advocate, case_number, court) VALUES (?, ?, ?, ?, ?)",
+            [(rowid, entry.parties, entry.advocate, entry.case_number, court)
+             for rowid, entry in zip(rowids, entries)])
+
+    def _index_all(self):
+        """Index rows stored before the search index existed"""
+        lists = self._db.execute("""
+            SELECT t.cause_list_id, t.table_idx, t.caption, t.headers, l.court_name
+            FROM cause_list_tables t JOIN cause_lists l ON l.id = t.cause_list_id
+        """).fetchall()
+        for cause_list_id, table_idx, caption, headers, court_name in lists:
+            columns = Columns.from_headers(json.loads(headers))
+            entries = [CauseListEntry(columns, tuple(json.loads(cells)))
+                       for (cells,) in self._db.execute(
+                           "SELECT cells FROM cause_list_rows WHERE cause_list_id = ? AND table_idx = ? ORDER BY row_idx",
+                           (cause_list_id, table_idx))]
+            self._index(cause_list_id, table_idx, f"{court_name} {caption}", entries)
+
+    def set_pdf_url(self, cause_list_id, pdf_url):
+        with self._lock:
+            self._db.execute("UPDATE cause_lists SET pdf_url = ? WHERE id = ?", (pdf_url, cause_list_id))
+
+    def link_session(self, session_id, cause_list_id, formats=None):
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO session_results VALUES (?, ?, ?, ?)",
+                             (session_id, cause_list_id, time.time(),
+                              json.dumps(formats) if formats is not None else None))
+
+    def session_result(self, session_id):
+        with self._lock:
+            row = self._db.execute("SELECT cause_list_id FROM session_results WHERE session_id = ?",
+                                   (session_id,)).fetchone()
+        return row[0] if row else None
+
+    def session_formats(self, session_id):
+        """Export formats the session asked for, None when not recorded"""
+        with self._lock:
+            row = self._db.execute("SELECT formats FROM session_results WHERE session_id = ?",
+                                   (session_id,)).fetchone()
+        return json.loads(row[0]) if row and row[0] is not None else None
+
+    def _meta(self, row):
+        keys = ("id", "est_code", "court_code", "court_name", "date", "case_type", "pdf_url",
+                "table_count", "row_count", "scraped_at")
+        return dict(zip(keys, row))
+
+    def find(self, court, date, case_type):
+        """Metadata of the stored cause list for this court/date/case type, or None"""
+        with self._lock:
+            row = self._db.execute("""
+                SELECT id, est_code, court_code, court_name, date, case_type, pdf_url, table_count, row_count, scraped_at
+                FROM cause_lists WHERE est_code = ? AND court_code = ? AND date = ? AND case_type = ?
+            """, (court.get("est_code") or "", court["code"], date, case_type.lower())).fetchone()
+        return self._meta(row) if row else None
+
+    def get(self, cause_list_id, with_tables=True):
+        with self._lock:
+            row = self._db.execute("""
+                SELECT id, est_code, court_code, court_name, date, case_type, pdf_url, table_count, row_count, scraped_at
+                FROM cause_lists WHERE id = ?
+            """, (cause_list_id,)).fetchone()
+            if not row:
+                return None
+            result = self._meta(row)
+            if with_tables:
+                result["tables"] = self._tables(cause_list_id)
+        return result
+
+    def tables(self, cause_list_id):
+        """[(caption, headers, rows)] in the order they were scraped"""
+        with self._lock:
+            return [(t["caption"], t["headers"], t["rows"]) for t in self._tables(cause_list_id)]
+
+    def table_headers(self, cause_list_id):
+        """[(caption, headers)] without the rows"""
+        with self._lock:
+            return [(caption, json.loads(headers)) for caption, headers in self._db.execute(
+                "SELECT caption, headers FROM cause_list_tables WHERE cause_list_id = ? ORDER BY table_idx",
+                (cause_list_id,))]
+
+    def rows(self, cause_list_id, start=(0, 0), limit=None):
+        """[(table_idx, row_idx, CauseListEntry)] from position `start` on, walking the primary key"""
+        query = """
+            SELECT table_idx, row_idx, cells FROM cause_list_rows
+            WHERE cause_list_id = ? AND (table_idx, row_idx) >= (?, ?)
+            ORDER BY table_idx, row_idx
+        """
+        params = [cause_list_id, *start]
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+            columns = [Columns.from_headers(json.loads(headers)) for (headers,) in self._db.execute(
+                "SELECT headers FROM cause_list_tables WHERE cause_list_id = ? ORDER BY table_idx",
+                (cause_list_id,))]
+        return [(t, r, CauseListEntry(columns[t], tuple(json.loads(cells)))) for t, r, cells in rows]
+
+    def _tables(self, cause_list_id):
+        tables = [{"caption": caption, "headers": json.loads(headers), "rows": []}
+                  for caption, headers in self._db.execute(
+                      "SELECT caption, headers FROM cause_list_tables WHERE cause_list_id = ? ORDER BY table_idx",
+                      (cause_list_id,))]
+        for table_idx, cells in self._db.execute(
+                "SELECT table_idx, cells FROM cause_list_rows WHERE cause_list_id = ? ORDER BY table_idx, row_idx",
+                (cause_list_id,)):
+            tables[table_idx]["rows"].append(json.loads(cells))
+        return tables
+
+    def search(self, match, court_code=None, est_code=None, date_from=None, date_to=None, case_type=None,
+               limit=20, offset=0):
+        """(total, hits) for an FTS5 match expression, best ranked first, then latest date
+
+        Party names and case numbers weigh more than the advocate, the court least.
+        Raises ValueError when SQLite rejects the expression.
+        """
+        where, params = ["row_search MATCH ?"], [match]
+        for clause, value in (("l.court_code = ?", court_code), ("l.est_code = ?", est_code),
+                              ("l.date >= ?", date_from), ("l.date <= ?", date_to),
+                              ("l.case_type = ?", case_type.lower() if case_type else None)):
+            if value:
+                where.append(clause)
+                params.append(value)
+        joins = f"""
+            FROM row_search s
+            JOIN cause_list_rows r ON r.rowid = s.rowid
+            JOIN cause_lists l ON l.id = r.cause_list_id
+            JOIN cause_list_tables t ON t.cause_list_id = r.cause_list_id AND t.table_idx = r.table_idx
+            WHERE {" AND ".join(where)}
+        """
+        with self._lock:
+            try:
+                total = self._db.execute(f"SELECT COUNT(*) {joins}", params).fetchone()[0]
+                rows = self._db.execute(f"""
+                    SELECT l.id, l.est_code, l.court_code, l.court_name, l.date, l.case_type, l.pdf_url,
+                           l.table_count, l.row_count, l.scraped_at, t.caption, t.headers,
+                           r.table_idx, r.row_idx, r.cells,
+                           bm25(row_search, 10.0, 3.0, 10.0, 1.0) AS score
+                    {joins}
+                    ORDER BY score, l.date DESC LIMIT ? OFFSET ?
+                """, params + [limit, offset]).fetchall()
+            except sqlite3.OperationalError as e:
+                raise ValueError(f"Malformed search: {e}") from e
+        hits = []
+        for row in rows:
+            entry = CauseListEntry(Columns.from_headers(json.loads(row[11])), tuple(json.loads(row[14])))
+            hits.append(dict(self._meta(row[:10]), caption=row[10], table=row[12], row=row[13], entry=entry,
+                             score=-row[15]))
+        return total, hits
@@ -0,0 +1,297 @@
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+import os
+
+from delhi_scrappper import get_courts, open_form, select_court, pick_date, set_case_type, save_all_tables_to_pdf
+from driver_pool import DriverPool
+from extraction import extract_tables
+from artifacts import ArtifactStore, tables_digest
+from captcha_solver import CaptchaError, shared_solver
+from site_sessions import SiteSessionStore
+from metrics import span
+import pdf_render
+import http_engine
+import config
+import waits
+
+# The steps of one scrape session, shared by single and bulk scrapes.
+# `session` is the status dict the API exposes for the running job.
+
+scrape_pool = DriverPool(name="scrape")
+
+DOWNLOADS_DIR = config.ARTIFACT_DIR or os.path.join(os.path.dirname(__file__), "downloads")
+# PDFs and the data exports (exports.py) share one store, so one size budget
+artifact_store = ArtifactStore(DOWNLOADS_DIR, suffixes=(".pdf", ".csv", ".ndjson", ".parquet", ".zip"))
+site_sessions = SiteSessionStore()
+
+AUTO_SOLVE_ATTEMPTS = 2     # automatic answers tried before asking the user
+
+
+def wait_for_captcha(session, message, captcha_url=None):
+    """Flag the session as waiting for CAPTCHA and block until it is confirmed"""
+    if session.get("unattended"):
+        raise Exception("CAPTCHA could not be solved automatically")
+    solved = session["captcha_event"]
+    solved.clear()
+    session["captcha_solved"] = False
+    session.update(status="captcha_required", message=message, captcha_url=captcha_url)
+
+    # woken by the captcha-solved endpoint, or by cancellation
+    with span(session, "captcha_wait"):
+        solved.wait(timeout=300)
+    if session.get("cancelled"):
+        raise Exception("Session cancelled")
+    if not session.get("captcha_solved", False):
+        raise Exception("CAPTCHA timeout - please try again")
+    return session.pop("captcha_text", None)
+
+
+def report_tables(session, tables):
+    """Push one progress event per extracted table, and its rows for table streams"""
+    for idx, (caption, headers, rows) in enumerate(tables):
+        session.emit("table", {"index": idx, "total": len(tables), "caption": caption, "rows": len(rows)})
+        session.emit("rows", {"index": idx, "caption": caption, "headers": headers, "rows": rows})
+
+
+def cdp_cookie(cookie):
+    """Selenium cookie dict to a CDP Network.CookieParam"""
+    param = {key: cookie[key] for key in ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite")
+             if key in cookie}
+    if "expiry" in cookie:
+        param["expires"] = cookie["expiry"]
+    return param
+
+
+class BrowserCourtSearch:
+    """Searches for one court on a pooled browser, reusing the loaded form"""
+
+    def __init__(self, session_id, session, court_index, client_id=None, est_code=None):
+        self.session_id = session_id
+        self.session = session
+        self.client_id = client_id
+        session["message"] = "Setting up browser..."
+        with span(session, "driver_start"):
+            self.driver = scrape_pool.checkout()
+        session["driver"] = self.driver
+        self.wait = WebDriverWait(self.driver, 15)
+
+        try:
+            # pooled drivers come back without cookies; give back this client's site session
+            self.restored = site_sessions.get(client_id)
+            if self.restored and self.restored.get("engine") == "browser":
+                self.driver.execute_cdp_cmd("Network.setCookies",
+                                            {"cookies": [cdp_cookie(c) for c in self.restored["cookies"]]})
+            else:
+                self.restored = None
+
+            if self.restored and est_code in (None, self.restored["est_code"]):
+                # the complex's courts are known: the form is loaded on first search, without reading them
+                self.est_code, courts = self.restored["est_code"], self.restored["courts"]
+                self.form_loaded = False
+            else:
+                session["message"] = "Loading courts..."
+                with span(session, "page_load"):
+                    courts = get_courts(self.driver, self.wait, est_code)
+                if not courts:
+                    raise Exception("No courts found")
+                self.est_code = courts[0]["est_code"]
+                self.form_loaded = True
+            self.courts = courts
+            if court_index >= len(courts):
+                raise Exception("Invalid court index")
+            self.court = courts[court_index]
+        except Exception:
+            self.close()
+            raise
+
+    def search(self, date, case_type):
+        try:
+            tables = self._search(date, case_type)
+        except Exception:
+            if self.restored and not self.session.get("cancelled"):
+                # the reused site session may be what failed; start clean next time
+                site_sessions.invalidate(self.client_id)
+                self.restored = None
+            raise
+        site_sessions.save(self.client_id, {"engine": "browser", "cookies": self.driver.get_cookies(),
+                                            "est_code": self.est_code, "courts": self.courts})
+        return tables
+
+    def _search(self, date, case_type):
+        session, driver, wait = self.session, self.driver, self.wait
+
+        if not self.form_loaded:
+            session["message"] = "Loading form..."
+            with span(session, "page_load"):
+                open_form(driver, wait, self.est_code)
+            self.form_loaded = True
+
+        session["message"] = "Selecting court..."
+        with span(session, "court_select"):
+            select_court(driver, wait, self.court['code'])
+
+        session["message"] = "Setting date..."
+        with span(session, "date_pick"):
+            pick_date(driver, date, wait)
+
+        session["message"] = "Setting case type..."
+        with span(session, "case_type"):
+            set_case_type(driver, case_type.lower(), wait)
+
+        # a site session that already passed the CAPTCHA may not be shown one again
+        if waits.captcha_shown(driver):
+            if scrape_pool.headless:
+                self._ask_captcha()
+            else:
+                wait_for_captcha(session, "Please solve CAPTCHA in the browser window")
+
+        session["status"] = "processing"
+        session["message"] = "Searching for cause list..."
+        with span(session, "search"):
+            previous = driver.find_elements(*waits.RESULTS)
+            driver.find_element(*waits.SEARCH_BUTTON).click()
+            waits.results_rendered(wait, previous[0] if previous else None)
+
+        session["message"] = "Extracting cause list data..."
+        with span(session, "extraction"):
+            tables = extract_tables(driver)
+        report_tables(session, tables)
+        return tables
+
+    def _ask_captcha(self):
+        """Nobody can see a headless browser: show its CAPTCHA through the API and type the answer in"""
+        session = self.session
+        with span(session, "captcha_fetch"):
+            image = self.wait.until(EC.visibility_of_element_located(waits.CAPTCHA_IMAGE))
+            session["captcha_image"] = image.screenshot_as_png
+        session["captcha_version"] = session.get("captcha_version", 0) + 1
+        answer = wait_for_captcha(session, "Please enter the CAPTCHA shown",
+                                  f"/api/scrape/captcha/{self.session_id}?v={session['captcha_version']}")
+        field = self.driver.find_element(*waits.CAPTCHA_INPUT)
+        field.clear()
+        field.send_keys(answer)
+        session.update(captcha_url=None)
+        session.pop("captcha_image", None)
+
+    def close(self):
+        if self.session.get("driver"):
+            scrape_pool.checkin(self.session["driver"])
+            self.session["driver"] = None
+
+
+class HttpCourtSearch:
+    """Searches for one court over plain HTTP, keeping one site session"""
+
+    def __init__(self, session_id, session, court_index, client_id=None, est_code=None):
+        self.session_id = session_id
+        self.session = session
+        self.client_id = client_id
+        self.scraper = http_engine.HttpScraper()
+
+        try:
+            state = site_sessions.get(client_id)
+            if state and state.get("engine") == "http" and est_code in (None, state["est_code"]):
+                # continue the client's last site session: no form bootstrap, no court lookup
+                self.scraper.restore_state(state)
+                self.est_code, courts = state["est_code"], state["courts"]
+            else:
+                session["message"] = "Loading courts..."
+                with span(session, "page_load"):
+                    courts = self.scraper.get_courts(est_code)
+                if not courts:
+                    raise Exception("No courts found")
+                self.est_code = courts[0]["est_code"]
+            self.courts = courts
+            if court_index >= len(courts):
+                raise Exception("Invalid court index")
+            self.court = courts[court_index]
+        except Exception:
+            self.close()
+            raise
+
+    def search(self, date, case_type):
+        session = self.session
+        solver = shared_solver()
+        auto_tries = AUTO_SOLVE_ATTEMPTS if solver is not None else 0
+        manual_tries = 0
+        renewed = False
+        attempt = -1
+        try:
+            while attempt + 1 < auto_tries + 3:
+                attempt += 1
+                with span(session, "captcha_fetch"):
+                    session["captcha_image"] = self.scraper.get_captcha()
+                session["captcha_version"] = session.get("captcha_version", 0) + 1
+                captcha = None
+                if attempt < auto_tries:
+                    session.update(status="processing", message="Solving CAPTCHA automatically...")
+                    try:
+                        with span(session, "captcha_solve"):
+                            captcha = solver.solve(session["captcha_image"])
+                    except CaptchaError as e:
+                        print(f"Automatic CAPTCHA solving failed: {e}")
+                if captcha is None:
+                    message = "Please enter the CAPTCHA shown" if manual_tries == 0 else "Incorrect CAPTCHA, please try again"
+                    manual_tries += 1
+                    captcha = wait_for_captcha(
+                        session, message, f"/api/scrape/captcha/{self.session_id}?v={session['captcha_version']}")
+
+                session.update(status="processing", message="Searching for cause list...", captcha_url=None)
+                try:
+                    # the HTTP engine parses the tables as part of the search
+                    with span(session, "search"):
+                        tables = self.scraper.search(self.est_code, self.court['code'], date, case_type, captcha or "")
+                except http_engine.CaptchaRejected:
+                    continue
+                except http_engine.SessionExpired:
+                    if renewed:
+                        raise
+                    # start a new site session and retry without charging the attempt
+                    renewed = True
+                    site_sessions.invalidate(self.client_id)
+                    self.scraper.reset()
+                    attempt -= 1
+                    manual_tries = 0
+                    continue
+                site_sessions.save(self.client_id, dict(self.scraper.export_state(), engine="http",
+                                                        est_code=self.est_code, courts=self.courts))
+                report_tables(session, tables)
+                return tables
+            raise Exception("CAPTCHA rejected too many times - please try again")
+        finally:
+            session.pop("captcha_image", None)
+            session["captcha_url"] = None
+
+    def close(self):
+        self.scraper.close()
+
+
+def open_court_search(session_id, session, court_index, client_id=None, est_code=None):
+    if config.SCRAPER_ENGINE == "http":
+        return HttpCourtSearch(session_id, session, court_index, client_id, est_code)
+    return BrowserCourtSearch(session_id, session, court_index, client_id, est_code)
+
+
+def write_pdf(all_tables, label, date, session=None):
+    """Render the tables into the artifact store and return the download URL
+
+    Identical tables share one file, so re-scrapes of an unchanged list
+    skip rendering entirely.
+    """
+    def render(tmp):
+        with span(session, "pdf_render"):
+            save_all_tables_to_pdf(all_tables, tmp)
+
+    key = tables_digest(all_tables, pdf_render.RENDER_VERSION)
+    artifact_store.put(key, render)
+
+    safe_label = label.replace('/', '_').replace('\\', '_').replace(' ', '_')
+    return f"/downloads/{key}/cause_list_{safe_label}_{date}.pdf"
+
+
+def artifact_key(pdf_url):
+    """Artifact key of a download URL from write_pdf, None for other URLs"""
+    parts = (pdf_url or "").split("/")
+    if len(parts) == 4 and parts[1] == "downloads":
+        return parts[2]
+    return None
@@ -65,7 +65,10 @@ function App() {
 
               {status?.status === STATUS_TYPES.CAPTCHA_REQUIRED && (
                 <div className="mt-4">
-                  <CaptchaPrompt onConfirm={confirmCaptcha} />
+                  <CaptchaPrompt
+                    onConfirm={confirmCaptcha}
+                    captchaUrl={status.captcha_url}
+                  />
                 </div>
               )}
 
@@ -6,6 +6,16 @@ const api = axios.create({
   timeout: 30000,
 });
 
+// lets the backend reuse this browser's court site session between searches
+const clientId = () => {
+  let id = localStorage.getItem("clientId");
+  if (!id) {
+    id = crypto.randomUUID();
+    localStorage.setItem("clientId", id);
+  }
+  return id;
+};
+
 export const apiService = {
   getCourts: async () => {
     const response = await api.get("/api/courts");
@@ -13,7 +23,10 @@ export const apiService = {
   },
 
   startScraping: async (scrapeData) => {
-    const response = await api.post("/api/scrape/start", scrapeData);
+    const response = await api.post("/api/scrape/start", {
+      ...scrapeData,
+      client_id: clientId(),
+    });
     return response.data;
   },
 
@@ -22,8 +35,33 @@ export const apiService = {
     return response.data;
   },
 
-  confirmCaptcha: async (sessionId) => {
-    const response = await api.post(`/api/scrape/captcha-solved/${sessionId}`);
+  getTables: async (sessionId) => {
+    // walk the pages and rebuild [{caption, headers, rows}]
+    let tables = [];
+    let cursor = null;
+    do {
+      const response = await api.get(`/api/scrape/tables/${sessionId}`, {
+        params: { cursor, limit: 1000 },
+      });
+      const page = response.data;
+      if (!tables.length) {
+        tables = page.tables.map((table) => ({ ...table, rows: [] }));
+      }
+      page.rows.forEach((row) => tables[row.table].rows.push(row.cells));
+      cursor = page.next_cursor;
+    } while (cursor);
+    return tables;
+  },
+
+  getEventsUrl: (sessionId) => {
+    return `${API_BASE_URL}/api/scrape/events/${sessionId}`;
+  },
+
+  confirmCaptcha: async (sessionId, captcha) => {
+    const response = await api.post(
+      `/api/scrape/captcha-solved/${sessionId}`,
+      captcha ? { captcha } : undefined
+    );
     return response.data;
   },
 
@@ -1,23 +1,64 @@
-import React from "react";
+import React, { useState } from "react";
 import { AlertCircle } from "lucide-react";
+import { apiService } from "../api";
+
+const CaptchaPrompt = ({ onConfirm, captchaUrl }) => {
+  const [answer, setAnswer] = useState("");
+
+  const handleSubmit = (e) => {
+    e.preventDefault();
+    onConfirm(answer);
+    setAnswer("");
+  };
 
-const CaptchaPrompt = ({ onConfirm }) => {
   return (
     <div className="bg-yellow-50 border border-yellow-200 rounded-lg p-4">
       <div className="flex items-center mb-2">
         <AlertCircle className="w-5 h-5 text-yellow-600 mr-2" />
         <span className="font-medium text-yellow-800">CAPTCHA Required</span>
       </div>
-      <p className="text-yellow-700 mb-3">
-        Please solve the CAPTCHA in the browser window that opened, then click
-        the button below.
-      </p>
-      <button
-        onClick={onConfirm}
-        className="bg-yellow-600 text-white px-4 py-2 rounded-md hover:bg-yellow-700 transition-colors"
-      >
-        I've Solved the CAPTCHA
-      </button>
+      {captchaUrl ? (
+        <form onSubmit={handleSubmit}>
+          <p className="text-yellow-700 mb-3">
+            Type the characters shown in the image below.
+          </p>
+          <img
+            src={apiService.getDownloadUrl(captchaUrl)}
+            alt="CAPTCHA"
+            className="mb-3 border border-yellow-200 rounded"
+          />
+          <div className="flex gap-3">
+            <input
+              type="text"
+              value={answer}
+              onChange={(e) => setAnswer(e.target.value)}
+              className="px-3 py-2 border border-gray-300 rounded-md focus:outline-none focus:ring-2 focus:ring-yellow-500"
+              autoFocus
+              required
+            />
+            <button
+              type="submit"
+              disabled={!answer.trim()}
+              className="bg-yellow-600 text-white px-4 py-2 rounded-md hover:bg-yellow-700 disabled:opacity-50 transition-colors"
+            >
+              Submit CAPTCHA
+            </button>
+          </div>
+        </form>
+      ) : (
+        <>
+          <p className="text-yellow-700 mb-3">
+            Please solve the CAPTCHA in the browser window that opened, then
+            click the button below.
+          </p>
+          <button
+            onClick={() => onConfirm()}
+            className="bg-yellow-600 text-white px-4 py-2 rounded-md hover:bg-yellow-700 transition-colors"
+          >
+            I've Solved the CAPTCHA
+          </button>
+        </>
+      )}
     </div>
   );
 };
@@ -10,29 +10,81 @@ export const useScrapingSession = () => {
 
   useEffect(() => {
     let interval;
+    let source;
+    let closed = false;
 
-    if (session?.session_id) {
+    const isFinished = (statusData) =>
+      [STATUS_TYPES.COMPLETED, STATUS_TYPES.ERROR].includes(statusData.status);
+
+    const withTables = async (statusData) => {
+      if (!statusData.tables_url) return statusData;
+      const tables = await apiService.getTables(statusData.session_id);
+      return { ...statusData, tables };
+    };
+
+    const finish = async (sessionId) => {
+      // statuses carry no rows, fetch them once at the end
+      try {
+        setStatus(await withTables(await apiService.getStatus(sessionId)));
+      } catch (err) {
+        setError("Connection lost. Please try again.");
+      }
+      setLoading(false);
+    };
+
+    const poll = (sessionId) => {
       interval = setInterval(async () => {
         try {
-          const statusData = await apiService.getStatus(session.session_id);
-          setStatus(statusData);
-
-          if (
-            [STATUS_TYPES.COMPLETED, STATUS_TYPES.ERROR].includes(
-              statusData.status
-            )
-          ) {
-            setLoading(false);
+          const statusData = await apiService.getStatus(sessionId);
+
+          if (isFinished(statusData)) {
             clearInterval(interval);
+            setStatus(await withTables(statusData));
+            setLoading(false);
+          } else {
+            setStatus(statusData);
           }
         } catch (err) {
           setError("Connection lost. Please try again.");
           clearInterval(interval);
         }
       }, 2000);
+    };
+
+    if (session?.session_id) {
+      const sessionId = session.session_id;
+
+      if (typeof EventSource === "undefined") {
+        poll(sessionId);
+      } else {
+        source = new EventSource(apiService.getEventsUrl(sessionId));
+
+        source.addEventListener("status", (event) => {
+          const statusData = JSON.parse(event.data);
+          if (isFinished(statusData)) {
+            closed = true;
+            source.close();
+            finish(sessionId);
+          } else {
+            setStatus((prev) => ({ ...prev, ...statusData }));
+          }
+        });
+
+        source.onerror = () => {
+          // stream unavailable (proxy, old server): fall back to polling
+          if (closed) return;
+          closed = true;
+          source.close();
+          poll(sessionId);
+        };
+      }
     }
 
     return () => {
+      closed = true;
+      if (source) {
+        source.close();
+      }
       if (interval) {
         clearInterval(interval);
       }
@@ -53,11 +105,11 @@ export const useScrapingSession = () => {
     }
   }, []);
 
-  const confirmCaptcha = useCallback(async () => {
+  const confirmCaptcha = useCallback(async (captcha) => {
     if (!session?.session_id) return;
 
     try {
-      await apiService.confirmCaptcha(session.session_id);
+      await apiService.confirmCaptcha(session.session_id, captcha);
       setError("");
     } catch (err) {
       setError(err.response?.data?.detail || "Failed to confirm CAPTCHA");
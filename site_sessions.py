@@ -0,0 +1,53 @@
+import threading
+import time
+
+import config
+
+
+class SiteSessionStore:
+    """Court site session state (cookies, form tokens, court list) kept per client
+
+    A client's next search starts from the state its last successful search
+    left behind, skipping the form bootstrap, for as long as the site keeps
+    accepting it. Entries idle for `ttl` seconds are dropped, and callers
+    invalidate an entry as soon as the site reports the session expired.
+    """
+
+    def __init__(self, ttl=None, max_entries=None):
+        self.ttl = ttl if ttl is not None else config.SITE_SESSION_TTL
+        self.max_entries = max_entries or config.MAX_SESSIONS
+        self._entries = {}      # client id -> (last used, state)
+        self._lock = threading.Lock()
+        self.reused = 0
+        self.expired = 0
+
+    def get(self, client_id):
+        if not client_id:
+            return None
+        with self._lock:
+            entry = self._entries.get(client_id)
+            if entry is None:
+                return None
+            if time.time() - entry[0] > self.ttl:
+                del self._entries[client_id]
+                return None
+            self.reused += 1
+            return entry[1]
+
+    def save(self, client_id, state):
+        if not client_id:
+            return
+        with self._lock:
+            self._entries[client_id] = (time.time(), state)
+            if len(self._entries) > self.max_entries:
+                oldest = min(self._entries, key=lambda key: self._entries[key][0])
+                del self._entries[oldest]
+
+    def invalidate(self, client_id):
+        with self._lock:
+            if self._entries.pop(client_id, None) is not None:
+                self.expired += 1
+
+    def stats(self):
+        with self._lock:
+            return {"clients": len(self._entries), "reused": self.reused, "expired": self.expired}
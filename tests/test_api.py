@@ -0,0 +1,109 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+import config
+from artifacts import ArtifactStore
+
+_data = tempfile.TemporaryDirectory()
+with mock.patch.multiple(config, JOB_STORE="sqlite", JOB_DB_PATH=os.path.join(_data.name, "jobs.db"),
+                         RESULTS_DB_PATH=os.path.join(_data.name, "results.db"),
+                         COURT_CACHE_SNAPSHOT=os.path.join(_data.name, "courts.json")):
+    import main
+
+SCRAPE = {"court_index": 0, "date": "2025-10-16", "case_type": "civil"}
+
+
+def tearDownModule():
+    main.results_store._db.close()
+    main.job_queue.store._db.close()
+    _data.cleanup()
+
+
+class BackpressureTest(unittest.TestCase):
+    def test_full_queue_answers_429(self):
+        before = set(main.active_sessions)
+        with mock.patch.object(main.job_queue, "max_queued", 0), \
+                mock.patch.object(main, "requested_court", return_value=None):
+            response = TestClient(main.app).post("/api/scrape/start", json=SCRAPE)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.headers["retry-after"], "30")
+        self.assertEqual(set(main.active_sessions), before)
+
+
+class RestartRecoveryTest(unittest.TestCase):
+    def test_lifespan_requeues_scrapes_and_cancels_bulk_runs(self):
+        store = main.job_queue.store
+        store.put("interrupted", "scrape", SCRAPE, 0)
+        store.put("bulk-part", "bulk", {"parent": "gone"}, 0)
+        self.assertEqual(store.claim(["bulk"])["id"], "interrupted")
+
+        # workers stay stopped so the recovered job isn't actually scraped
+        with mock.patch.object(main.job_queue, "start"), mock.patch.object(config, "SCRAPER_ENGINE", "http"):
+            with TestClient(main.app) as client:
+                status = client.get("/api/scrape/status/interrupted").json()
+
+        self.assertEqual(status["status"], "pending")
+        jobs = dict(store._db.execute("SELECT id, status FROM jobs WHERE id IN ('interrupted', 'bulk-part')"))
+        self.assertEqual(jobs, {"interrupted": "queued", "bulk-part": "cancelled"})
+
+
+class EvictedSessionTest(unittest.TestCase):
+    def test_status_offers_the_formats_the_session_asked_for(self):
+        store = main.results_store
+        result_id = store.save({"code": "1", "name": "Court 1", "est_code": "E1"}, "2025-10-16", "civil",
+                               [("List", ["Sr. No.", "Case Number"], [["1", "SC/1/2024"]])])
+        store.link_session("asked-csv", result_id, ["csv"])
+        store.link_session("asked-none", result_id, [])
+        store.link_session("before-formats", result_id)
+
+        client = TestClient(main.app)
+        exports = {session_id: client.get(f"/api/scrape/status/{session_id}").json()["exports"]
+                   for session_id in ("asked-csv", "asked-none", "before-formats")}
+        self.assertEqual(exports["asked-csv"], {"csv": "/api/scrape/export/asked-csv/csv"})
+        self.assertIsNone(exports["asked-none"])
+        self.assertEqual(exports["before-formats"], main.export_urls("/api/scrape/export/before-formats",
+                                                                     main.export_formats(None)))
+
+
+class DownloadTest(unittest.TestCase):
+    def test_download_records_use(self):
+        with tempfile.TemporaryDirectory() as root:
+            store = ArtifactStore(root)
+            path = store.put("a" * 64, lambda tmp: open(tmp, "wb").close())
+            os.utime(path, (1000, 1000))
+            with mock.patch.object(main, "artifact_store", store):
+                client = TestClient(main.app)
+                self.assertEqual(client.get(f"/downloads/{'a' * 64}/list.pdf",
+                                            headers={"If-None-Match": f'"{"a" * 64}"'}).status_code, 304)
+                self.assertEqual(os.stat(path).st_atime, 1000)
+                self.assertEqual(client.get(f"/downloads/{'a' * 64}/list.pdf").status_code, 200)
+            stat = os.stat(path)
+            self.assertGreater(stat.st_atime, 1000)
+            self.assertEqual(stat.st_mtime, 1000)
+
+
+class SearchTest(unittest.TestCase):
+    def test_nothing_to_search_for_is_a_bad_request(self):
+        for q in ("", "  ", '"', "-*"):
+            with self.subTest(q=q):
+                self.assertEqual(TestClient(main.app).get("/api/search", params={"q": q}).status_code, 400)
+
+    def test_operators_typed_by_the_user(self):
+        for q in ('ram "kumar', "ram AND", "OR", "NOT state", "NEAR(ram", "parties: ram", "ram*"):
+            with self.subTest(q=q):
+                response = TestClient(main.app).get("/api/search", params={"q": q, "case_number": q})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json()["total"], 0)
+
+    def test_malformed_match_is_a_bad_request(self):
+        with mock.patch.object(main, "search_expression", return_value='"ram'):
+            response = TestClient(main.app).get("/api/search", params={"q": "ram"})
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import tempfile
+import time
+import unittest
+
+from artifacts import ArtifactStore
+
+
+def writer(size):
+    def write(tmp):
+        with open(tmp, "wb") as f:
+            f.write(b"x" * size)
+    return write
+
+
+class SharedBudgetTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.store = ArtifactStore(self.dir.name, max_bytes=250, max_age=0, suffixes=(".pdf", ".csv", ".zip"))
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_suffixes_share_one_size_cap(self):
+        old = self.store.put("a" * 64, writer(100))
+        os.utime(old, (time.time() - 60, time.time() - 60))
+        self.store.put("b" * 64, writer(100), ".csv")
+        self.store.put("c" * 64, writer(100), ".zip")
+
+        self.assertEqual(sorted(os.listdir(self.dir.name)), ["b" * 64 + ".csv", "c" * 64 + ".zip"])
+        self.assertEqual(self.store.stats(), {"files": 2, "bytes": 200})
+
+    def test_unknown_suffix_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.store.path("a" * 64, ".exe")
+
+
+class TouchTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.store = ArtifactStore(self.dir.name, max_bytes=150, max_age=0)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_touch_records_use_and_keeps_creation_time(self):
+        path = self.store.put("a" * 64, writer(100))
+        created = time.time() - 60
+        os.utime(path, (created, created))
+        self.assertTrue(self.store.touch("a" * 64))
+        stat = os.stat(path)
+        self.assertEqual(stat.st_mtime, created)
+        self.assertGreater(stat.st_atime, created + 30)
+        self.assertFalse(self.store.touch("b" * 64))
+
+    def test_touched_file_outlives_newer_ones(self):
+        old = self.store.put("a" * 64, writer(100))
+        os.utime(old, (time.time() - 120, time.time() - 120))
+        newer = self.store.put("b" * 64, writer(10))
+        os.utime(newer, (time.time() - 60, time.time() - 60))
+        self.store.touch("a" * 64)
+        self.store.put("c" * 64, writer(50))
+        self.assertEqual(sorted(os.listdir(self.dir.name)), ["a" * 64 + ".pdf", "c" * 64 + ".pdf"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+from unittest import mock
+
+import scrape_flow
+from driver_profiles import PROFILES
+from tests.test_jobs import FakeDriverPool
+
+COURTS = [{"code": "1", "name": "Court 1", "est_code": "E1"}, {"code": "2", "name": "Court 2", "est_code": "E1"}]
+
+
+class FakeDriver:
+    """Enough of a WebDriver for BrowserCourtSearch with the form steps patched out"""
+
+    def __init__(self, captcha_shown=False):
+        self.captcha_shown = captcha_shown
+        self.cdp = []
+
+    def execute_cdp_cmd(self, command, params):
+        self.cdp.append(command)
+
+    def get_cookies(self):
+        return [{"name": "PHPSESSID", "value": "abc", "domain": "example.org", "path": "/"}]
+
+    def find_elements(self, *locator):
+        if locator == scrape_flow.waits.CAPTCHA_INPUT and self.captcha_shown:
+            return [mock.Mock(is_displayed=lambda: True)]
+        return []
+
+    def find_element(self, *locator):
+        return mock.Mock()
+
+
+class RestoredBrowserSessionTest(unittest.TestCase):
+    def setUp(self):
+        self.driver = FakeDriver()
+        pool = FakeDriverPool(size=1, profile=PROFILES["lean"], name="test")
+        pool._create = lambda: self.driver
+        self.sessions = scrape_flow.SiteSessionStore(ttl=60)
+        self.get_courts = mock.Mock(return_value=COURTS)
+        self.open_form = mock.Mock()
+        self.ask_captcha = mock.Mock()
+        patches = [
+            mock.patch.multiple(scrape_flow, scrape_pool=pool, site_sessions=self.sessions,
+                                get_courts=self.get_courts, open_form=self.open_form, select_court=mock.Mock(),
+                                pick_date=mock.Mock(), set_case_type=mock.Mock(),
+                                extract_tables=mock.Mock(return_value=[])),
+            mock.patch.object(scrape_flow.waits, "results_rendered"),
+            mock.patch.object(scrape_flow.BrowserCourtSearch, "_ask_captcha", self.ask_captcha),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def run_search(self, client_id="client", est_code=None):
+        search = scrape_flow.BrowserCourtSearch("sid", {}, 1, client_id, est_code)
+        try:
+            search.search("16-10-2025", "civil")
+        finally:
+            search.close()
+        return search
+
+    def test_restored_session_skips_the_court_lookup(self):
+        self.run_search()
+        self.assertEqual(self.get_courts.call_count, 1)
+        self.assertEqual(self.sessions.get("client")["courts"], COURTS)
+
+        search = self.run_search()
+        self.assertEqual(self.get_courts.call_count, 1)
+        self.open_form.assert_called_once_with(self.driver, mock.ANY, "E1")
+        self.assertEqual(search.court, COURTS[1])
+        self.assertIn("Network.setCookies", self.driver.cdp)
+
+    def test_other_complex_loads_its_courts(self):
+        self.run_search()
+        self.run_search(est_code="E2")
+        self.assertEqual(self.get_courts.call_count, 2)
+        self.open_form.assert_not_called()
+
+    def test_captcha_asked_only_when_shown(self):
+        self.run_search()
+        self.ask_captcha.assert_not_called()
+        self.driver.captcha_shown = True
+        self.run_search()
+        self.ask_captcha.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
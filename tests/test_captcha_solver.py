@@ -0,0 +1,25 @@
+import socket
+import unittest
+
+from captcha_solver import AsyncCaptchaSolver, BackgroundSolver, CaptchaError, TwoCaptchaProvider
+
+
+def closed_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class UnreachableProviderTest(unittest.TestCase):
+    def test_connection_failure_is_a_captcha_error(self):
+        provider = TwoCaptchaProvider("key", base_url=f"http://127.0.0.1:{closed_port()}")
+        solver = BackgroundSolver(AsyncCaptchaSolver(provider, timeout=5))
+        try:
+            with self.assertRaises(CaptchaError):
+                solver.solve(b"not an image")
+        finally:
+            solver.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
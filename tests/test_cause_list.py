@@ -0,0 +1,81 @@
+import unittest
+
+from cause_list import CauseListTable, Columns, parse_case_number, parse_case_numbers
+
+
+class ParseCaseNumberTest(unittest.TestCase):
+    def test_slash_separated(self):
+        self.assertEqual(parse_case_number("CS DJ/123/2024"), ("CS DJ", 123, 2024))
+
+    def test_spacing_is_normalised(self):
+        self.assertEqual(parse_case_number("  CS  DJ / 12 /2024 "), ("CS DJ", 12, 2024))
+        self.assertEqual(parse_case_number("MACT\n/40/2025"), ("MACT", 40, 2025))
+
+    def test_type_and_number_separated_by_a_space(self):
+        self.assertEqual(parse_case_number("CRL.A. 123/2024"), ("CRL.A.", 123, 2024))
+        self.assertEqual(parse_case_number("W.P.(C) 1234/2023"), ("W.P.(C)", 1234, 2023))
+
+    def test_incomplete_numbers_do_not_parse(self):
+        for value in ("CS DJ/10", "CS DJ/10/24", "123/2024", "/10/2024", "Not listed", "", None):
+            with self.subTest(value=value):
+                self.assertEqual(parse_case_number(value), (None, None, None))
+
+    def test_column_shares_types(self):
+        types, numbers, years = parse_case_numbers(["SC/1/2024", "SC/2/2024", "Adjourned"])
+        self.assertIs(types[0], types[1])
+        self.assertEqual((numbers, years), ([1, 2, None], [2024, 2024, None]))
+
+
+class ColumnsTest(unittest.TestCase):
+    def test_usual_layout(self):
+        columns = Columns.from_headers(["Sr. No.", "Case Number", "Parties", "Advocate", "Purpose"])
+        self.assertEqual(columns, Columns(serial=0, case_number=1, parties=2, advocate=3, purpose=4))
+
+    def test_headers_in_another_order_and_case(self):
+        columns = Columns.from_headers(["STAGE", "CASE NO.", "S.No", "PARTY NAME", "ADVOCATE"])
+        self.assertEqual(columns, Columns(serial=2, case_number=1, parties=3, advocate=4, purpose=0))
+
+    def test_unnamed_headers_fall_back_to_the_usual_layout(self):
+        columns = Columns.from_headers(["#", "No.", "Names"])
+        self.assertEqual(columns, Columns(serial=0, case_number=1, parties=2, advocate=None, purpose=None))
+
+
+class EntryTest(unittest.TestCase):
+    HEADERS = ["Sr. No.", "Case Number", "Parties", "Advocate", "Purpose"]
+
+    def test_fields(self):
+        (entry,) = CauseListTable.from_rows("List", self.HEADERS, [
+            ["7", "CRL.A. 123/2024", "State\nvs\nRam Kumar", "Adv. X", "Arguments"]]).entries
+        self.assertEqual(entry.serial, 7)
+        self.assertEqual(entry.case, ("CRL.A.", 123, 2024))
+        self.assertEqual((entry.case_type, entry.case_no, entry.case_year), ("CRL.A.", 123, 2024))
+        self.assertEqual((entry.petitioner, entry.respondent), ("State", "Ram Kumar"))
+        self.assertEqual((entry.advocate, entry.purpose), ("Adv. X", "Arguments"))
+        self.assertEqual(entry.to_json(), {"cells": ["7", "CRL.A. 123/2024", "State\nvs\nRam Kumar", "Adv. X",
+                                                     "Arguments"],
+                                           "serial": 7, "case_type": "CRL.A.", "case_no": 123, "case_year": 2024})
+
+    def test_rows_shorter_than_the_headers(self):
+        table = CauseListTable.from_rows("List", self.HEADERS, [["1", "SC/5/2024"], ["Lunch"]])
+        short, note = table.entries
+        self.assertEqual(short.case, ("SC", 5, 2024))
+        self.assertIsNone(short.parties)
+        self.assertIsNone(short.petitioner)
+        self.assertIsNone(short.respondent)
+        self.assertIsNone(short.advocate)
+        self.assertIsNone(short.purpose)
+        self.assertIsNone(note.serial)
+        self.assertEqual(note.case, (None, None, None))
+        self.assertEqual(table.rows(), [["1", "SC/5/2024"], ["Lunch"]])
+
+    def test_repeated_values_are_shared(self):
+        table = CauseListTable.from_rows("List", self.HEADERS, [
+            ["1", "SC/1/2024", "A\nvs\nB", "".join(["Adv. ", "X"]), "".join(["Evi", "dence"])],
+            ["2", "SC/2/2024", "C\nvs\nD", "".join(["Adv. ", "X"]), "".join(["Evi", "dence"])]])
+        first, second = table.entries
+        self.assertIs(first.advocate, second.advocate)
+        self.assertIs(first.purpose, second.purpose)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from cause_list import diff_rows, row_keys
+from results_store import ResultsStore
+
+COURT = {"code": "1", "name": "Court 1", "est_code": "E1"}
+CAPTION = "Court 1, Main list"
+HEADERS = ["Sr. No.", "Case Number", "Parties", "Advocate", "Purpose"]
+
+
+def row(serial, case_number, purpose="Arguments", parties="A\nvs\nB"):
+    return [str(serial), case_number, parties, "Adv. X", purpose]
+
+
+class RowKeysTest(unittest.TestCase):
+    def test_parsed_case_numbers_ignore_spacing(self):
+        spaced = row_keys([(CAPTION, "CS  DJ / 12/2024", "CS DJ", 12, 2024, "h")])
+        self.assertEqual(spaced, row_keys([(CAPTION, "CS DJ/12/2024", "CS DJ", 12, 2024, "h")]))
+
+    def test_repeated_case_numbers_keep_their_occurrence(self):
+        keys = row_keys([(CAPTION, "SC/1/2024", "SC", 1, 2024, "h1"), (CAPTION, "SC/1/2024", "SC", 1, 2024, "h2")])
+        self.assertEqual(len(set(keys)), 2)
+        self.assertTrue(keys[1].startswith(keys[0]))
+
+    def test_rows_without_case_number_are_keyed_by_content(self):
+        keys = row_keys([(CAPTION, None, None, None, None, "h1"), (CAPTION, None, None, None, None, "h2")])
+        self.assertEqual(keys, [f"{CAPTION}\x1f#h1", f"{CAPTION}\x1f#h2"])
+
+    def test_diff_rows(self):
+        old = {"a": "1", "b": "2", "c": "3"}
+        new = {"b": "2", "c": "4", "d": "5"}
+        self.assertEqual(diff_rows(old, new), (["d"], ["a"], ["c"]))
+
+
+class RecordedDeltaTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "results.db")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def save_twice(self, before, after):
+        store = ResultsStore(self.path)
+        store.save(COURT, "2025-10-16", "civil", [(CAPTION, HEADERS, before)])
+        store.save(COURT, "2025-10-16", "civil", [(CAPTION, HEADERS, after)])
+        return store.changes("1", "2025-10-16")
+
+    def test_added_removed_and_edited_rows(self):
+        before = [row(1, "CS DJ/10/2024"), row(2, "SC/20/2023"), row(3, "CRL A/30/2022")]
+        after = [row(1, "CS DJ/10/2024"), row(2, "SC/20/2023", purpose="Evidence"), row(3, "MACT/40/2025")]
+        initial, change = self.save_twice(before, after)
+
+        self.assertTrue(initial["initial"])
+        self.assertEqual(initial["counts"]["added"], 3)
+        self.assertFalse(change["initial"])
+        self.assertEqual(change["counts"], {"added": 1, "removed": 1, "changed": 1})
+        self.assertEqual(change["added"], [{"table": 0, "row": 2, "caption": CAPTION, "cells": after[2]}])
+        self.assertEqual(change["removed"], [{"table": 0, "row": 2, "caption": CAPTION, "cells": before[2]}])
+        self.assertEqual(change["changed"], [{"table": 0, "row": 1, "caption": CAPTION, "cells": after[1],
+                                              "before": before[1]}])
+
+    def test_moved_rows_are_not_changes(self):
+        before = [row(1, "CS DJ/10/2024"), row(2, "SC/20/2023")]
+        after = [row(1, "SC/20/2023"), row(2, "CS DJ/10/2024")]
+        _, change = self.save_twice(before, after)
+        # only the serial numbers moved with the rows
+        self.assertEqual(change["counts"], {"added": 0, "removed": 0, "changed": 2})
+
+    def test_unchanged_rescrape_records_nothing(self):
+        rows = [row(1, "CS DJ/10/2024")]
+        changes = self.save_twice(rows, rows)
+        self.assertEqual(len(changes), 1)
+
+    def test_duplicate_case_numbers(self):
+        before = [row(1, "SC/5/2024", purpose="Bail"), row(2, "SC/5/2024", purpose="Arguments")]
+        after = [row(1, "SC/5/2024", purpose="Bail"), row(2, "SC/5/2024", purpose="Orders"),
+                 row(3, "SC/5/2024", purpose="Evidence")]
+        _, change = self.save_twice(before, after)
+
+        self.assertEqual(change["counts"], {"added": 1, "removed": 0, "changed": 1})
+        self.assertEqual(change["changed"][0]["row"], 1)
+        self.assertEqual(change["changed"][0]["before"], before[1])
+        self.assertEqual(change["added"][0]["cells"], after[2])
+
+    def test_store_from_before_parsed_columns_is_migrated(self):
+        db = sqlite3.connect(self.path)
+        db.executescript("""
+            CREATE TABLE cause_lists (
+                id INTEGER PRIMARY KEY, est_code TEXT NOT NULL DEFAULT '', court_code TEXT NOT NULL,
+                court_name TEXT NOT NULL, date TEXT NOT NULL, case_type TEXT NOT NULL, pdf_url TEXT,
+                table_count INTEGER NOT NULL, row_count INTEGER NOT NULL, scraped_at REAL NOT NULL,
+                UNIQUE (est_code, court_code, date, case_type)
+            );
+            CREATE TABLE cause_list_tables (
+                cause_list_id INTEGER NOT NULL, table_idx INTEGER NOT NULL, caption TEXT NOT NULL,
+                headers TEXT NOT NULL, PRIMARY KEY (cause_list_id, table_idx)
+            );
+            CREATE TABLE cause_list_rows (
+                cause_list_id INTEGER NOT NULL, table_idx INTEGER NOT NULL, row_idx INTEGER NOT NULL,
+                case_number TEXT, cells TEXT NOT NULL, PRIMARY KEY (cause_list_id, table_idx, row_idx)
+            );
+            CREATE TABLE session_results (
+                session_id TEXT PRIMARY KEY, cause_list_id INTEGER NOT NULL, created_at REAL NOT NULL
+            );
+            INSERT INTO session_results VALUES ('old-session', 1, 0);
+        """)
+        old_rows = [row(1, "CS DJ/10/2024"), row(2, "SC/20/2023")]
+        db.execute("INSERT INTO cause_lists VALUES (1, 'E1', '1', 'Court 1', '2025-10-16', 'civil', NULL, 1, 2, 0)")
+        db.execute("INSERT INTO cause_list_tables VALUES (1, 0, ?, ?)", (CAPTION, json.dumps(HEADERS)))
+        db.executemany("INSERT INTO cause_list_rows VALUES (1, 0, ?, ?, ?)",
+                       [(i, cells[1], json.dumps(cells)) for i, cells in enumerate(old_rows)])
+        db.commit()
+        db.close()
+
+        store = ResultsStore(self.path)
+        self.assertEqual(store._db.execute("SELECT case_type, case_no, case_year FROM cause_list_rows ORDER BY row_idx")
+                         .fetchall(), [("CS DJ", 10, 2024), ("SC", 20, 2023)])
+        self.assertTrue(store.unchanged(1, [(CAPTION, HEADERS, old_rows)]))
+        self.assertEqual(store.session_result("old-session"), 1)
+        self.assertIsNone(store.session_formats("old-session"))
+        store.link_session("new-session", 1, ["csv"])
+        self.assertEqual(store.session_formats("new-session"), ["csv"])
+
+        store.save(COURT, "2025-10-16", "civil", [(CAPTION, HEADERS, [old_rows[0]])])
+        (change,) = store.changes("1", "2025-10-16")
+        self.assertEqual(change["counts"], {"added": 0, "removed": 1, "changed": 0})
+        self.assertEqual(change["removed"][0]["cells"], old_rows[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
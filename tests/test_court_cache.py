@@ -0,0 +1,43 @@
+import os
+import tempfile
+import threading
+import unittest
+
+from court_cache import CourtCache
+
+
+class SnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "courts.json")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_concurrent_loads_keep_every_list(self):
+        cache = CourtCache(ttl=60, stale_ttl=60, snapshot_path=self.path)
+        results = {}
+
+        def load(i):
+            results[i] = cache.get(str(i), lambda: [i])
+
+        threads = [threading.Thread(target=load, args=(i,)) for i in range(32)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(results, {i: [i] for i in range(32)})
+        self.assertEqual(os.listdir(self.dir.name), ["courts.json"])
+        self.assertEqual(len(CourtCache(snapshot_path=self.path)._entries), 32)
+
+    def test_failed_snapshot_keeps_loaded_list(self):
+        open(self.path, "w").close()
+        # a path under a regular file can't be written
+        cache = CourtCache(ttl=60, stale_ttl=60, snapshot_path=os.path.join(self.path, "courts.json"))
+        self.assertEqual(cache.get("1", lambda: ["court"]), ["court"])
+        self.assertEqual(cache.peek("1"), ["court"])
+
+
+if __name__ == "__main__":
+    unittest.main()
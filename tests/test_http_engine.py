@@ -0,0 +1,44 @@
+import unittest
+
+import fixture_server
+import http_engine
+
+
+class RestoredSessionTest(unittest.TestCase):
+    def setUp(self):
+        self.server, self.base_url = fixture_server.serve()
+        first = http_engine.HttpScraper(self.base_url)
+        first.get_captcha()
+        first.search("1", "1", "01-01-2025", "civil", fixture_server.FIXTURE_CAPTCHA)
+        self.state = first.export_state()
+
+        self.scraper = http_engine.HttpScraper(self.base_url)
+        self.scraper.restore_state(self.state)
+        self.form_loads = 0
+        load_form = self.scraper.load_form
+
+        def counting_load_form():
+            self.form_loads += 1
+            return load_form()
+
+        self.scraper.load_form = counting_load_form
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_restored_form_is_reused(self):
+        self.scraper.get_captcha()
+        self.scraper.search("1", "1", "01-01-2025", "civil", fixture_server.FIXTURE_CAPTCHA)
+        self.assertEqual(self.form_loads, 0)
+
+    def test_form_is_reloaded_after_rejection(self):
+        self.scraper.get_captcha()
+        with self.assertRaises(http_engine.CaptchaRejected):
+            self.scraper.search("1", "1", "01-01-2025", "civil", "WRONG")
+        self.scraper.get_captcha()
+        self.assertEqual(self.form_loads, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,216 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from driver_pool import DriverPool
+from driver_profiles import PROFILES
+from jobs import JobQueue, MemoryJobStore, QueueFull, SqliteJobStore
+
+
+class FakeDriverPool(DriverPool):
+    """DriverPool handing out placeholder objects instead of Chromes"""
+
+    def _create(self):
+        driver = object()
+        with self._lock:
+            self._uses[id(driver)] = 0
+        return driver
+
+    def _healthy(self, driver):
+        return True
+
+    def _reset(self, driver):
+        pass
+
+    def _discard(self, driver):
+        with self._lock:
+            self._uses.pop(id(driver), None)
+
+
+class RecordingStore(MemoryJobStore):
+    def __init__(self):
+        super().__init__()
+        self.finished = {}
+
+    def finish(self, job_id, status, error=None):
+        self.finished[job_id] = (status, error)
+        super().finish(job_id, status, error)
+
+
+def wait_until(condition, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+class SharedLimitTest(unittest.TestCase):
+    def test_scrape_and_bulk_jobs_never_outnumber_drivers(self):
+        pool = FakeDriverPool(size=2, profile=PROFILES["lean"], name="test")
+        peak, running, lock = [0], [0], threading.Lock()
+
+        def browser_job(job_id, payload):
+            with pool.driver(timeout=0.2):
+                with lock:
+                    running[0] += 1
+                    peak[0] = max(peak[0], running[0])
+                time.sleep(0.3)
+                with lock:
+                    running[0] -= 1
+
+        store = RecordingStore()
+        queue = JobQueue(store, {"scrape": browser_job, "bulk": browser_job}, workers=4, max_queued=100,
+                         limits={("scrape", "bulk"): pool.size})
+        queue.start()
+        try:
+            for i in range(6):
+                queue.submit(f"job-{i}", "scrape" if i % 2 else "bulk", {})
+            self.assertTrue(wait_until(lambda: len(store.finished) == 6))
+        finally:
+            queue.stop()
+
+        self.assertEqual({status for status, _ in store.finished.values()}, {"done"}, store.finished)
+        self.assertEqual(peak[0], 2)
+
+    def test_separate_limits_would_exhaust_the_pool(self):
+        pool = FakeDriverPool(size=2, profile=PROFILES["lean"], name="test")
+
+        def browser_job(job_id, payload):
+            with pool.driver(timeout=0.2):
+                time.sleep(0.3)
+
+        store = RecordingStore()
+        queue = JobQueue(store, {"scrape": browser_job, "bulk": browser_job}, workers=4, max_queued=100,
+                         limits={"scrape": 2, "bulk": 2})
+        queue.start()
+        try:
+            for i in range(4):
+                queue.submit(f"job-{i}", "scrape" if i % 2 else "bulk", {})
+            self.assertTrue(wait_until(lambda: len(store.finished) == 4))
+        finally:
+            queue.stop()
+
+        errors = [error for status, error in store.finished.values() if status == "failed"]
+        self.assertIn("No browser available, try again shortly", errors)
+
+
+class StoreOrderMixin:
+    def make_store(self):
+        raise NotImplementedError
+
+    def test_higher_priority_first_then_oldest(self):
+        store = self.make_store()
+        for job_id, priority in (("low", 0), ("high", 5), ("mid", 1), ("low2", 0), ("high2", 5)):
+            store.put(job_id, "scrape", {"id": job_id}, priority)
+            time.sleep(0.002)
+        order = [store.claim()["id"] for _ in range(5)]
+        self.assertEqual(order, ["high", "high2", "mid", "low", "low2"])
+        self.assertIsNone(store.claim())
+
+    def test_skipped_kinds_stay_queued(self):
+        store = self.make_store()
+        store.put("bulk", "bulk", {}, 9)
+        store.put("scrape", "scrape", {}, 0)
+        self.assertEqual(store.claim(["bulk"])["id"], "scrape")
+        self.assertEqual(store.claim()["id"], "bulk")
+
+    def test_cancel_only_queued_jobs(self):
+        store = self.make_store()
+        store.put("a", "scrape", {})
+        store.put("b", "scrape", {})
+        self.assertEqual(store.claim()["id"], "a")
+        self.assertFalse(store.cancel("a"))
+        self.assertTrue(store.cancel("b"))
+        self.assertEqual(store.depth(), 0)
+
+
+class MemoryStoreTest(StoreOrderMixin, unittest.TestCase):
+    def make_store(self):
+        return MemoryJobStore()
+
+
+class SqliteStoreTest(StoreOrderMixin, unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "jobs.db")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def make_store(self, **kwargs):
+        return SqliteJobStore(self.path, **kwargs)
+
+    def test_restart_requeues_running_jobs(self):
+        store = self.make_store()
+        store.put("running", "scrape", {"court_index": 1}, 0)
+        store.put("queued", "bulk", {}, 0)
+        store.put("failed", "scrape", {}, 0)
+        self.assertEqual(store.claim()["id"], "running")
+        store.finish(store.claim(["bulk"])["id"], "failed", "boom")
+
+        recovered = self.make_store().recover()
+        self.assertEqual([(job["id"], job["status"]) for job in recovered], [("running", "queued"), ("queued", "queued")])
+        self.assertEqual(recovered[0]["payload"], {"court_index": 1})
+
+    def test_done_jobs_deleted_and_old_failures_pruned(self):
+        store = self.make_store(history_ttl=60)
+        for job_id in ("done", "failed", "old", "cancelled"):
+            store.put(job_id, "scrape", {})
+        for job_id, status in (("done", "done"), ("failed", "failed"), ("old", "failed")):
+            store.claim()
+            store.finish(job_id, status, "error")
+        store.cancel("cancelled")
+        store._db.execute("UPDATE jobs SET finished_at = finished_at - 120 WHERE id = 'old'")
+
+        store.recover()
+        rows = dict(store._db.execute("SELECT id, status FROM jobs").fetchall())
+        self.assertEqual(rows, {"failed": "failed", "cancelled": "cancelled"})
+
+
+class QueueLimitTest(unittest.TestCase):
+    def test_per_kind_limit(self):
+        release = threading.Event()
+        running, peak, lock = [0], [0], threading.Lock()
+
+        def job(job_id, payload):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            release.wait(5)
+            with lock:
+                running[0] -= 1
+
+        store = RecordingStore()
+        queue = JobQueue(store, {"scrape": job, "bulk": job}, workers=4, max_queued=10, limits={"scrape": 1})
+        queue.start()
+        try:
+            for i in range(3):
+                queue.submit(f"scrape-{i}", "scrape", {})
+            queue.submit("bulk", "bulk", {})
+            self.assertTrue(wait_until(lambda: queue.stats()["running"] == {"scrape": 1, "bulk": 1}))
+            time.sleep(0.1)
+            self.assertEqual(queue.stats()["running"], {"scrape": 1, "bulk": 1})
+            self.assertEqual(queue.stats()["queued"], 2)
+            release.set()
+            self.assertTrue(wait_until(lambda: len(store.finished) == 4))
+        finally:
+            release.set()
+            queue.stop()
+        self.assertEqual(peak[0], 2)
+
+    def test_full_queue_refuses_jobs(self):
+        queue = JobQueue(MemoryJobStore(), {"scrape": lambda job_id, payload: None}, max_queued=2)
+        queue.submit("a", "scrape", {})
+        queue.submit("b", "scrape", {})
+        with self.assertRaises(QueueFull):
+            queue.submit("c", "scrape", {})
+        with self.assertRaises(ValueError):
+            queue.submit("d", "unknown", {})
+
+
+if __name__ == "__main__":
+    unittest.main()
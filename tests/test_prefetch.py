@@ -0,0 +1,47 @@
+import unittest
+from datetime import datetime
+
+from prefetch import Prefetcher
+
+NOW = datetime(2025, 10, 16, 6, 0)  # a Thursday
+
+
+class CountsTest(unittest.TestCase):
+    def setUp(self):
+        self.outcomes = {}
+        self.queued = []
+
+    def start(self, est_code, court_index, date, case_type):
+        if court_index == 9:
+            raise RuntimeError("court gone")
+        scrape_id = f"{court_index}-{date}"
+        self.queued.append(scrape_id)
+        return scrape_id, court_index == 2
+
+    def prefetcher(self, watchlist):
+        return Prefetcher(self.start, self.outcomes.get, watchlist, window="", rate=0, concurrency=10,
+                          recheck=3600, closed_weekdays=())
+
+    def test_outcomes_counted_when_the_scrape_ends(self):
+        prefetcher = self.prefetcher([(None, 0, "civil"), (None, 1, "civil"), (None, 2, "civil")])
+        self.assertEqual(prefetcher.run_once(NOW), 4)
+        self.assertEqual(prefetcher.counts, {"scraped": 0, "cached": 2, "failed": 0})
+
+        self.outcomes.update({"0-2025-10-16": True, "1-2025-10-16": False})
+        prefetcher.run_once(NOW)
+        self.assertEqual(prefetcher.counts, {"scraped": 1, "cached": 2, "failed": 1})
+        self.assertEqual(prefetcher.stats()["in_flight"], 2)
+
+        self.outcomes.update({"0-2025-10-17": True, "1-2025-10-17": True})
+        prefetcher.run_once(NOW)
+        self.assertEqual(prefetcher.counts, {"scraped": 3, "cached": 2, "failed": 1})
+        self.assertEqual(prefetcher.stats()["in_flight"], 0)
+
+    def test_scrape_that_cannot_start_is_a_failure(self):
+        prefetcher = self.prefetcher([(None, 9, "civil")])
+        self.assertEqual(prefetcher.run_once(NOW), 0)
+        self.assertEqual(prefetcher.counts, {"scraped": 0, "cached": 0, "failed": 2})
+
+
+if __name__ == "__main__":
+    unittest.main()
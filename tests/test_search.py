@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+
+from results_store import ResultsStore, search_expression
+
+COURT = {"code": "1", "name": "Court 1", "est_code": "E1"}
+HEADERS = ["Sr. No.", "Case Number", "Parties", "Advocate", "Purpose"]
+ROWS = [
+    ["1", "CS DJ/10/2024", 'Ram "Kumar"\nvs\nState', "Adv. O'Neil", "Arguments"],
+    ["2", "CRL.A. 123/2024", "Sita Devi\nvs\nMohan Lal", "Adv. Sharma-Gupta", "Evidence"],
+]
+
+
+class SearchExpressionTest(unittest.TestCase):
+    def test_nothing_to_search_for(self):
+        for value in (None, "", "   ", '"', "-", "*", "()", ":"):
+            with self.subTest(value=value):
+                self.assertIsNone(search_expression(value, value, value, value))
+
+    def test_words_are_quoted(self):
+        self.assertEqual(search_expression('ram "kumar'), '"ram" "kumar"*')
+        self.assertEqual(search_expression("ram AND state"), '"ram" "AND" "state"*')
+        self.assertEqual(search_expression(party="-ram"), 'parties : ("ram")')
+        self.assertEqual(search_expression(case_number="CS DJ/10/2024"), 'case_number : "CS DJ 10 2024"')
+
+
+class SearchTest(unittest.TestCase):
+    QUERIES = ['"', 'ram "kumar', "ram AND", "OR state", "NOT", "ram NOT state", "NEAR(ram state)", "-ram",
+               "ram*", "**", "^ram", "parties: ram", "(ram", "o'neil", "sharma-gupta", "ram\x00"]
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.store = ResultsStore(os.path.join(self.dir.name, "results.db"))
+        self.store.save(COURT, "2025-10-16", "civil", [("Main list", HEADERS, ROWS)])
+
+    def tearDown(self):
+        self.store._db.close()
+        self.dir.cleanup()
+
+    def found(self, **kwargs):
+        total, hits = self.store.search(search_expression(**kwargs))
+        return total, [hit["entry"].cells[0] for hit in hits]
+
+    def test_user_input_never_breaks_the_query(self):
+        for query in self.QUERIES:
+            for field in ("text", "party", "advocate", "case_number"):
+                match = search_expression(**{field: query})
+                if match is None:
+                    continue
+                with self.subTest(field=field, query=query):
+                    self.store.search(match)
+
+    def test_operators_are_searched_as_words(self):
+        self.assertEqual(self.found(text="ram AND"), (0, []))
+        self.assertEqual(self.found(text="ram OR sita"), (0, []))
+        self.assertEqual(self.found(text="-ram"), (1, ["1"]))
+        self.assertEqual(self.found(text='"kum'), (1, ["1"]))
+
+    def test_fields(self):
+        self.assertEqual(self.found(advocate="o'neil"), (1, ["1"]))
+        self.assertEqual(self.found(advocate="sharma-gupta"), (1, ["2"]))
+        self.assertEqual(self.found(case_number="CRL.A. 123/2024"), (1, ["2"]))
+        self.assertEqual(self.found(case_number='CS DJ/10/2024"'), (1, ["1"]))
+
+    def test_malformed_expression_raises_value_error(self):
+        for match in ('"ram', "ram AND", "NEAR(", "parties : "):
+            with self.subTest(match=match), self.assertRaises(ValueError):
+                self.store.search(match)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import Select
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
+
+# Condition-driven waits for the cause list form, used instead of fixed sleeps
+
+DATE_ICON = (By.CSS_SELECTOR, ".icon[aria-label^='Choose Date']")
+DATE_BUTTON = (By.CSS_SELECTOR, "button.dateButton")
+RESULTS = (By.CSS_SELECTOR, ".distTableContent")
+SEARCH_BUTTON = (By.CSS_SELECTOR, "input[type='submit'][value='Search']")
+CAPTCHA_IMAGE = (By.CSS_SELECTOR, "img[src*='captcha'], img[src*='Captcha'], img[alt*='captcha'], img[alt*='Captcha']")
+CAPTCHA_INPUT = (By.CSS_SELECTOR, "input[name='siwp_captcha_value'], input[name*='captcha'], input[id*='captcha']")
+
+
+def page_ready(wait):
+    wait.until(lambda d: d.execute_script("return document.readyState") == "complete")
+
+
+def dropdown_populated(wait, element_id, min_options=2):
+    """Wait until the <select> has more than its placeholder option"""
+    def populated(d):
+        try:
+            select = Select(d.find_element(By.ID, element_id))
+            return select if len(select.options) >= min_options else False
+        except StaleElementReferenceException:
+            return False
+    return wait.until(populated)
+
+
+def option_selected(wait, element_id, value):
+    wait.until(lambda d: Select(d.find_element(By.ID, element_id)).first_selected_option.get_attribute("value") == value)
+
+
+def open_date_picker(wait):
+    wait.until(EC.element_to_be_clickable(DATE_ICON)).click()
+    wait.until(EC.visibility_of_element_located(DATE_BUTTON))
+
+
+def choose_date(wait, date_str):
+    """Click the date in an open picker and wait for the picker to close"""
+    locator = (By.CSS_SELECTOR, f"button.dateButton[data-date='{date_str}']")
+    wait.until(EC.element_to_be_clickable(locator)).click()
+    try:
+        wait.until(EC.invisibility_of_element_located(locator))
+    except TimeoutException:
+        # inline pickers stay on screen; the click itself has been applied
+        pass
+
+
+def field_value(wait, element, value):
+    """Wait until the input reports `value`, i.e. the typed keys have landed"""
+    wait.until(lambda d: element.get_attribute("value") == value)
+
+
+def checkbox_state(wait, element_id, checked=True):
+    """Set a checkbox/radio and wait until the browser reports the new state"""
+    element = wait.until(EC.element_to_be_clickable((By.ID, element_id)))
+    if element.is_selected() != checked:
+        element.click()
+    wait.until(EC.element_selection_state_to_be(element, checked))
+
+
+def captcha_shown(driver):
+    """Whether the form is asking for a CAPTCHA answer"""
+    return any(element.is_displayed() for element in driver.find_elements(*CAPTCHA_INPUT))
+
+
+def results_rendered(wait, previous=None):
+    """Wait for the result tables and for their row count to stop growing
+
+    Pass the results element from an earlier search on the same page to wait
+    for it to be replaced first.
+    """
+    if previous is not None:
+        try:
+            wait.until(EC.staleness_of(previous))
+        except TimeoutException:
+            pass
+    wait.until(EC.presence_of_element_located(RESULTS))
+    last = {"rows": -1}
+
+    def settled(d):
+        rows = d.execute_script(
+            "return document.querySelectorAll('.distTableContent table tr').length")
+        done = rows == last["rows"]
+        last["rows"] = rows
+        return done
+
+    wait.until(settled)